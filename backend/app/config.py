@@ -1,18 +1,51 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     # Database Configuration
     DATABASE_URL: str 
+    ASYNC_DATABASE_URL: Optional[str] = None  # Default: DATABASE_URL with its asyncio driver (asyncpg)
     ALPACA_WS_URL: str
 
+    # Async connection pool (per API process)
+    DB_POOL_SIZE: int = 20  # Connections kept open
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed under burst load
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+
     DEBUG: bool = True
     APP_NAME: str = "Ishara Backend"
     
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
 
+    # Background ingestion jobs (/api/tasks)
+    JOB_BACKEND: str = "auto"  # "redis", "memory", or "auto" (Redis when reachable)
+    JOB_MAX_WORKERS: int = 2  # Jobs running at once
+    JOB_MAX_PENDING: int = 100  # Queued jobs before enqueue answers 429
+    JOB_TTL: int = 86400  # Seconds a job record is kept in Redis
+    JOB_CLAIM_TTL: int = 3600  # Upper bound on a symbol's in-flight claim, in case a worker dies
+
+    # Post-close refresh of watchlist and default tickers
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_RUN_AT: str = "16:30"  # America/New_York, weekdays
+    SCHEDULER_BACKFILL_DAYS: int = 365  # History fetched for symbols with no coverage yet
+    SCHEDULER_BATCH_SIZE: int = 100  # Symbols per Alpaca StockBarsRequest
+    SCHEDULER_REFRESH_OPTIONS: bool = True
+
+    # Stream ingest leader (one worker streams from Alpaca, the rest follow via Redis pub/sub)
+    LEADER_BACKEND: str = "auto"  # "redis", "postgres", "local", or "auto" (Redis when reachable, else local)
+    LEADER_LOCK_TTL: float = 15.0  # Seconds the lock outlives a leader that stops renewing
+    LEADER_RENEW_INTERVAL: float = 5.0  # Seconds between renewals / election attempts
+    TICK_FANOUT_INTERVAL: float = 0.05  # Seconds between published tick batches
+
     # Yahoo Finance
     YAHOO_API_KEY: str = "your_yahoo_api_key_here" 
+    YAHOO_MAX_WORKERS: int = 8  # Concurrent symbol downloads
+    YAHOO_RATE_LIMIT: float = 5.0  # Sustained requests per second across all workers
+    YAHOO_RATE_BURST: int = 10  # Requests allowed in a burst
+    YAHOO_MAX_RETRIES: int = 3
+    YAHOO_RETRY_BASE_DELAY: float = 1.0  # Seconds; doubled per retry, with full jitter
 
     # Alpaca
     ALPACA_API_KEY: str
@@ -20,6 +53,86 @@ class Settings(BaseSettings):
     ALPACA_BASE_URL: str = "https://paper-api.alpaca.markets"
     ALPACA_STREAM_URL: str = "wss://stream.data.alpaca.markets/v2/iex"
 
+    # Shared upstream HTTP clients (Alpaca REST, news)
+    HTTP_POOL_SIZE: int = 20  # Keep-alive connections per host
+    HTTP_TIMEOUT: float = 10.0  # Read timeout in seconds
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+
+    # Response cache (news and chart reads)
+    RESPONSE_CACHE_BACKEND: str = "auto"  # "redis", "memory", or "auto" (Redis when reachable)
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # In-process LRU budget for cached bodies
+    NEWS_CACHE_TTL: float = 60.0  # Seconds a news response stays fresh
+    CHART_CACHE_TTL: float = 60.0  # Historical and all-symbol chart responses
+    CHART_LIVE_CACHE_TTL: float = 5.0  # Latest-prices and streamed-bar responses
+
+    # Options: chain ingest window and analytics (/api/options/{symbol}/chain and /surface)
+    OPTIONS_RISK_FREE_RATE: float = 0.04  # Continuously compounded, annualized
+    OPTIONS_DIVIDEND_YIELD: float = 0.0
+    OPTIONS_EXPIRATION_DAYS: int = 365  # Option chains fetched for expirations up to this far ahead
+    OPTIONS_CACHE_TTL: float = 3600.0  # Seconds; entries are keyed by snapshot, so a new ingest is never stale
+
+    # Asset universe for symbol search
+    ASSET_CACHE_TTL: float = 21600.0  # Seconds before the universe is refreshed in the background
+    ASSET_SEARCH_CACHE_SIZE: int = 4096  # Memoized (query, limit) results per index
+    ASSET_SEARCH_MAX_LIMIT: int = 100
+
+    # Market data fan-out (one upstream Alpaca socket shared by WebSocket clients)
+    MARKET_HUB_CLIENT_BUFFER: int = 1000  # Pending messages per client before the oldest is dropped
+
+    # Latest-quote snapshots
+    QUOTES_SSE_INTERVAL: float = 1.0  # Default seconds between coalesced SSE deltas
+    QUOTES_SSE_MIN_INTERVAL: float = 0.1  # Fastest rate a client may request
+    QUOTES_SSE_KEEPALIVE: float = 15.0  # Seconds of silence before a keep-alive comment
+
+    # Live portfolio P&L
+    PNL_STREAM_INTERVAL: float = 1.0  # Default seconds between coalesced P&L updates
+    PNL_RELOAD_INTERVAL: float = 60.0  # Seconds between reloads of positions from the database
+
+    # Backtesting
+    BACKTEST_MAX_WORKERS: Optional[int] = None  # Sweep process pool size (default: CPU count)
+    BACKTEST_SWEEP_CHUNK: int = 64  # Parameter combinations per pool task
+    BACKTEST_MAX_COMBINATIONS: int = 20000  # Largest grid accepted by POST /api/backtests
+    BACKTEST_MAX_EQUITY_POINTS: int = 1000  # Equity curve points returned for a single run
+    # HistoricalPrice sources in order of preference; a backtest uses one source per symbol
+    BACKTEST_SOURCE_PREFERENCE: list[str] = ["Yahoo Finance", "Alpaca"]
+    SWEEP_MAX_CONCURRENT_JOBS: int = 1  # Sweep jobs run at once (each uses the whole process pool)
+    SWEEP_HEARTBEAT_INTERVAL: float = 30.0  # Seconds between a running job's heartbeats
+    SWEEP_STALE_AFTER: float = 120.0  # Running jobs silent this long are requeued by a starting worker
+
+    # Portfolio endpoint paging
+    PORTFOLIO_PAGE_SIZE: int = 1000  # Default rows per section
+    PORTFOLIO_MAX_PAGE_SIZE: int = 50000
+    PORTFOLIO_FETCH_SIZE: int = 1000  # Rows pulled per server-side cursor fetch
+
+    # Columnar (Arrow IPC / Parquet) responses
+    ARROW_BATCH_SIZE: int = 65536  # Rows per record batch / Parquet row group
+    PARQUET_COMPRESSION: str = "zstd"
+
+    # Tick table partitions (Postgres)
+    PARTITION_PREMAKE_DAYS: int = 14  # Partitions created this far ahead of today
+    PARTITION_MAINTENANCE_INTERVAL: float = 3600.0  # Seconds between partition checks
+
+    # Bulk ingestion
+    UPSERT_CHUNK_SIZE: int = 5000  # Rows per INSERT ... ON CONFLICT execute() call
+
+    # Tick ingestion (streaming -> Postgres)
+    TICK_QUEUE_MAXSIZE: int = 50000  # Max ticks buffered between the stream handlers and the writer
+    TICK_BATCH_SIZE: int = 1000  # Flush as soon as this many ticks are pending
+    TICK_FLUSH_INTERVAL: float = 0.5  # ...or this many seconds after the first pending tick
+    TICK_DROP_POLICY: str = "drop_oldest"  # block | drop_newest | drop_oldest when the queue is full
+
+    # Durable tick spool (handlers append to disk, a replayer drains it into Postgres)
+    TICK_SPOOL_ENABLED: bool = True
+    TICK_SPOOL_DIR: str = "data/spool"
+    TICK_SPOOL_SEGMENT_RECORDS: int = 262144  # Records per segment file (96 bytes each)
+    TICK_REPLAY_BATCH_SIZE: int = 5000
+    TICK_REPLAY_POLL_INTERVAL: float = 0.25  # Seconds between polls when the spool is drained
+    TICK_REPLAY_MAX_BACKOFF: float = 30.0  # Max retry delay while Postgres is unavailable
+
+    # Streaming OHLCV bars built from trades
+    BAR_TIMEFRAMES: list[str] = ["1s", "1m", "5m", "1h"]
+    BAR_CLOSE_GRACE: float = 2.0  # Seconds after a bar's interval ends before it is closed without a new trade
+
     # General Settings
     DEBUG: bool = False
 
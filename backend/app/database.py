@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -8,6 +10,32 @@ engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Asyncio drivers for the sync URL's backend
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def async_database_url(url: str):
+    """The same database as `url`, addressed through its asyncio driver."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}") if backend in ASYNC_DRIVERS else url
+
+def _async_engine_options(url):
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+# Async engine for `async def` handlers (alongside the sync one, which ingestion,
+# background jobs and the columnar exports keep using)
+_async_url = make_url(settings.ASYNC_DATABASE_URL) if settings.ASYNC_DATABASE_URL else async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **_async_engine_options(_async_url))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Dependency to get a database session
 def get_db():
     db = SessionLocal()
@@ -16,7 +44,18 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get an async database session; queries never block the event loop
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Initialize the database (used on startup)
 def init_db():
     import app.models  # Ensure models are imported before creating tables
+    from app.migrations import run_migrations, ensure_partitions
     Base.metadata.create_all(bind=engine)
+    # create_all() does not alter existing tables; indexes, constraints and
+    # partitioning added later are applied by the SQL migrations in migrations/.
+    # Data-moving migrations are left to the offline `python -m app.migrations` step.
+    run_migrations(engine)
+    ensure_partitions(engine)
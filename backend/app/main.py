@@ -1,9 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import stocks, options, portfolio, charts, data_streams, tasks, watchlist, news, alpaca_stream
-from app.database import init_db
+from app.routes import stocks, options, portfolio, charts, data_streams, tasks, watchlist, news, alpaca_stream, quotes, backtests
+from app.database import init_db, engine, async_engine
+from app.migrations import maintain_partitions
 from app.config import settings
 from app.services.streaming_service import StreamingService
+from app.services.market_hub import market_hub
+from app.services.pnl_engine import pnl_engine
+from app.services.sweep_runner import sweep_runner
+from app.services.job_queue import job_queue
+from app.services.scheduler import RefreshScheduler
+from app.services.asset_universe import asset_universe
+from app.services.clients import clients
+from app.services.response_cache import response_cache
+from app.services.redis_client import get_redis
+from app.services.leader import LeaderElection
+from app.services.tick_fanout import TickPublisher, TickSubscriber
 from contextlib import asynccontextmanager
 import logging
 import asyncio
@@ -22,8 +34,6 @@ DEFAULT_TICKERS = [
 ]
 DEFAULT_SUBREDDITS = ["stocks", "investing", "wallstreetbets"]
 
-streaming_service = StreamingService(DEFAULT_TICKERS)
-
 # Lifespan Context
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,12 +41,71 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting Ishara Backend...")
     logger.info("🚀 Connecting to database...")
     init_db()  # Initialize database tables
-    streaming_service.start()
-    logger.info("🚀 Streaming service started.")
+    clients.start()
+    partition_task = asyncio.create_task(maintain_partitions(engine))
+    # Load positions for live P&L and make sure every held symbol is streamed
+    pnl_engine.reload()
+    stream_symbols = sorted(set(DEFAULT_TICKERS) | set(pnl_engine.symbols()))
+    pnl_task = asyncio.create_task(pnl_engine.run())
+    sweep_runner.resume()
+    job_queue.start()
+    response_cache.start()
+    asset_universe.start()
+    refresh_scheduler = RefreshScheduler(DEFAULT_TICKERS)
+    app.state.refresh_scheduler = refresh_scheduler
+    app.state.streaming_service = None
+
+    # Only the elected leader streams from Alpaca and runs the refresh scheduler;
+    # the other workers follow its ticks over Redis pub/sub
+    redis = get_redis()
+    tick_publisher = TickPublisher(redis) if redis is not None else None
+    tick_subscriber = TickSubscriber(redis) if redis is not None else None
+    app.state.tick_subscriber = tick_subscriber
+    leader_tasks = {}
+
+    async def on_elected():
+        if tick_subscriber is not None:
+            await asyncio.to_thread(tick_subscriber.stop)
+        streaming_service = StreamingService(stream_symbols, publisher=tick_publisher)
+        app.state.streaming_service = streaming_service
+        if tick_publisher is not None:
+            tick_publisher.start()
+        streaming_service.start()
+        if settings.SCHEDULER_ENABLED:
+            leader_tasks["scheduler"] = asyncio.create_task(refresh_scheduler.run())
+        logger.info("🚀 Streaming service started.")
+
+    async def on_demoted():
+        scheduler_task = leader_tasks.pop("scheduler", None)
+        if scheduler_task is not None:
+            scheduler_task.cancel()
+        streaming_service, app.state.streaming_service = app.state.streaming_service, None
+        if streaming_service is not None:
+            await asyncio.to_thread(streaming_service.stop)
+        if tick_publisher is not None:
+            await asyncio.to_thread(tick_publisher.stop)
+        if tick_subscriber is not None:
+            tick_subscriber.start()
+        logger.info("🛑 Streaming service stopped.")
+
+    if tick_subscriber is not None:
+        tick_subscriber.start()
+    leader = LeaderElection(on_elected, on_demoted, fanout=tick_subscriber is not None)
+    app.state.leader = leader
+    leader.start()
     yield
     # Shutdown: Stop streaming service
     logger.info("🛑 Shutting down Ishara Backend...")
-    streaming_service.stop()
+    await leader.stop()  # Stops streaming before releasing the lock
+    if tick_subscriber is not None:
+        tick_subscriber.stop()
+    pnl_task.cancel()
+    partition_task.cancel()
+    sweep_runner.shutdown()
+    job_queue.shutdown()
+    await market_hub.stop()
+    await clients.close()
+    await async_engine.dispose()
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -55,7 +124,7 @@ app.add_middleware(
 )
 
 # Include API routes
-# app.include_router(data_streams.router, prefix="/api/streams", tags=["Streams"])
+app.include_router(data_streams.router, prefix="/api/streams", tags=["Streams"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
 app.include_router(stocks.router, prefix="/api/stocks", tags=["Stocks"])
 app.include_router(options.router, prefix="/api", tags=["Options"])
@@ -64,3 +133,5 @@ app.include_router(charts.router, prefix="/api/charts", tags=["Charts"])
 app.include_router(watchlist.router, prefix="/api/watchlist", tags=["Watchlist"])
 app.include_router(news.router, prefix="/api/news", tags=["News"])
 app.include_router(alpaca_stream.router, prefix="/api/alpaca", tags=["Alpaca"])
+app.include_router(quotes.router, prefix="/api/quotes", tags=["Quotes"])
+app.include_router(backtests.router, prefix="/api/backtests", tags=["Backtests"])
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import text
+from app.config import settings
+
+logger = logging.getLogger("Migrations")
+
+# Ordered SQL scripts (NNNN_description.sql), applied once each
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Range-partitioned tables and their partition width (see 0002_partition_tick_tables.sql)
+PARTITIONED_TABLES = {"stock_prices": "month", "trades": "day"}
+
+# Session-level advisory lock key held while migrating, so concurrent workers wait their turn
+MIGRATION_LOCK_ID = 0x15A4A
+
+# First-line marker of scripts that rewrite or copy table data. They can take a long
+# time on large tables, so app startup skips them; apply them with `python -m app.migrations`.
+OFFLINE_MARKER = "-- migrate: offline"
+
+
+def pending_migrations(applied: set):
+    return [path for path in sorted(MIGRATIONS_DIR.glob("*.sql")) if path.stem not in applied]
+
+
+def is_offline(path: Path):
+    with path.open() as script:
+        return script.readline().strip() == OFFLINE_MARKER
+
+
+def run_migrations(engine, offline: bool = False):
+    """
+    Apply the SQL migrations not yet recorded in `schema_migrations`.
+
+    Each script runs in its own transaction together with its bookkeeping row, so
+    a failed migration leaves the schema at the previous version. Migrations are
+    written for PostgreSQL; other databases (e.g. SQLite in development) rely on
+    `create_all()` alone.
+
+    Offline scripts (marked with OFFLINE_MARKER) are skipped with a warning unless
+    `offline` is set, so app startup only applies quick schema changes and never
+    holds every worker on the migration lock while data is copied. Online scripts
+    must therefore not depend on offline ones.
+
+    Args:
+        engine: SQLAlchemy engine.
+        offline (bool): Also apply offline scripts (the `python -m app.migrations` step).
+
+    Returns:
+        list: Versions applied by this call.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+
+    applied_now = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations "
+                "(version varchar PRIMARY KEY, applied_at timestamp NOT NULL DEFAULT now())"
+            ))
+            conn.commit()
+            applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+            conn.commit()
+
+            for path in pending_migrations(applied):
+                if not offline and is_offline(path):
+                    logger.warning(
+                        f"⚠️ Migration {path.stem} moves table data and is not applied on startup; "
+                        f"run `python -m app.migrations` during a maintenance window."
+                    )
+                    continue
+                logger.info(f"🚀 Applying migration {path.stem}...")
+                with conn.begin():
+                    # Scripts contain format() placeholders, so bypass DBAPI parameter parsing
+                    conn.execution_options(no_parameters=True).exec_driver_sql(path.read_text())
+                    conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": path.stem})
+                applied_now.append(path.stem)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            conn.commit()
+
+    if applied_now:
+        logger.info(f"✅ Applied migrations: {', '.join(applied_now)}")
+    return applied_now
+
+
+def ensure_partitions(engine, days_ahead: int = None):
+    """
+    Create the tick-table partitions covering yesterday through `days_ahead` days out.
+
+    Tables not yet partitioned (offline migration 0002 still pending) are skipped.
+
+    Returns:
+        int: Number of partitions created.
+    """
+    if engine.dialect.name != "postgresql":
+        return 0
+    days_ahead = settings.PARTITION_PREMAKE_DAYS if days_ahead is None else days_ahead
+    now = datetime.utcnow()
+    created = 0
+    with engine.begin() as conn:
+        partitioned = {row[0] for row in conn.execute(text(
+            "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = ANY(:tables)"
+        ), {"tables": list(PARTITIONED_TABLES)})}
+        for table, step in PARTITIONED_TABLES.items():
+            if table not in partitioned:
+                continue
+            created += conn.execute(
+                text("SELECT ishara_ensure_partitions(:table, :step, :start, :end)"),
+                {"table": table, "step": step, "start": now - timedelta(days=1), "end": now + timedelta(days=days_ahead)},
+            ).scalar()
+    if created:
+        logger.info(f"✅ Created {created} tick table partitions")
+    return created
+
+
+async def maintain_partitions(engine):
+    """Keep partitions created ahead of incoming ticks (init_db covers startup); cancel the task to stop it."""
+    while True:
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL)
+        try:
+            await asyncio.to_thread(ensure_partitions, engine)
+        except Exception as e:
+            logger.error(f"❌ Error creating partitions: {e}")
+
+
+def main():
+    """Offline migration step: apply every pending migration, including the data-moving ones."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    import app.models  # Ensure models are imported before creating tables
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine, offline=True)
+    ensure_partitions(engine)
+    print(f"Applied {len(applied)} migrations{': ' + ', '.join(applied) if applied else ''}")
+
+
+if __name__ == "__main__":
+    main()
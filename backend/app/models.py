@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, UniqueConstraint, Index, JSON
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -39,7 +39,12 @@ class Option(Base):
     volume = Column(Integer)                             # Trading volume
     open_interest = Column(Integer)                      # Open interest
     implied_volatility = Column(Float)                   # Implied volatility
-    timestamp = Column(DateTime)                         # Timestamp of the data
+    timestamp = Column(DateTime)                         # Snapshot time (one per ingested chain)
+
+    # Latest-snapshot lookup and loading a single snapshot
+    __table_args__ = (
+        Index("ix_options_symbol_timestamp", "symbol", "timestamp"),
+    )
 
     def __repr__(self):
         return (f"<Option(symbol={self.symbol}, strike_price={self.strike_price}, "
@@ -74,19 +79,45 @@ class StockPrice(Base):
     __tablename__ = "stock_prices"
 
     id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True)  # Foreign key to Stock.symbol
+    symbol = Column(String)  # Foreign key to Stock.symbol
     price = Column(Float)
     open = Column(Float, nullable=True)  # Opening price
     high = Column(Float, nullable=True)  # High price
     low = Column(Float, nullable=True)  # Low price
     close = Column(Float, nullable=True)  # Closing price
     volume = Column(Integer, nullable=True)  # Trade volume
-    timestamp = Column(DateTime, index=True)  # Time of the price record
+    timestamp = Column(DateTime, nullable=False)  # Time of the price record (partition key on Postgres)
 
     # Relationships
     stock_id = Column(Integer, ForeignKey("stocks.id"))
     stock = relationship("Stock", back_populates="prices")
 
+    # Chart reads are one symbol over a time range; on Postgres the table is
+    # range-partitioned by month (migrations/0002_partition_tick_tables.sql)
+    __table_args__ = (
+        Index("ix_stock_prices_symbol_timestamp", "symbol", "timestamp", postgresql_include=["close"]),
+    )
+
+class Bar(Base):
+    __tablename__ = "bars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, nullable=False)  # Stock symbol (e.g., AAPL)
+    timeframe = Column(String, nullable=False)  # Bar interval (e.g., 1s, 1m, 5m, 1h)
+    start = Column(DateTime, nullable=False)  # Start of the bar interval (UTC)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Integer, nullable=False)
+    vwap = Column(Float, nullable=True)  # Volume-weighted average price
+    trade_count = Column(Integer, nullable=True)  # Number of trades in the bar
+
+    # One bar per symbol/timeframe/interval; also serves chart range scans
+    __table_args__ = (
+        UniqueConstraint("symbol", "timeframe", "start", name="uq_bar_symbol_timeframe_start"),
+    )
+
 class Portfolio(Base):
     __tablename__ = "portfolio"
 
@@ -109,6 +140,11 @@ class Trade(Base):
     conditions = Column(String)  # Trade conditions as a string (can store as JSON if needed)
     tape = Column(String)  # Trade tape identifier
 
+    # Range-partitioned by day on Postgres (migrations/0002_partition_tick_tables.sql)
+    __table_args__ = (
+        Index("ix_trades_symbol_timestamp", "symbol", "timestamp", postgresql_include=["price", "size"]),
+    )
+
 class Earnings(Base):
     __tablename__ = "earnings"
 
@@ -146,6 +182,25 @@ class HistoricalPrice(Base):
     timestamp = Column(DateTime)
     source = Column(String, nullable=False) 
 
+    # One bar per symbol, day and source; target of the ingestion upserts
+    __table_args__ = (
+        UniqueConstraint("symbol", "date", "source", name="uq_historical_symbol_date_source"),
+    )
+
+class DataCoverage(Base):
+    __tablename__ = "data_coverage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, nullable=False)
+    source = Column(String, nullable=False)  # Matches HistoricalPrice.source (e.g., "Yahoo Finance", "Alpaca")
+    start = Column(DateTime, nullable=False)  # First date covered (inclusive)
+    end = Column(DateTime, nullable=False)  # Last date covered (inclusive)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_data_coverage_symbol_source", "symbol", "source"),
+    )
+
 class RealTimePrice(Base):
     __tablename__ = "real_time_prices"
 
@@ -183,4 +238,44 @@ class Watchlist(Base):
     symbol = Column(String, unique=True, index=True)  # Stock symbol (e.g., AAPL, TSLA)
     name = Column(String)  # Full company name (optional)
     added_at = Column(DateTime, default=datetime.utcnow)  # Timestamp when added
-    
\ No newline at end of file
+    
+class SweepJob(Base):
+    __tablename__ = "sweep_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    strategy = Column(String, nullable=False)  # Key of backtest_engine.SIGNALS
+    symbols = Column(JSON, nullable=False)  # Universe as a list of symbols
+    params = Column(JSON, nullable=False)  # Parameter grid ({name: value or [values]})
+    settings = Column(JSON, nullable=True)  # Dates, source, costs and capital
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    total = Column(Integer, nullable=False, default=0)  # Number of parameter combinations
+    completed = Column(Integer, nullable=False, default=0)  # Combinations evaluated so far
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String, nullable=True)  # Runner (host:pid:nonce) that claimed the job
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed by the owner while running
+
+    results = relationship("SweepResult", back_populates="job", cascade="all, delete-orphan")
+
+class SweepResult(Base):
+    __tablename__ = "sweep_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("sweep_jobs.id"), nullable=False)
+    params = Column(JSON, nullable=False)
+    total_return = Column(Float)
+    cagr = Column(Float)
+    sharpe = Column(Float)
+    max_drawdown = Column(Float)
+    trades = Column(Integer)
+    turnover = Column(Float)
+    final_equity = Column(Float)
+
+    job = relationship("SweepJob", back_populates="results")
+
+    # Serves the best-first results listing
+    __table_args__ = (
+        Index("ix_sweep_results_job_sharpe", "job_id", "sharpe"),
+    )
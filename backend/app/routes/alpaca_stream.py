@@ -1,45 +1,42 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.config import settings
-import json
-import websockets
-import os
+from app.services.market_hub import market_hub, ClientChannel
+import asyncio
 
 router = APIRouter()
 
-# ALPACA_API_KEY = os.getenv("ALPACA_API_KEY")
-# ALPACA_API_SECRET = os.getenv("ALPACA_API_SECRET")
 # ALPACA_STREAM_URL = "wss://stream.data.alpaca.markets/v2/sip"  # For real-time trades, quotes, bars
 
-clients = set()
-
-async def connect_to_alpaca(websocket: WebSocket, symbols: list):
-    async with websockets.connect(settings.ALPACA_STREAM_URL) as alpaca_ws:
-        auth_message = {
-            "action": "auth",
-            "key": settings.ALPACA_API_KEY,
-            "secret": settings.ALPACA_API_SECRET
-        }
-        await alpaca_ws.send(json.dumps(auth_message))
-
-        subscribe_message = {
-            "action": "subscribe",
-            "trades": symbols,  # List of stock symbols to track trades
-            "quotes": symbols,
-            "bars": symbols
-        }
-        await alpaca_ws.send(json.dumps(subscribe_message))
-
-        while True:
-            response = await alpaca_ws.recv()
-            await websocket.send_text(response)
-
 @router.websocket("/ws/market-data")
-async def market_data(websocket: WebSocket, symbols: str):
+async def market_data(websocket: WebSocket, symbols: str = None):
+    """
+    Stream trades, quotes and bars for the requested symbols.
+
+    All clients share the hub's single upstream Alpaca connection; each one gets its
+    own bounded buffer so a slow browser only loses stale quotes, never the stream.
+    """
     await websocket.accept()
-    clients.add(websocket)
-    symbol_list = symbols.split(",") if symbols else ["AAPL", "TSLA"]
-    
+    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else ["AAPL", "TSLA"]
+
+    channel = ClientChannel(websocket, symbol_list)
+    await market_hub.register(channel)
+    sender = asyncio.create_task(channel.run())
+    receiver = asyncio.create_task(websocket.receive_text())
     try:
-        await connect_to_alpaca(websocket, symbol_list)
+        # Ends when the client disconnects or a send to it fails
+        while True:
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                break
+            receiver.result()  # Raises WebSocketDisconnect once the client is gone
+            receiver = asyncio.create_task(websocket.receive_text())
     except WebSocketDisconnect:
-        clients.remove(websocket)
+        pass
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        await market_hub.unregister(channel)
+
+@router.get("/hub")
+def get_hub_stats():
+    """Upstream connection state and per-symbol subscriber counts."""
+    return market_hub.stats()
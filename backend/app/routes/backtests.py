@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.config import settings
+from app.schemas import BacktestRequest
+from app.services.backtest_engine import check_grid, load_price_matrix, run_backtest, sweep
+from app.services.downsample import lttb
+import numpy as np
+
+router = APIRouter()
+
+@router.post("")
+@router.post("/")
+def run_backtests(request: BacktestRequest, db: Session = Depends(get_db)):
+    """
+    Backtest a strategy over stored daily closes.
+
+    Scalar `params` run a single backtest and return its metrics plus an equity curve.
+    Any list-valued parameter turns the request into a grid sweep evaluated across a
+    process pool; the `top` results by Sharpe ratio are returned.
+    """
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="No symbols provided.")
+    try:
+        check_grid(request.strategy, request.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    requested = list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
+    matrix = load_price_matrix(db, requested, request.start_date, request.end_date, request.source)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="No historical prices found for the requested symbols.")
+    symbols = matrix.symbols
+    # Symbols without stored prices are left out of the run and reported back
+    missing = [symbol for symbol in requested if symbol not in symbols]
+
+    costs = dict(
+        commission_bps=request.commission_bps,
+        slippage_bps=request.slippage_bps,
+        initial_capital=request.initial_capital,
+    )
+    try:
+        if not any(isinstance(value, list) for value in request.params.values()):
+            result = run_backtest(matrix, request.strategy, request.params, equity_curve=True, **costs)
+        else:
+            results = sweep(matrix, request.strategy, request.params, **costs)
+            return {
+                "strategy": request.strategy,
+                "symbols": symbols,
+                "missing": missing,
+                "combinations": len(results),
+                "results": results[:request.top],
+            }
+    except (TypeError, ValueError) as e:
+        # Unknown keyword for the signal function, or a value it cannot use
+        raise HTTPException(status_code=400, detail=f"Invalid params for {request.strategy}: {e}")
+
+    equity = result.pop("equity")
+    keep = lttb(np.arange(len(equity), dtype=np.float64), equity, settings.BACKTEST_MAX_EQUITY_POINTS)
+    result["equity_curve"] = {
+        "dates": [str(date) for date in matrix.dates[keep]],
+        "equity": equity[keep].tolist(),
+    }
+    return {"strategy": request.strategy, "symbols": symbols, "missing": missing, **result}
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.database import get_db
-from app.models import StockPrice
+from datetime import datetime, timedelta
+from app.database import get_db, get_async_db, SessionLocal
+from app.models import StockPrice, Bar, HistoricalPrice
 from app.config import settings
-from app.services.yahoo_service import YahooFinanceService
-from app.services.alpaca_service import AlpacaService
+from app.services.yahoo_service import YahooFinanceService, YAHOO_SOURCE
+from app.services.alpaca_service import AlpacaService, ALPACA_SOURCE
+from app.services.bar_builder import TIMEFRAMES
+from app.services.downsample import downsample, METHODS
+from app.services.coverage import backfill_missing_ranges
+from app.services.response_cache import response_cache
+from app.services.arrow_export import negotiate_format, pyarrow_available, stream_rows, MEDIA_TYPES
+import numpy as np
 import logging
 
 router = APIRouter()
@@ -19,135 +29,339 @@ def get_yahoo_service(db: Session = Depends(get_db)):
     return YahooFinanceService(db=db)
 
 def get_alpaca_service(db: Session = Depends(get_db)):
-    """Provides an instance of AlpacaService with a DB session."""
-    return AlpacaService(db=db, api_key=settings.ALPACA_API_KEY, secret_key=settings.ALPACA_SECRET_KEY)
+    """Provides an AlpacaService with a DB session, backed by the shared pooled clients."""
+    return AlpacaService(db=db)
+
+def group_series(rows, series: dict = None):
+    """
+    Append (symbol, timestamp, price) rows to per-symbol (timestamps, prices) lists.
+
+    Args:
+        rows (iterable): Tuples of (symbol, timestamp, price), ordered by timestamp per symbol.
+        series (dict): Series to extend, e.g. across chunks of a streamed result.
+
+    Returns:
+        dict: {symbol: ([timestamps], [prices])}
+    """
+    series = {} if series is None else series
+    for symbol, timestamp, price in rows:
+        if timestamp is None or price is None:
+            continue
+        timestamps, prices = series.setdefault(symbol, ([], []))
+        timestamps.append(timestamp)
+        prices.append(price)
+    return series
+
+def series_response(series: dict, max_points: int = None, method: str = "lttb"):
+    """
+    Decimate grouped series and format them for the chart widgets.
+
+    Args:
+        series (dict): Output of `group_series`.
+        max_points (int): Optional per-symbol point budget.
+        method (str): Downsampling method ("lttb" or "minmax").
+
+    Returns:
+        dict: {symbol: {"timestamps": [...], "prices": [...]}}
+    """
+    response = {}
+    for symbol, (timestamps, prices) in series.items():
+        if max_points is not None and len(prices) > max_points:
+            x = np.fromiter((ts.timestamp() for ts in timestamps), dtype=np.float64, count=len(timestamps))
+            keep = downsample(x, np.asarray(prices, dtype=np.float64), max_points, method)
+            timestamps = [timestamps[i] for i in keep]
+            prices = [prices[i] for i in keep]
+        response[symbol] = {
+            "timestamps": [ts.strftime("%Y-%m-%d") for ts in timestamps],
+            "prices": prices,
+        }
+    return response
+
+def build_series_response(rows, max_points: int = None, method: str = "lttb"):
+    """Group (symbol, timestamp, price) rows into per-symbol series, decimating each one."""
+    return series_response(group_series(rows), max_points, method)
+
+def validate_downsampling(method: str):
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"Unsupported downsampling method '{method}'")
+
+def response_format(request: Request, format: str = None):
+    """Resolve json/arrow/parquet from the `format` parameter or the Accept header."""
+    try:
+        resolved = negotiate_format(request.headers.get("accept"), format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resolved != "json" and not pyarrow_available():
+        raise HTTPException(status_code=406, detail="Arrow/Parquet responses require pyarrow on the server")
+    return resolved
+
+def columnar_response(build_query, columns: list, format: str, filename: str):
+    """
+    Stream a query's rows as Arrow IPC or Parquet without building JSON or Python dicts.
+
+    `build_query(db)` is called with a session owned by the response body, since the
+    body is produced after the request's dependencies have been torn down.
+    """
+    def body():
+        db = SessionLocal()
+        try:
+            yield from stream_rows(build_query(db).yield_per(10000), columns, format)
+        finally:
+            db.close()
+
+    extension = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
+
+# Column layouts of the columnar responses (name, kind)
+HISTORICAL_COLUMNS = [
+    ("symbol", "string"), ("date", "datetime"), ("open", "float"), ("high", "float"),
+    ("low", "float"), ("close", "float"), ("volume", "int"), ("source", "string"),
+]
+STOCK_PRICE_COLUMNS = [
+    ("symbol", "string"), ("timestamp", "datetime"), ("price", "float"), ("open", "float"),
+    ("high", "float"), ("low", "float"), ("close", "float"), ("volume", "int"),
+]
+BAR_COLUMNS = [
+    ("symbol", "string"), ("timeframe", "string"), ("start", "datetime"), ("open", "float"), ("high", "float"),
+    ("low", "float"), ("close", "float"), ("volume", "int"), ("vwap", "float"), ("trade_count", "int"),
+]
+
+def _columns(model, layout):
+    return [getattr(model, name) for name, _ in layout]
 
 @router.get("/historical/")
-def fetch_and_store_historical_data(
+async def fetch_and_store_historical_data(
+    request: Request,
     symbols: str = Query(..., description="Comma-separated list of ticker symbols (e.g., 'AAPL,MSFT')"),
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
     force_refresh: bool = Query(False, description="Force refetching of data from APIs"),
+    max_points: int = Query(None, ge=3, description="Downsample each symbol's series to at most this many points"),
+    method: str = Query("lttb", description="Downsampling method: 'lttb' or 'minmax'"),
+    format: str = Query(None, description="json (default), arrow or parquet; also negotiated via Accept"),
     db: Session = Depends(get_db),
     yahoo_service: YahooFinanceService = Depends(get_yahoo_service),
     alpaca_service: AlpacaService = Depends(get_alpaca_service),
 ):
     """
     Fetch historical data for given symbols and date range.
-    Checks the database first; fetches missing data from external APIs if needed.
+    Checks the coverage index first; fetches only the missing sub-ranges from external APIs.
 
     Args:
         symbols (str): Comma-separated list of stock symbols.
         start_date (str): Start date in YYYY-MM-DD format.
         end_date (str): End date in YYYY-MM-DD format.
         force_refresh (bool): If True, ignores cached data and refetches.
+        max_points (int): Optional per-symbol point budget for the response.
+        method (str): Downsampling method used when `max_points` is set.
+        format (str): Response format. Arrow/Parquet return every stored OHLCV row
+            (all sources, no downsampling) as a columnar stream.
 
     Returns:
         dict: A dictionary containing dates and prices for each symbol.
     """
-    try:
-        # Parse input symbols and date range
-        symbol_list = [s.strip().upper() for s in symbols.split(",")]
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-
-        # Query database for existing data
-        db_data = (
-            db.query(StockPrice)
-            .filter(StockPrice.symbol.in_(symbol_list))
-            .filter(StockPrice.timestamp >= start, StockPrice.timestamp <= end)
-            .all()
-        )
-
-        # Organize existing data by symbol
-        existing_data = {symbol: [] for symbol in symbol_list}
-        for record in db_data:
-            existing_data[record.symbol].append(record)
+    validate_downsampling(method)
+    fmt = response_format(request, format)
 
-        # Determine missing symbols
-        missing_symbols = [symbol for symbol in symbol_list if force_refresh or not existing_data[symbol]]
+    def load():
+        try:
+            # Parse input symbols and date range
+            symbol_list = [s.strip().upper() for s in symbols.split(",")]
+            start = datetime.strptime(start_date, "%Y-%m-%d")
+            end = datetime.strptime(end_date, "%Y-%m-%d")
 
-        fetched_data = []
-        if missing_symbols:
-            logger.info(f"Fetching data for missing symbols: {missing_symbols}")
+            backfill_missing_ranges(
+                db, symbol_list, start, end,
+                [(YAHOO_SOURCE, yahoo_service), (ALPACA_SOURCE, alpaca_service)],
+                force_refresh,
+            )
 
-            # Fetch data from external APIs
-            yahoo_data = yahoo_service.fetch_historical_data(missing_symbols, (start_date, end_date))
-            alpaca_data = alpaca_service.fetch_historical_data(missing_symbols, (start_date, end_date))
+            if fmt != "json":
+                return columnar_response(
+                    lambda session: (
+                        session.query(*_columns(HistoricalPrice, HISTORICAL_COLUMNS))
+                        .filter(HistoricalPrice.symbol.in_(symbol_list))
+                        .filter(HistoricalPrice.date >= start, HistoricalPrice.date < end + timedelta(days=1))
+                        .order_by(HistoricalPrice.symbol, HistoricalPrice.date)
+                    ),
+                    HISTORICAL_COLUMNS, fmt, f"historical_{start_date}_{end_date}",
+                )
 
-            # Merge and store fetched data
-            fetched_data = yahoo_data + alpaca_data
-            db.bulk_save_objects(fetched_data)
-            db.commit()
-            logger.info(f"Saved {len(fetched_data)} new records to database.")
+            # Serve the range from the database, one close per symbol and day
+            rows = (
+                db.query(HistoricalPrice.symbol, HistoricalPrice.date, HistoricalPrice.close)
+                .filter(HistoricalPrice.symbol.in_(symbol_list))
+                .filter(HistoricalPrice.date >= start, HistoricalPrice.date < end + timedelta(days=1))
+                .order_by(HistoricalPrice.date, HistoricalPrice.source)
+                .all()
+            )
+            seen = set()
+            daily_rows = []
+            for symbol, date, close in rows:
+                key = (symbol, date.date())
+                if key not in seen:
+                    seen.add(key)
+                    daily_rows.append((symbol, date, close))
 
-        # Combine database and fetched data
-        all_data = db_data + fetched_data
-        response = {}
-        for record in all_data:
-            if record.symbol not in response:
-                response[record.symbol] = {"timestamps": [], "prices": []}
-            response[record.symbol]["timestamps"].append(record.timestamp.strftime("%Y-%m-%d"))
-            response[record.symbol]["prices"].append(record.close)
+            return build_series_response(daily_rows, max_points, method)
 
-        return response
+        except Exception as e:
+            logger.error(f"Error fetching historical data: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error fetching historical data: {str(e)}")
 
-    except Exception as e:
-        logger.error(f"Error fetching historical data: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error fetching historical data: {str(e)}")
+    if fmt != "json":
+        return await run_in_threadpool(load)
+    # force_refresh recomputes (and re-stores) the entry; `format` only selects the branch above
+    return await response_cache.respond(
+        request, "charts:historical", load, settings.CHART_CACHE_TTL,
+        list_params=("symbols",), exclude=("force_refresh", "format"), refresh=force_refresh,
+    )
 
 @router.get("/{symbol}")
-def get_chart_data(symbol: str, db: Session = Depends(get_db)):
+async def get_chart_data(request: Request, symbol: str, db: AsyncSession = Depends(get_async_db)):
     """
     Fetch historical chart data for a given stock symbol from the database.
 
     Args:
         symbol (str): Stock symbol to fetch chart data for.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): Async database session.
 
     Returns:
         dict: Dictionary containing dates and prices for the stock symbol.
     """
-    try:
-        historical_data = (
-            db.query(StockPrice)
-            .filter(StockPrice.symbol == symbol)
-            .order_by(StockPrice.timestamp.desc())
-            .limit(100)  # Fetch the latest 100 records
-            .all()
+    async def load():
+        try:
+            historical_data = (await db.execute(
+                select(StockPrice.timestamp, StockPrice.close)
+                .filter(StockPrice.symbol == symbol)
+                .order_by(StockPrice.timestamp.desc())
+                .limit(100)  # Fetch the latest 100 records
+            )).all()
+
+            if not historical_data:
+                raise HTTPException(status_code=404, detail=f"No data found for symbol: {symbol}")
+
+            return {
+                "symbol": symbol,
+                "dates": [data.timestamp.strftime("%Y-%m-%d") for data in historical_data],
+                "prices": [data.close for data in historical_data],
+            }
+
+        except Exception as e:
+            logger.error(f"Error retrieving chart data for {symbol}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error retrieving chart data: {str(e)}")
+
+    return await response_cache.respond(request, "charts:latest", load, settings.CHART_LIVE_CACHE_TTL)
+
+@router.get("/{symbol}/bars")
+async def get_bars(
+    request: Request,
+    symbol: str,
+    timeframe: str = Query("1m", description=f"Bar interval, one of {', '.join(TIMEFRAMES)}"),
+    start: datetime = Query(None, description="Inclusive start of the range (UTC)"),
+    end: datetime = Query(None, description="Exclusive end of the range (UTC)"),
+    limit: int = Query(5000, ge=1, le=100000, description="Maximum number of bars (most recent first when truncated)"),
+    format: str = Query(None, description="json (default), arrow or parquet; also negotiated via Accept"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Fetch closed OHLCV + VWAP bars aggregated from the live trade stream.
+
+    Args:
+        symbol (str): Stock symbol to fetch bars for.
+        timeframe (str): Bar interval.
+        start (datetime): Optional range start.
+        end (datetime): Optional range end.
+        limit (int): Maximum number of bars returned.
+
+    Returns:
+        dict: Column arrays of bar data in ascending time order.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe '{timeframe}'")
+    fmt = response_format(request, format)
+
+    def bar_filter(query):
+        query = query.filter(Bar.symbol == symbol.upper(), Bar.timeframe == timeframe)
+        if start is not None:
+            query = query.filter(Bar.start >= start)
+        if end is not None:
+            query = query.filter(Bar.start < end)
+        return query
+
+    if fmt != "json":
+        # Full range in ascending order; `limit` only applies to JSON responses
+        return columnar_response(
+            lambda session: bar_filter(session.query(*_columns(Bar, BAR_COLUMNS))).order_by(Bar.start),
+            BAR_COLUMNS, fmt, f"bars_{symbol.upper()}_{timeframe}",
         )
 
-        if not historical_data:
-            raise HTTPException(status_code=404, detail=f"No data found for symbol: {symbol}")
+    async def load():
+        try:
+            bars = (await db.execute(bar_filter(select(Bar)).order_by(Bar.start.desc()).limit(limit))).scalars().all()
+            bars.reverse()
 
-        return {
-            "symbol": symbol,
-            "dates": [data.timestamp.strftime("%Y-%m-%d") for data in historical_data],
-            "prices": [data.close for data in historical_data],
-        }
+            return {
+                "symbol": symbol.upper(),
+                "timeframe": timeframe,
+                "timestamps": [bar.start.isoformat() for bar in bars],
+                "open": [bar.open for bar in bars],
+                "high": [bar.high for bar in bars],
+                "low": [bar.low for bar in bars],
+                "close": [bar.close for bar in bars],
+                "volume": [bar.volume for bar in bars],
+                "vwap": [bar.vwap for bar in bars],
+            }
+        except Exception as e:
+            logger.error(f"Error retrieving bars for {symbol}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error retrieving bars: {str(e)}")
 
-    except Exception as e:
-        logger.error(f"Error retrieving chart data for {symbol}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving chart data: {str(e)}")
+    return await response_cache.respond(
+        request, "charts:bars", load, settings.CHART_LIVE_CACHE_TTL, exclude=("format",)
+    )
 
 @router.get("/")
 @router.get("")
-def get_all_charts(db: Session = Depends(get_db)):
+async def get_all_charts(
+    request: Request,
+    max_points: int = Query(None, ge=3, description="Downsample each symbol's series to at most this many points"),
+    method: str = Query("lttb", description="Downsampling method: 'lttb' or 'minmax'"),
+    format: str = Query(None, description="json (default), arrow or parquet; also negotiated via Accept"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Fetch chart data for all symbols in the database.
     """
-    try:
-        symbols_data = db.query(StockPrice).all()
-
-        response = {}
-        for record in symbols_data:
-            if record.symbol not in response:
-                response[record.symbol] = {"timestamps": [], "prices": []}
-            response[record.symbol]["timestamps"].append(record.timestamp.strftime("%Y-%m-%d"))
-            response[record.symbol]["prices"].append(record.close)
-
-        return response
-    except Exception as e:
-        logger.error(f"Error retrieving all chart data: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving all chart data: {str(e)}")
-    
\ No newline at end of file
+    validate_downsampling(method)
+    fmt = response_format(request, format)
+    if fmt != "json":
+        return columnar_response(
+            lambda session: (
+                session.query(*_columns(StockPrice, STOCK_PRICE_COLUMNS))
+                .order_by(StockPrice.symbol, StockPrice.timestamp)
+            ),
+            STOCK_PRICE_COLUMNS, fmt, "stock_prices",
+        )
+
+    async def load():
+        try:
+            result = await db.stream(
+                select(StockPrice.symbol, StockPrice.timestamp, StockPrice.close)
+                .order_by(StockPrice.symbol, StockPrice.timestamp)
+                .execution_options(yield_per=10000)
+            )
+            series = {}
+            async for rows in result.partitions():
+                group_series(rows, series)
+            return series_response(series, max_points, method)
+        except Exception as e:
+            logger.error(f"Error retrieving all chart data: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error retrieving all chart data: {str(e)}")
+
+    return await response_cache.respond(
+        request, "charts:all", load, settings.CHART_CACHE_TTL, exclude=("format",)
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.alpaca_service import AlpacaService
@@ -48,9 +48,25 @@ router = APIRouter()
 #     yahoo_service.fetch_historical_data(symbols, start_date, end_date)
 #     return {"message": "Historical data fetched and saved successfully."}
 
-@router.post("/real-time")
-def fetch_real_time(symbols: list[str], db: Session = Depends(get_db)):
-    yahoo_service = YahooFinanceService(db)
-    yahoo_service.fetch_real_time_data(symbols)
-    return {"message": "Real-time data fetched and saved successfully."}
-    
\ No newline at end of file
+# Disabled: blocking per-symbol yfinance lookups on the request path; this router is
+# mounted only for /stats
+# @router.post("/real-time")
+# def fetch_real_time(symbols: list[str], db: Session = Depends(get_db)):
+#     yahoo_service = YahooFinanceService(db)
+#     yahoo_service.fetch_real_time_data(symbols)
+#     return {"message": "Real-time data fetched and saved successfully."}
+
+@router.get("/stats")
+def get_stream_stats(request: Request):
+    """
+    Queue depth, batch size and flush latency counters for the tick ingestion path.
+    Workers that are not the ingest leader report their tick subscription instead.
+    """
+    leader = getattr(request.app.state, "leader", None)
+    streaming_service = getattr(request.app.state, "streaming_service", None)
+    if streaming_service is not None:
+        return {**streaming_service.stats(), "leader": leader.stats() if leader else None}
+    tick_subscriber = getattr(request.app.state, "tick_subscriber", None)
+    if leader is None or tick_subscriber is None:
+        raise HTTPException(status_code=503, detail="Streaming service is not running")
+    return {"leader": leader.stats(), "subscriber": tick_subscriber.stats()}
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
-import requests
+from fastapi import APIRouter, HTTPException, Request
+import httpx
 from app.config import settings
+from app.services.clients import clients
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
@@ -8,7 +10,7 @@ ALPACA_NEWS_URL = "https://data.alpaca.markets/v1beta1/news"
 
 @router.get("")
 @router.get("/")
-async def get_market_news(symbols: str = None):
+async def get_market_news(request: Request, symbols: str = None):
     headers = {
         "APCA-API-KEY-ID": settings.ALPACA_API_KEY,
         "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY
@@ -16,11 +18,22 @@ async def get_market_news(symbols: str = None):
     
     params = {}
     if symbols:
-        params["symbols"] = symbols  # Filter news by tickers
+        # Filter news by tickers, in the same canonical form the cache key uses
+        params["symbols"] = ",".join(sorted({s.strip().upper() for s in symbols.split(",") if s.strip()}))
 
-    response = requests.get(ALPACA_NEWS_URL, headers=headers, params=params)
-    
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch news")
+    async def fetch_news():
+        # Non-blocking request over the shared keep-alive pool
+        try:
+            response = await clients.get_http().get(ALPACA_NEWS_URL, headers=headers, params=params)
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Failed to fetch news: {e}")
+
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail="Failed to fetch news")
+
+        return response.json()
 
-    return response.json()
+    # Identical widget polls share one upstream call and revalidate with If-None-Match
+    return await response_cache.respond(
+        request, "news", fetch_news, settings.NEWS_CACHE_TTL, list_params=("symbols",)
+    )
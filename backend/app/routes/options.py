@@ -1,25 +1,186 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Option
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_async_db
+from app.models import Option, HistoricalPrice
 from app.schemas import OptionSchema
+from app.services.options_analytics import analyze_chain, volatility_surface
+from app.services.response_cache import response_cache
+import numpy as np
 
 router = APIRouter()
 
+# Expiration dates are stored at midnight; contracts stop trading at the 4pm New York close
+EXPIRY_CLOSE = timedelta(hours=20)
+SECONDS_PER_YEAR = 365.0 * 86400
+
+
+def _json_floats(values):
+    """Array -> list with NaN as None (JSON has no NaN)."""
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+async def latest_snapshot(db: AsyncSession, symbol: str):
+    """Timestamp of the most recent option chain ingested for a symbol."""
+    snapshot = (await db.execute(select(func.max(Option.timestamp)).where(Option.symbol == symbol))).scalar()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No option chain snapshot for {symbol}")
+    return snapshot
+
+
+async def load_chain(db: AsyncSession, symbol: str, snapshot, expiration: date = None):
+    """
+    Load a chain snapshot as arrays and run the analytics over it.
+
+    The underlying is marked at the latest daily close at or before the snapshot,
+    which the same Yahoo download stored, so the result depends on the snapshot only.
+
+    Returns:
+        tuple: (spot, rows, arrays, analytics) with rows as (expiration_date,
+        option_type, volume, open_interest, implied_volatility) tuples.
+    """
+    spot = (await db.execute(
+        select(HistoricalPrice.close)
+        .where(HistoricalPrice.symbol == symbol, HistoricalPrice.date <= snapshot, HistoricalPrice.close.is_not(None))
+        .order_by(HistoricalPrice.date.desc())
+        .limit(1)
+    )).scalar()
+    if spot is None:
+        raise HTTPException(status_code=404, detail=f"No underlying price for {symbol} at {snapshot.isoformat()}")
+
+    query = (
+        select(Option.expiration_date, Option.option_type, Option.strike_price, Option.bid_price, Option.ask_price,
+               Option.last_price, Option.volume, Option.open_interest, Option.implied_volatility)
+        .where(Option.symbol == symbol, Option.timestamp == snapshot, Option.expiration_date > snapshot - EXPIRY_CLOSE)
+        .order_by(Option.expiration_date, Option.strike_price, Option.option_type)
+    )
+    if expiration is not None:
+        day = datetime.combine(expiration, datetime.min.time())
+        query = query.where(Option.expiration_date >= day, Option.expiration_date < day + timedelta(days=1))
+    rows = (await db.execute(query)).all()
+
+    columns = list(zip(*rows)) if rows else [()] * 9
+    arrays = {
+        "t": np.array([(expiry + EXPIRY_CLOSE - snapshot).total_seconds() / SECONDS_PER_YEAR for expiry in columns[0]]),
+        "is_call": np.array([option_type == "call" for option_type in columns[1]], dtype=bool),
+        **{
+            name: np.array(values, dtype=float)  # None -> NaN
+            for name, values in zip(("strike", "bid", "ask", "last"), columns[2:6])
+        },
+    }
+    analytics = analyze_chain(
+        arrays["strike"], arrays["t"], arrays["is_call"], arrays["bid"], arrays["ask"], arrays["last"],
+        spot, settings.OPTIONS_RISK_FREE_RATE, settings.OPTIONS_DIVIDEND_YIELD,
+    )
+    rows = [(row[0], row[1], row[6], row[7], row[8]) for row in rows]
+    return spot, rows, arrays, analytics
+
+
+@router.get("/options/{symbol}/chain")
+async def get_option_chain(
+    request: Request,
+    symbol: str,
+    expiration: date = Query(None, description="Only contracts expiring on this date"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Latest option chain snapshot for a symbol with marks, implied volatility and Greeks.
+
+    IV is re-solved from each contract's mark (Yahoo's figure is kept as
+    `yahoo_iv`); vega is per volatility point and theta per calendar day.
+    Responses are cached per snapshot, so a new ingest is served immediately.
+
+    Args:
+        symbol (str): Underlying symbol.
+        expiration (date): Optional expiration filter.
+        db (AsyncSession): Async database session.
+
+    Returns:
+        dict: Snapshot metadata and one entry per contract.
+    """
+    symbol = symbol.upper()
+    snapshot = await latest_snapshot(db, symbol)
+
+    async def load():
+        spot, rows, arrays, analytics = await load_chain(db, symbol, snapshot, expiration)
+        strikes = arrays["strike"].tolist()
+        quotes = {name: _json_floats(arrays[name]) for name in ("bid", "ask", "last")}
+        fields = {name: _json_floats(values) for name, values in analytics.items()}
+        contracts = [
+            {
+                "expiration": expiry.date().isoformat(),
+                "option_type": option_type,
+                "strike": strikes[i],
+                **{name: values[i] for name, values in quotes.items()},
+                "volume": volume,
+                "open_interest": open_interest,
+                "yahoo_iv": yahoo_iv,
+                **{name: values[i] for name, values in fields.items()},
+            }
+            for i, (expiry, option_type, volume, open_interest, yahoo_iv) in enumerate(rows)
+        ]
+        return {
+            "symbol": symbol,
+            "snapshot": snapshot.isoformat(),
+            "spot": spot,
+            "rate": settings.OPTIONS_RISK_FREE_RATE,
+            "dividend_yield": settings.OPTIONS_DIVIDEND_YIELD,
+            "contracts": contracts,
+        }
+
+    return await response_cache.respond(request, f"options:chain:{snapshot.isoformat()}", load, settings.OPTIONS_CACHE_TTL)
+
+
+@router.get("/options/{symbol}/surface")
+async def get_volatility_surface(request: Request, symbol: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Implied volatility surface (maturity x strike) of the latest chain snapshot.
+
+    Each cell is the re-solved IV of the out-of-the-money contract at that strike,
+    falling back to the in-the-money one; cells with no quote are null.
+
+    Args:
+        symbol (str): Underlying symbol.
+        db (AsyncSession): Async database session.
+
+    Returns:
+        dict: expirations, maturities (years), strikes and an iv grid indexed [expiration][strike].
+    """
+    symbol = symbol.upper()
+    snapshot = await latest_snapshot(db, symbol)
+
+    async def load():
+        spot, rows, arrays, analytics = await load_chain(db, symbol, snapshot)
+        maturities, strikes, grid = volatility_surface(arrays["strike"], arrays["t"], arrays["is_call"], analytics["iv"], spot)
+        expirations = {t: row[0].date().isoformat() for t, row in zip(arrays["t"].tolist(), rows)}
+        return {
+            "symbol": symbol,
+            "snapshot": snapshot.isoformat(),
+            "spot": spot,
+            "expirations": [expirations[t] for t in maturities.tolist()],
+            "maturities": maturities.tolist(),
+            "strikes": strikes.tolist(),
+            "iv": [_json_floats(row) for row in grid],
+        }
+
+    return await response_cache.respond(request, f"options:surface:{snapshot.isoformat()}", load, settings.OPTIONS_CACHE_TTL)
+
 @router.get("/options", response_model=list[OptionSchema])
-def get_options(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+async def get_options(skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve all options from the database.
     """
-    options = db.query(Option).offset(skip).limit(limit).all()
+    options = (await db.execute(select(Option).offset(skip).limit(limit))).scalars().all()
     return options
 
 @router.get("/options/{option_id}", response_model=OptionSchema)
-def read_option(option_id: int, db: Session = Depends(get_db)):
+async def read_option(option_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve a specific option by ID.
     """
-    option = db.query(Option).filter(Option.id == option_id).first()
+    option = await db.get(Option, option_id)
     if option is None:
         raise HTTPException(status_code=404, detail="Option not found")
     return option
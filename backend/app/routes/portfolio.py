@@ -1,24 +1,225 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime
+from app.config import settings
+from app.database import SessionLocal
 from app.models import Stock, StockPrice, Option, Trade, Portfolio, Earnings, KeyMetrics, HistoricalPrice, RealTimePrice
+from app.services.pnl_engine import pnl_engine
+import asyncio
+import enum
+import json
+import time
 
 router = APIRouter()
 
+# Response sections and the tables behind them
+SECTIONS = {
+    "stocks": Stock,
+    "stock_prices": StockPrice,
+    "options": Option,
+    "trades": Trade,
+    "portfolio": Portfolio,
+    "earnings": Earnings,
+    "key_metrics": KeyMetrics,
+    "historical_prices": HistoricalPrice,
+    "real_time_prices": RealTimePrice,
+}
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+def parse_sections(sections: str):
+    if not sections:
+        return list(SECTIONS)
+    requested = [s.strip() for s in sections.split(",") if s.strip()]
+    unknown = [s for s in requested if s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections {unknown}, expected any of {list(SECTIONS)}")
+    return requested
+
+def parse_cursor(cursor: str):
+    """Parse 'section:last_id,section:last_id' into {section: last_id}."""
+    if not cursor:
+        return {}
+    try:
+        positions = {}
+        for part in cursor.split(","):
+            section, last_id = part.split(":")
+            positions[section.strip()] = int(last_id)
+        return positions
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Malformed cursor, expected 'section:last_id,...'")
+
+def iter_section(db, model, after_id: int, limit: int):
+    """
+    Yield one keyset page of a table as plain dicts, ordered by id.
+
+    Uses `yield_per` so rows are pulled from a server-side cursor in chunks instead
+    of being materialized all at once.
+    """
+    query = db.query(*model.__table__.columns).order_by(model.id)
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+    for row in query.limit(limit).yield_per(settings.PORTFOLIO_FETCH_SIZE):
+        yield row._asdict()
+
+def stream_portfolio(section_names: list, positions: dict, limit: int, ndjson: bool):
+    """
+    Stream the requested sections as a JSON object or NDJSON lines.
+
+    The response ends with a `next_cursor` for the sections whose page was full; pass
+    it back as `cursor` to fetch the next page of those sections only. Owns its DB session, since it runs
+    after the request's dependencies have been torn down.
+    """
+    db = SessionLocal()
+    try:
+        next_positions = {}
+        if not ndjson:
+            yield "{"
+        for index, section in enumerate(section_names):
+            if not ndjson:
+                yield f'{"," if index else ""}{json.dumps(section)}:['
+            count, last_id = 0, None
+            for row in iter_section(db, SECTIONS[section], positions.get(section), limit):
+                if ndjson:
+                    yield _dumps({"section": section, "data": row}) + "\n"
+                else:
+                    yield ("," if count else "") + _dumps(row)
+                count += 1
+                last_id = row["id"]
+            if count == limit:
+                next_positions[section] = last_id
+            if not ndjson:
+                yield "]"
+
+        next_cursor = ",".join(f"{section}:{last_id}" for section, last_id in next_positions.items()) or None
+        if ndjson:
+            yield _dumps({"next_cursor": next_cursor}) + "\n"
+        else:
+            yield f',"next_cursor":{json.dumps(next_cursor)}}}'
+    finally:
+        db.close()
+
 @router.get("")
 @router.get("/")
-def get_portfolio(db: Session = Depends(get_db)):
-    """
-    Returns all relevant financial data for the portfolio, grouped by type.
-    """
-    return {
-        "stocks": db.query(Stock).all(),
-        "stock_prices": db.query(StockPrice).all(),
-        "options": db.query(Option).all(),
-        "trades": db.query(Trade).all(),
-        "portfolio": db.query(Portfolio).all(),
-        "earnings": db.query(Earnings).all(),
-        "key_metrics": db.query(KeyMetrics).all(),
-        "historical_prices": db.query(HistoricalPrice).all(),
-        "real_time_prices": db.query(RealTimePrice).all(),
-    }
+def get_portfolio(
+    request: Request,
+    sections: str = Query(None, description=f"Comma-separated sections to include (default: all of {', '.join(SECTIONS)})"),
+    limit: int = Query(settings.PORTFOLIO_PAGE_SIZE, ge=1, le=settings.PORTFOLIO_MAX_PAGE_SIZE, description="Rows per section"),
+    cursor: str = Query(None, description="Keyset cursor ('section:last_id,...') from a previous response's next_cursor"),
+    format: str = Query(None, description="'json' (default) or 'ndjson'; also negotiated via the Accept header"),
+):
+    """
+    Returns relevant financial data for the portfolio, grouped by type.
+
+    Each section is one keyset page ordered by id, streamed from a server-side cursor
+    so memory stays flat regardless of table size. A cursor names only the sections
+    that have more rows, so with a cursor the response is limited to those.
+    """
+    section_names = parse_sections(sections)
+    positions = parse_cursor(cursor)
+    unknown = [section for section in positions if section not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown cursor sections {unknown}")
+    if cursor:
+        # Sections missing from the cursor were exhausted on an earlier page
+        section_names = [section for section in section_names if section in positions]
+
+    if format is None:
+        format = "ndjson" if NDJSON_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        stream_portfolio(section_names, positions, limit, ndjson),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+    )
+
+@router.get("/pnl")
+def get_pnl():
+    """
+    Live per-position market value, unrealized P&L and day change, with portfolio
+    totals and long/short/gross/net exposure, marked to the latest streamed prices.
+    """
+    return pnl_engine.snapshot()
+
+@router.post("/pnl/reload")
+def reload_pnl():
+    """Reload positions from the portfolio table after it changes."""
+    pnl_engine.reload()
+    return pnl_engine.snapshot()
+
+def pnl_updates(interval: float):
+    """
+    Coalesced P&L updates: the full snapshot first, then at most one delta per interval
+    holding only the positions that moved, the symbols no longer held (`removed`) and
+    the totals, or None while idle.
+    """
+    async def updates():
+        snapshot = pnl_engine.snapshot()
+        version = snapshot["version"]
+        yield "snapshot", snapshot
+        while True:
+            await asyncio.sleep(interval)
+            if pnl_engine.version == version:
+                yield None, None
+                continue
+            delta = pnl_engine.snapshot(version)
+            version = delta["version"]
+            yield "delta", delta
+    return updates()
+
+@router.get("/pnl/stream")
+async def stream_pnl(
+    request: Request,
+    interval: float = Query(settings.PNL_STREAM_INTERVAL, ge=settings.QUOTES_SSE_MIN_INTERVAL, description="Seconds between updates"),
+):
+    """
+    Server-Sent Events stream of live P&L: a `snapshot` event, then `delta` events
+    with the changed and removed positions and current totals.
+    """
+    async def events():
+        last_sent = time.monotonic()
+        async for event, payload in pnl_updates(interval):
+            if await request.is_disconnected():
+                break
+            if event is not None:
+                yield f"event: {event}\ndata: {_dumps(payload)}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= settings.QUOTES_SSE_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws/pnl")
+async def pnl_websocket(websocket: WebSocket, interval: float = settings.PNL_STREAM_INTERVAL):
+    """WebSocket variant of /pnl/stream; each message is {"event": ..., "data": ...}."""
+    await websocket.accept()
+    interval = max(interval, settings.QUOTES_SSE_MIN_INTERVAL)
+    receiver = asyncio.create_task(websocket.receive_text())
+    try:
+        async for event, payload in pnl_updates(interval):
+            if receiver.done():
+                receiver.result()  # Raises WebSocketDisconnect once the client is gone
+                receiver = asyncio.create_task(websocket.receive_text())
+            if event is not None:
+                await websocket.send_text(_dumps({"event": event, "data": payload}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
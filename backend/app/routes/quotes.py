@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.quote_store import quote_store
+import asyncio
+import json
+import time
+
+router = APIRouter()
+
+def parse_symbols(symbols: str):
+    if not symbols:
+        return None
+    return [s.strip().upper() for s in symbols.split(",") if s.strip()]
+
+@router.get("")
+@router.get("/")
+def get_quotes(symbols: str = Query(None, description="Comma-separated list of ticker symbols (default: all)")):
+    """
+    Latest trade, best bid/ask, sizes and day OHLC per symbol, served from memory.
+
+    Symbols with no data since startup map to null.
+    """
+    return quote_store.get(parse_symbols(symbols))
+
+@router.get("/stream")
+async def stream_quotes(
+    request: Request,
+    symbols: str = Query(None, description="Comma-separated list of ticker symbols (default: all)"),
+    interval: float = Query(settings.QUOTES_SSE_INTERVAL, ge=settings.QUOTES_SSE_MIN_INTERVAL, description="Seconds between updates"),
+):
+    """
+    Server-Sent Events stream of quote snapshots.
+
+    Sends a `snapshot` event with the current state, then at most one `delta` event
+    per interval containing only the symbols that changed, however many ticks arrived
+    in between. A comment line is sent as a keep-alive while nothing changes.
+    """
+    symbol_list = parse_symbols(symbols)
+
+    async def events():
+        version = quote_store.version
+        yield f"event: snapshot\ndata: {json.dumps(quote_store.get(symbol_list))}\n\n"
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            await asyncio.sleep(interval)
+            version, changed = quote_store.changed_since(version, symbol_list)
+            if changed:
+                yield f"event: delta\ndata: {json.dumps(changed)}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= settings.QUOTES_SSE_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
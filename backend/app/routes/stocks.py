@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from app.services.alpaca_service import AlpacaService
+from app.services.asset_universe import asset_universe
+from app.config import settings
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Stock  # SQLAlchemy model
@@ -13,18 +14,25 @@ def read_stocks(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
     stocks = db.query(Stock).offset(skip).limit(limit).all()
     return stocks
 
+@router.get("/search")
+def search_stocks(
+    query: str = Query(..., description="Symbol or company name search query"),
+    limit: int = Query(20, ge=1, le=settings.ASSET_SEARCH_MAX_LIMIT, description="Maximum number of results"),
+):
+    """
+    Search for stock symbols that match the query, best match first.
+
+    Served from the cached, indexed asset universe (declared before `/{stock_id}`
+    so the path is not captured by it).
+    """
+    try:
+        return asset_universe.search(query, limit)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Asset universe unavailable: {e}")
+
 @router.get("/{stock_id}", response_model=StockSchema)
 def read_stock(stock_id: int, db: Session = Depends(get_db)):
     stock = db.query(Stock).filter(Stock.id == stock_id).first()
     if stock is None:
         raise HTTPException(status_code=404, detail="Stock not found")
     return stock
-
-@router.get("/search")
-def search_stocks(query: str = Query(..., description="Stock symbol search query"), db: Session = Depends(get_db)):
-    """
-    Search for stock symbols that match the query.
-    """
-    alpaca_service = AlpacaService(db)
-    results = alpaca_service.search_symbols(query)
-    return results
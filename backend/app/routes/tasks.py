@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Optional
 from app.database import get_db
-from app.services.yahoo_service import YahooFinanceService
-from app.services.alpaca_service import AlpacaService
+from app.services.yahoo_service import YahooFinanceService, expiration_window
+from app.services.job_queue import job_queue, QueueFull
+from app.services import ingest_jobs  # Registers the ingestion job handlers
+from app.services.sweep_runner import sweep_runner, job_progress, RESULT_FIELDS
+from app.models import SweepJob, SweepResult
+from app.schemas import BacktestRequest
 from app.config import settings
 from pydantic import BaseModel
 
@@ -11,36 +17,50 @@ router = APIRouter()
 class SymbolsRequest(BaseModel):
     symbols: list[str]
 
-@router.post("/yahoo/historical")
-def fetch_yahoo_historical(request: SymbolsRequest, db: Session = Depends(get_db)):
-    """
-    Fetch historical stock data from Yahoo Finance for given symbols.
-    """
-    if not request.symbols:
-        raise HTTPException(status_code=400, detail="No symbols provided.")
-    
-    yahoo_service = YahooFinanceService(db)
+class HistoricalRequest(SymbolsRequest):
+    start_date: Optional[str] = None  # YYYY-MM-DD, default one year ago
+    end_date: Optional[str] = None  # YYYY-MM-DD, default today
+
+def date_params(start_date: str = None, end_date: str = None, days: int = 365):
+    """Validate YYYY-MM-DD bounds, defaulting to the last `days` days."""
     try:
-        # Pass the actual list of symbols to the service
-        yahoo_service.fetch_historical_data(request.symbols)
-        return {"message": f"Historical data for {', '.join(request.symbols)} has been fetched and stored."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching Yahoo Finance data: {e}")
+        end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.utcnow()
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else end - timedelta(days=days)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format.")
+    return {"start_date": start.strftime("%Y-%m-%d"), "end_date": end.strftime("%Y-%m-%d")}
 
-@router.post("/yahoo/options")
-def fetch_yahoo_options(symbols: list[str], db: Session = Depends(get_db)):
-    """
-    Fetch options data from Yahoo Finance for given symbols.
-    """
+def enqueue(kind: str, symbols: list, params: dict, response: Response):
     if not symbols:
         raise HTTPException(status_code=400, detail="No symbols provided.")
-    
-    yahoo_service = YahooFinanceService(db)
     try:
-        yahoo_service.fetch_historical_data(symbols)  # Includes options fetching
-        return {"message": f"Options data for {', '.join(symbols)} has been fetched and stored."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching Yahoo Finance options data: {e}")
+        job = job_queue.enqueue(kind, symbols, params)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Job queue is full: {e}")
+    response.headers["Location"] = f"/api/tasks/{job['id']}"
+    return job
+
+@router.post("/yahoo/historical", status_code=202)
+def fetch_yahoo_historical(request: HistoricalRequest, response: Response):
+    """
+    Queue a Yahoo Finance historical (and options) fetch for the given symbols.
+
+    Returns the job immediately; poll `GET /api/tasks/{id}` for progress. Symbols
+    already being fetched by another job are listed under `deduplicated`.
+    """
+    return enqueue("yahoo_historical", request.symbols, date_params(request.start_date, request.end_date), response)
+
+@router.post("/yahoo/options", status_code=202)
+def fetch_yahoo_options(symbols: list[str], response: Response):
+    """
+    Queue a Yahoo Finance options fetch for the given symbols.
+
+    Chains are fetched for expirations from today through OPTIONS_EXPIRATION_DAYS
+    ahead, together with the last week of closes that mark the underlying.
+    """
+    expiration_start, expiration_end = expiration_window()
+    params = {**date_params(days=7), "expiration_start": expiration_start, "expiration_end": expiration_end}
+    return enqueue("yahoo_options", symbols, params, response)
 
 @router.post("/yahoo/realtime")
 def fetch_yahoo_realtime_data(request: SymbolsRequest, db: Session = Depends(get_db)):
@@ -57,20 +77,12 @@ def fetch_yahoo_realtime_data(request: SymbolsRequest, db: Session = Depends(get
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching real-time data: {e}")
 
-@router.post("/alpaca/historical")
-def fetch_alpaca_historical(symbols: list[str], start_date: str, end_date: str, db: Session = Depends(get_db)):
+@router.post("/alpaca/historical", status_code=202)
+def fetch_alpaca_historical(symbols: list[str], start_date: str, end_date: str, response: Response):
     """
-    Fetch historical stock data from Alpaca for given symbols and date range.
+    Queue an Alpaca historical fetch for the given symbols and date range.
     """
-    if not symbols:
-        raise HTTPException(status_code=400, detail="No symbols provided.")
-    
-    alpaca_service = AlpacaService(db, settings.ALPACA_API_KEY, settings.ALPACA_SECRET_KEY)
-    try:
-        alpaca_service.fetch_historical_data(symbols, start_date, end_date)
-        return {"message": f"Historical data for {', '.join(symbols)} has been fetched and stored."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching Alpaca historical data: {e}")
+    return enqueue("alpaca_historical", symbols, date_params(start_date, end_date), response)
 
 # @router.post("/tasks/alpaca/realtime")
 # def fetch_alpaca_realtime(symbols: list[str], db: Session = Depends(get_db)):
@@ -94,3 +106,91 @@ def fetch_alpaca_options(symbols: list[str], db: Session = Depends(get_db)):
     """
     # Add the implementation for Alpaca options data fetching when ready
     return {"message": "Options data fetching from Alpaca is not implemented yet."}
+
+@router.post("/sweeps", status_code=202)
+def create_sweep(request: BacktestRequest, db: Session = Depends(get_db)):
+    """
+    Queue a parameter sweep; list-valued `params` form the grid.
+
+    Returns immediately with the job; poll `/sweeps/{id}` for progress and read
+    `/sweeps/{id}/results` as results stream in.
+    """
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="No symbols provided.")
+
+    job_settings = dict(
+        start_date=request.start_date.isoformat() if request.start_date else None,
+        end_date=request.end_date.isoformat() if request.end_date else None,
+        source=request.source,
+        commission_bps=request.commission_bps,
+        slippage_bps=request.slippage_bps,
+        initial_capital=request.initial_capital,
+    )
+    try:
+        job = sweep_runner.create_job(db, request.strategy, request.symbols, request.params, job_settings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job_progress(job)
+
+@router.get("/sweeps/{job_id}")
+def get_sweep(job_id: int, db: Session = Depends(get_db)):
+    """Status, progress and throughput of a sweep job."""
+    job = db.get(SweepJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sweep job not found.")
+    return job_progress(job)
+
+@router.get("/sweeps/{job_id}/results")
+def get_sweep_results(
+    job_id: int,
+    limit: int = Query(100, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Results evaluated so far, best Sharpe ratio first."""
+    job = db.get(SweepJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sweep job not found.")
+
+    results = (
+        db.query(SweepResult)
+        .filter(SweepResult.job_id == job_id)
+        .order_by(SweepResult.sharpe.desc().nulls_last(), SweepResult.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return {
+        "job": job_progress(job),
+        "results": [
+            {"params": result.params, **{field: getattr(result, field) for field in RESULT_FIELDS}}
+            for result in results
+        ],
+    }
+
+@router.get("/refresh")
+def get_refresh_schedule(request: Request):
+    """Next and last post-close refresh of the watchlist and default tickers."""
+    scheduler = getattr(request.app.state, "refresh_scheduler", None)
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Refresh scheduler is not running.")
+    return scheduler.stats()
+
+@router.post("/refresh", status_code=202)
+def run_refresh(request: Request):
+    """Queue the post-close incremental backfill and options refresh now."""
+    scheduler = getattr(request.app.state, "refresh_scheduler", None)
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Refresh scheduler is not running.")
+    try:
+        return {"jobs": scheduler.refresh()}
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Job queue is full: {e}")
+
+@router.get("/{job_id}")
+def get_task(job_id: str):
+    """Status, per-symbol progress and throughput of an ingestion job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 # Stock schemas
 class StockBase(BaseModel):
@@ -57,3 +57,16 @@ class Portfolio(PortfolioBase):
         
 class SymbolsRequest(BaseModel):
     symbols: List[str]
+
+# Backtest schemas
+class BacktestRequest(BaseModel):
+    symbols: List[str]
+    strategy: str = "sma_crossover"  # Key of backtest_engine.SIGNALS
+    params: Dict[str, Union[float, bool, List[float]]] = {}  # Lists are swept as a grid
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    source: Optional[str] = None  # Restrict to one HistoricalPrice source
+    commission_bps: float = 0.0
+    slippage_bps: float = 0.0
+    initial_capital: float = 100_000.0
+    top: int = 20  # Results returned from a sweep
@@ -1,75 +1,63 @@
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.live import StockDataStream
-from alpaca.trading.client import TradingClient
-from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 from datetime import datetime, timedelta
 import logging
-import numpy as np
 from sqlalchemy.orm import Session
-from app.models import HistoricalPrice
+from app.services.upsert import upsert_historical_prices
+from app.services.columnar import frame_to_rows, FLOAT, INT, DATETIME, STRING
+from app.services.asset_universe import asset_universe
+from app.services.clients import clients
+from app.config import settings
 
 logger = logging.getLogger("AlpacaService")
 
+# HistoricalPrice.source for rows written by this service
+ALPACA_SOURCE = "Alpaca"
+
+# Column spec for the columnar bars DataFrame -> HistoricalPrice row conversion
+BAR_COLUMNS = {
+    "symbol": ("symbol", STRING),
+    "date": ("timestamp", DATETIME),
+    "open": ("open", FLOAT),
+    "high": ("high", FLOAT),
+    "low": ("low", FLOAT),
+    "close": ("close", FLOAT),
+    "volume": ("volume", INT),
+}
+
 class AlpacaService:
-    def __init__(self, db: Session, api_key: str, secret_key: str):
-        self.data_client = StockHistoricalDataClient(
-            api_key=api_key,
-            secret_key=secret_key,
-        )
-        self.trading_client = TradingClient(
-            api_key=api_key,
-            secret_key=secret_key,
-        )
+    def __init__(self, db: Session, api_key: str = None, secret_key: str = None):
+        if api_key in (None, settings.ALPACA_API_KEY) and secret_key in (None, settings.ALPACA_SECRET_KEY):
+            # Shared, pooled clients for the configured account
+            self.data_client = clients.alpaca_data
+            self.trading_client = clients.alpaca_trading
+        else:
+            from alpaca.data.historical import StockHistoricalDataClient
+            from alpaca.trading.client import TradingClient
+
+            self.data_client = StockHistoricalDataClient(
+                api_key=api_key,
+                secret_key=secret_key,
+            )
+            self.trading_client = TradingClient(
+                api_key=api_key,
+                secret_key=secret_key,
+            )
         self.logger = logging.getLogger("AlpacaService")
         self.db = db
+        self.failed_symbols = set()  # Symbols whose last fetch errored (as opposed to returning no data)
 
-    @staticmethod
-    def safe_convert(value, target_type, default=None):
+    def search_symbols(self, query: str, limit: int = 20):
         """
-        Safely convert a value to a specified type, handling NumPy types.
+        Ranked stock symbol suggestions from the cached Alpaca asset universe.
 
         Args:
-            value: The value to convert.
-            target_type: The type to convert to (e.g., float, int).
-            default: The default value to return if conversion fails.
+            query (str): Search term matched against symbols and company names.
+            limit (int): Maximum number of results.
 
         Returns:
-            Converted value in target_type or default if conversion fails.
+            list: Matching assets as {"symbol", "name", "exchange"} dicts, best first.
         """
         try:
-            if value is None or isinstance(value, (list, dict)):  # Ensure value is not a complex type
-                return default
-            
-            # Handle NumPy numeric types
-            if isinstance(value, (np.float64, np.float32, np.int64, np.int32)):
-                value = value.item()  # Convert NumPy types to Python native
-
-            return target_type(value)
-        except (ValueError, TypeError):
-            return default
-
-    def search_symbols(self, query: str):
-        """
-        Fetch stock symbol suggestions from Alpaca using TradingClient.
-
-        Args:
-            query (str): Search term for stock symbols.
-
-        Returns:
-            list: A list of matching stock symbols and their names.
-        """
-        try:
-            # Use TradingClient to fetch all tradable assets
-            assets = self.trading_client.get_all_assets(status="active")
-
-            # Filter the results based on the query
-            matching_assets = [
-                {"symbol": asset.symbol, "name": asset.name}
-                for asset in assets if query.upper() in asset.symbol
-            ]
-
-            return matching_assets
+            return asset_universe.search(query, limit)
         except Exception as e:
             self.logger.error(f"Error searching symbols: {e}")
             return []
@@ -83,9 +71,13 @@ class AlpacaService:
             date_range (tuple): Tuple containing start_date and end_date in YYYY-MM-DD format.
 
         Returns:
-            List of StockPrice objects to be inserted into the database.
+            list: The `HistoricalPrice` row dicts that were upserted into the database.
         """
+        from alpaca.data.requests import StockBarsRequest
+        from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+
         start_date, end_date = date_range  # Unpack tuple
+        self.failed_symbols = set()
 
         try:
             logger.info(f"📊 Fetching Alpaca historical data for {symbols} from {start_date} to {end_date}...")
@@ -103,25 +95,20 @@ class AlpacaService:
                 logger.warning(f"⚠️ No historical data found for {symbols}.")
                 return []
 
-            # Convert DataFrame into StockPrice objects
-            stock_prices = []
-            for symbol in symbols:
-                if symbol in bars.index:
-                    for _, row in bars.loc[symbol].iterrows():
-                        stock_prices.append(HistoricalPrice(
-                            symbol=symbol,
-                            date=row.name.to_pydatetime(),
-                            open=self.safe_convert(row["open"], float),
-                            high=self.safe_convert(row["high"], float),
-                            low=self.safe_convert(row["low"], float),
-                            close=self.safe_convert(row["close"], float),
-                            volume=self.safe_convert(row["volume"], int),
-                            timestamp=datetime.utcnow(),
-                            source="Alpaca"
-                        ))
+            # Convert the (symbol, timestamp)-indexed DataFrame into HistoricalPrice rows, column-wise
+            bars = bars.reset_index()
+            bars = bars[bars["symbol"].isin(symbols)]
+            stock_prices = frame_to_rows(
+                bars, BAR_COLUMNS, constants={"timestamp": datetime.utcnow(), "source": ALPACA_SOURCE}
+            )
 
+            # One set-based upsert instead of per-row existence checks
+            upsert_historical_prices(self.db, stock_prices)
+            self.db.commit()
             return stock_prices
         except Exception as e:
             logger.error(f"❌ Error fetching Alpaca historical data: {e}")
+            self.db.rollback()
+            self.failed_symbols = set(symbols)
             return []
         
\ No newline at end of file
@@ -0,0 +1,135 @@
+import io
+import logging
+from app.config import settings
+
+logger = logging.getLogger("ArrowExport")
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Response formats and the media types that select them via the Accept header
+FORMATS = {
+    "json": ("application/json",),
+    "arrow": (ARROW_STREAM_MEDIA_TYPE, "application/vnd.apache.arrow.file"),
+    "parquet": (PARQUET_MEDIA_TYPE, "application/x-parquet"),
+}
+MEDIA_TYPES = {"json": "application/json", "arrow": ARROW_STREAM_MEDIA_TYPE, "parquet": PARQUET_MEDIA_TYPE}
+
+
+def negotiate_format(accept: str, format: str = None):
+    """
+    Pick the response format from an explicit `format` parameter or the Accept header.
+
+    Returns:
+        str: "json", "arrow" or "parquet".
+
+    Raises:
+        ValueError: If an explicit format is unknown.
+    """
+    if format is not None:
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format '{format}', expected one of {list(FORMATS)}")
+        return format
+    accept = (accept or "").lower()
+    for name in ("arrow", "parquet"):
+        if any(media_type in accept for media_type in FORMATS[name]):
+            return name
+    return "json"
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _schema(columns: list):
+    import pyarrow as pa
+
+    types = {"string": pa.string(), "float": pa.float64(), "int": pa.int64(), "datetime": pa.timestamp("us")}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _record_batches(rows, schema, batch_size: int):
+    """Group row tuples into Arrow RecordBatches of at most `batch_size` rows."""
+    import pyarrow as pa
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= batch_size:
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)], schema=schema
+            )
+            chunk = []
+    if chunk:
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)], schema=schema
+        )
+
+
+def stream_rows(rows, columns: list, format: str, batch_size: int = settings.ARROW_BATCH_SIZE):
+    """
+    Encode row tuples as an Arrow IPC stream or a Parquet file, yielding bytes as each batch is written.
+
+    Args:
+        rows (iterable): Row tuples, typically straight from a `yield_per` query.
+        columns (list): (name, kind) pairs matching the tuple layout; kind is
+            "string", "float", "int" or "datetime".
+        format (str): "arrow" or "parquet".
+        batch_size (int): Rows per record batch / Parquet row group.
+
+    Yields:
+        bytes: Encoded chunks of the response body.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _schema(columns)
+    sink = _ChunkSink()
+    if format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression=settings.PARQUET_COMPRESSION)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for batch in _record_batches(rows, schema, batch_size):
+            if format == "parquet":
+                writer.write_batch(batch, row_group_size=batch_size)
+            else:
+                writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
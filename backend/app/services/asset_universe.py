@@ -0,0 +1,200 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+import numpy as np
+from app.config import settings
+from app.services.clients import clients
+
+logger = logging.getLogger("AssetUniverse")
+
+TOKEN_PATTERN = re.compile(r"[A-Z0-9]+")
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefix_ranks(keys: list, ranks: np.ndarray, prefix: str):
+    """Ranks stored alongside the sorted `keys` that start with `prefix`."""
+    return ranks[bisect_left(keys, prefix):bisect_left(keys, prefix + "\uffff")]
+
+
+class AssetIndex:
+    """
+    Immutable search index over an asset universe.
+
+    - Symbols, full names and name words are kept in sorted arrays, so prefix
+      lookups are a pair of binary searches (the flat-array equivalent of a trie).
+    - A trigram inverted index over "SYMBOL NAME" answers substring queries by
+      intersecting posting sets and verifying the few survivors.
+
+    Matches are ranked in tiers: exact symbol, symbol prefix, name prefix, name word
+    prefix, substring; within a tier shorter symbols come first. Each tier yields a
+    NumPy array of asset ranks, so picking the best `limit` is an argpartition rather
+    than a Python loop, and lower tiers are skipped once the result is full. Results
+    are memoized per (query, limit), since type-ahead boxes repeat short prefixes.
+    """
+
+    def __init__(self, assets: list):
+        # Asset position == rank: shorter symbols first, then alphabetical
+        self.assets = sorted(assets, key=lambda asset: (len(asset["symbol"]), asset["symbol"]))
+        symbols = [asset["symbol"] for asset in self.assets]
+        names = [(asset.get("name") or "").upper() for asset in self.assets]
+        self.texts = [f"{symbol} {name}" for symbol, name in zip(symbols, names)]
+        self.exact = {symbol: rank for rank, symbol in enumerate(symbols)}
+
+        def sorted_keys(pairs):
+            pairs = sorted(pairs)
+            return [key for key, _ in pairs], np.array([rank for _, rank in pairs], dtype=np.int64)
+
+        self.symbols, self.symbol_ranks = sorted_keys((symbol, rank) for rank, symbol in enumerate(symbols))
+        self.names, self.name_ranks = sorted_keys((name, rank) for rank, name in enumerate(names) if name)
+        self.words, self.word_ranks = sorted_keys(
+            (word, rank) for rank, name in enumerate(names) for word in set(TOKEN_PATTERN.findall(name))
+        )
+
+        trigrams = {}
+        for rank, text in enumerate(self.texts):
+            for gram in _trigrams(text):
+                trigrams.setdefault(gram, []).append(rank)
+        self.trigrams = {gram: np.array(ranks, dtype=np.int64) for gram, ranks in trigrams.items()}
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.assets)
+
+    def _substring_ranks(self, query: str):
+        if len(query) < 3:
+            return np.empty(0, dtype=np.int64)
+        postings = sorted((self.trigrams.get(gram) for gram in _trigrams(query)), key=lambda p: 0 if p is None else len(p))
+        if postings[0] is None:
+            return np.empty(0, dtype=np.int64)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return np.array([rank for rank in candidates.tolist() if query in self.texts[rank]], dtype=np.int64)
+
+    def _ranked(self, query: str, limit: int):
+        """Ranks of the best `limit` matches, tier by tier."""
+        selected = []
+        if query in self.exact:
+            selected.append(self.exact[query])
+
+        tiers = (
+            lambda: _prefix_ranks(self.symbols, self.symbol_ranks, query),
+            lambda: _prefix_ranks(self.names, self.name_ranks, query),
+            lambda: _prefix_ranks(self.words, self.word_ranks, query),
+            lambda: self._substring_ranks(query),
+        )
+        for tier in tiers:
+            remaining = limit - len(selected)
+            if remaining <= 0:
+                break
+            ranks = np.unique(tier())  # Sorted, so already best first
+            if selected:
+                ranks = ranks[~np.isin(ranks, selected)]
+            selected.extend(ranks[:remaining].tolist())
+        return selected[:limit]
+
+    def search(self, query: str, limit: int = 20):
+        """
+        Ranked assets matching a symbol or name query.
+
+        Args:
+            query (str): Free text (case-insensitive).
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: Asset dicts, best match first.
+        """
+        query = query.strip().upper()
+        if not query:
+            return []
+
+        key = (query, limit)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        results = [self.assets[rank] for rank in self._ranked(query, limit)]
+
+        with self._cache_lock:
+            self._cache[key] = results
+            if len(self._cache) > settings.ASSET_SEARCH_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return results
+
+
+class AssetUniverse:
+    """
+    TTL-cached asset universe from Alpaca, refreshed in the background.
+
+    The first search blocks until the initial load finishes; afterwards a stale
+    index keeps serving while a background thread builds and swaps in a new one.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl or settings.ASSET_CACHE_TTL
+        self.index = None
+        self.loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self):
+        from alpaca.trading.requests import GetAssetsRequest
+        from alpaca.trading.enums import AssetClass, AssetStatus
+
+        assets = clients.alpaca_trading.get_all_assets(GetAssetsRequest(status=AssetStatus.ACTIVE, asset_class=AssetClass.US_EQUITY))
+        return [
+            {"symbol": asset.symbol, "name": asset.name, "exchange": getattr(asset.exchange, "value", asset.exchange)}
+            for asset in assets if asset.tradable
+        ]
+
+    def load(self):
+        """Fetch the universe and swap in a freshly built index, unless another caller just did."""
+        with self._load_lock:
+            if self.index is not None and time.monotonic() - self.loaded_at < self.ttl:
+                return
+            started = time.perf_counter()
+            index = AssetIndex(self._fetch())
+            self.index, self.loaded_at = index, time.monotonic()
+            logger.info(f"✅ Indexed {len(index)} assets in {time.perf_counter() - started:.2f}s")
+
+    def _refresh_in_background(self):
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def refresh():
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"❌ Error refreshing asset universe: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="asset-universe", daemon=True).start()
+
+    def start(self):
+        """Warm the cache without blocking startup."""
+        self._refresh_in_background()
+
+    def get_index(self):
+        if self.index is None:
+            self.load()  # Blocks (or waits for the warm-up load) only before the first index exists
+        elif time.monotonic() - self.loaded_at > self.ttl:
+            self._refresh_in_background()
+        return self.index
+
+    def search(self, query: str, limit: int = 20):
+        return self.get_index().search(query, limit)
+
+
+# Process-wide universe backing /api/stocks/search
+asset_universe = AssetUniverse()
@@ -0,0 +1,433 @@
+import inspect
+import itertools
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import HistoricalPrice
+
+logger = logging.getLogger("BacktestEngine")
+
+TRADING_DAYS = 252
+
+
+class PriceMatrix:
+    """
+    Dense (time x symbol) close matrix.
+
+    Rows are the union of trading dates across the universe, columns follow `symbols`.
+    Gaps after a symbol's first bar are forward-filled; before it they stay NaN, which
+    the engine treats as "not tradable yet".
+    """
+
+    def __init__(self, dates: np.ndarray, symbols: list, close: np.ndarray, returns: np.ndarray = None):
+        self.dates = dates
+        self.symbols = symbols
+        self.close = close
+        self.returns = simple_returns(close) if returns is None else returns
+
+
+# Matrix arrays that are placed in shared memory for pool workers
+SHARED_ARRAYS = ("close", "returns")
+
+
+class SharedPriceMatrix:
+    """
+    A `PriceMatrix` copied once into `multiprocessing.shared_memory`.
+
+    `descriptor` is a small picklable handle (block names, shapes, dtypes); workers
+    map the same pages with `attach_matrix` instead of receiving a pickled copy.
+    Use as a context manager so the blocks are unlinked when the sweep ends.
+    """
+
+    def __init__(self, matrix: PriceMatrix):
+        self.blocks = []
+        self.descriptor = {"dates": matrix.dates, "symbols": matrix.symbols, "arrays": {}}
+        try:
+            for name in SHARED_ARRAYS:
+                array = getattr(matrix, name)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self.blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+                self.descriptor["arrays"][name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_matrix(descriptor: dict):
+    """
+    Map a `SharedPriceMatrix` descriptor back into a zero-copy `PriceMatrix`.
+
+    Returns:
+        tuple: (PriceMatrix, blocks) - keep the blocks referenced while the matrix is in use.
+    """
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in descriptor["arrays"].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return PriceMatrix(descriptor["dates"], descriptor["symbols"], arrays["close"], arrays["returns"]), blocks
+
+
+def forward_fill(values: np.ndarray):
+    """Column-wise forward fill of NaNs without a Python loop over rows."""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = values[index, np.arange(values.shape[1])]
+    # Leading NaNs point at row 0, which is only valid if the column starts there
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def simple_returns(close: np.ndarray):
+    """Bar-over-bar returns with the first row (and untradable cells) set to 0."""
+    returns = np.zeros_like(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[1:] = close[1:] / close[:-1] - 1
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+
+def _preferred_sources(rows: list):
+    """
+    Pick one source per symbol from (symbol, source) pairs.
+
+    Sources rank by BACKTEST_SOURCE_PREFERENCE, then by name, so mixing adjusted
+    (Yahoo) and raw (Alpaca) closes in one series cannot happen and the choice is
+    the same on every run.
+    """
+    preference = {source: rank for rank, source in enumerate(settings.BACKTEST_SOURCE_PREFERENCE)}
+    chosen = {}
+    for symbol, source in rows:
+        rank = (preference.get(source, len(preference)), source)
+        if symbol not in chosen or rank < chosen[symbol]:
+            chosen[symbol] = rank
+    return {symbol: rank[1] for symbol, rank in chosen.items()}
+
+
+def load_price_matrix(db: Session, symbols: list, start: datetime = None, end: datetime = None, source: str = None):
+    """
+    Load daily closes for a universe into a `PriceMatrix` with one query.
+
+    Symbols without any stored close are left out of the matrix rather than added as
+    empty columns, which would be averaged in as flat sleeves; callers can compare
+    `matrix.symbols` with what they asked for.
+
+    Args:
+        db (Session): Database session.
+        symbols (list): Ticker symbols (columns, in this order; duplicates are ignored).
+        start (datetime): Optional first date.
+        end (datetime): Optional last date.
+        source (str): Optional data source filter; otherwise each symbol uses its most
+            preferred stored source (BACKTEST_SOURCE_PREFERENCE).
+
+    Returns:
+        PriceMatrix: Matrix of closes, or None if no data was found.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    query = db.query(HistoricalPrice.symbol, HistoricalPrice.date, HistoricalPrice.close, HistoricalPrice.source).filter(
+        HistoricalPrice.symbol.in_(symbols), HistoricalPrice.close.isnot(None)
+    )
+    if start:
+        query = query.filter(HistoricalPrice.date >= start)
+    if end:
+        query = query.filter(HistoricalPrice.date <= end)
+    if source:
+        query = query.filter(HistoricalPrice.source == source)
+
+    rows = query.all()
+    if not rows:
+        return None
+
+    sources = _preferred_sources({(row.symbol, row.source) for row in rows})
+    rows = [row for row in rows if row.source == sources[row.symbol]]
+    symbols = [symbol for symbol in symbols if symbol in sources]
+
+    row_symbols, row_dates, row_closes, _ = zip(*rows)
+    dates, date_index = np.unique(np.array(row_dates, dtype="datetime64[D]"), return_inverse=True)
+    columns = {symbol: i for i, symbol in enumerate(symbols)}
+    symbol_index = np.fromiter((columns[symbol] for symbol in row_symbols), dtype=np.int64, count=len(rows))
+
+    close = np.full((len(dates), len(symbols)), np.nan)
+    close[date_index, symbol_index] = np.asarray(row_closes, dtype=np.float64)
+    return PriceMatrix(dates, symbols, forward_fill(close))
+
+
+def rolling_mean(close: np.ndarray, window: int):
+    """
+    Trailing moving average via cumulative sums; NaN until `window` bars are available.
+
+    Assumes NaNs only lead each column (as left by `forward_fill`).
+    """
+    means = np.full_like(close, np.nan)
+    if window > len(close):
+        return means
+    sums = np.cumsum(np.nan_to_num(close), axis=0)
+    means[window - 1] = sums[window - 1] / window
+    means[window:] = (sums[window:] - sums[:-window]) / window
+    # A window is complete once its first bar is valid
+    means[window - 1:][np.isnan(close[:len(close) - window + 1])] = np.nan
+    return means
+
+
+# Rolling means of the matrix currently being evaluated, so a sweep computes each
+# window only once. Thread-local because API requests may evaluate concurrently.
+_rolling_cache = threading.local()
+
+
+def _cached_rolling_mean(close, window):
+    if getattr(_rolling_cache, "close", None) is not close:
+        _rolling_cache.close = close
+        _rolling_cache.means = {}
+    if window not in _rolling_cache.means:
+        _rolling_cache.means[window] = rolling_mean(close, window)
+    return _rolling_cache.means[window]
+
+
+def sma_crossover(close: np.ndarray, fast: int = 20, slow: int = 50, allow_short: bool = False):
+    """
+    Long while the fast moving average is above the slow one (short below, if allowed).
+
+    Returns:
+        np.ndarray: Target positions (time x symbol) in {-1, 0, 1}.
+    """
+    fast, slow = int(fast), int(slow)
+    if fast >= slow:
+        return np.zeros_like(close)
+    fast_mean = _cached_rolling_mean(close, fast)
+    slow_mean = _cached_rolling_mean(close, slow)
+    with np.errstate(invalid="ignore"):
+        positions = (fast_mean > slow_mean).astype(np.float64)
+        if allow_short:
+            positions -= fast_mean < slow_mean
+    return positions
+
+
+def momentum(close: np.ndarray, lookback: int = 20, threshold: float = 0.0, allow_short: bool = False):
+    """
+    Long while the trailing `lookback`-bar return exceeds `threshold` (short below -threshold, if allowed).
+
+    Returns:
+        np.ndarray: Target positions (time x symbol) in {-1, 0, 1}.
+    """
+    lookback = int(lookback)
+    trailing = np.full_like(close, np.nan)
+    if lookback < len(close):
+        trailing[lookback:] = close[lookback:] / close[:-lookback] - 1
+    with np.errstate(invalid="ignore"):
+        positions = (trailing > threshold).astype(np.float64)
+        if allow_short:
+            positions -= trailing < -threshold
+    return positions
+
+
+SIGNALS = {
+    "sma_crossover": sma_crossover,
+    "momentum": momentum,
+}
+
+# Window-length parameters of each signal; they must be positive integers
+WINDOW_PARAMS = {
+    "sma_crossover": ("fast", "slow"),
+    "momentum": ("lookback",),
+}
+
+
+def transaction_costs(positions: np.ndarray, commission_bps: float = 0.0, slippage_bps: float = 0.0):
+    """
+    Proportional costs: every unit of position change pays commission plus slippage,
+    both in basis points of traded notional.
+
+    Returns:
+        tuple: (costs as a return drag (time x symbol), turnover (time x symbol))
+    """
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    return turnover * (commission_bps + slippage_bps) / 10_000, turnover
+
+
+def run_backtest(matrix: PriceMatrix, strategy: str, params: dict = None, commission_bps: float = 0.0,
+                 slippage_bps: float = 0.0, initial_capital: float = 100_000.0, equity_curve: bool = False):
+    """
+    Evaluate one parameter set over the whole universe.
+
+    Capital is split equally across symbols; signals computed on a bar's close are
+    traded at the next bar, so positions are lagged by one row.
+
+    Args:
+        matrix (PriceMatrix): Price data.
+        strategy (str): Key of `SIGNALS`.
+        params (dict): Keyword arguments for the signal function.
+        commission_bps (float): Commission in basis points of traded notional.
+        slippage_bps (float): Slippage in basis points of traded notional.
+        initial_capital (float): Starting equity.
+        equity_curve (bool): Include the portfolio equity series in the result.
+
+    Returns:
+        dict: Parameters and performance metrics.
+    """
+    params = params or {}
+    signal = SIGNALS[strategy](matrix.close, **params)
+    signal[np.isnan(matrix.close)] = 0.0
+
+    positions = np.zeros_like(signal)
+    positions[1:] = signal[:-1]
+    costs, turnover = transaction_costs(positions, commission_bps, slippage_bps)
+    symbol_returns = positions * matrix.returns - costs
+    portfolio_returns = symbol_returns.mean(axis=1)
+
+    equity = initial_capital * np.cumprod(1 + portfolio_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    volatility = portfolio_returns.std()
+    years = len(portfolio_returns) / TRADING_DAYS
+    total_return = equity[-1] / initial_capital - 1
+
+    result = {
+        "params": params,
+        "total_return": float(total_return),
+        "cagr": float((1 + total_return) ** (1 / years) - 1) if years > 0 and total_return > -1 else None,
+        "sharpe": float(portfolio_returns.mean() / volatility * np.sqrt(TRADING_DAYS)) if volatility > 0 else None,
+        "max_drawdown": float(drawdown.min()),
+        "trades": int(np.count_nonzero(turnover)),
+        "turnover": float(turnover.sum() / len(matrix.symbols)),
+        "final_equity": float(equity[-1]),
+        "symbol_returns": dict(zip(matrix.symbols, (np.prod(1 + symbol_returns, axis=0) - 1).tolist())),
+    }
+    if equity_curve:
+        result["equity"] = equity
+    return result
+
+
+def parameter_grid(params: dict):
+    """Expand {name: value or [values]} into a list of parameter dicts (cartesian product)."""
+    names = list(params)
+    values = [value if isinstance(value, (list, tuple)) else [value] for value in params.values()]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def check_grid(strategy: str, params: dict):
+    """
+    Validate a strategy and parameter grid before any data is loaded.
+
+    Returns:
+        int: Number of parameter combinations.
+
+    Raises:
+        ValueError: Unknown strategy or parameter, a window parameter that is not a
+            positive integer, or a grid larger than BACKTEST_MAX_COMBINATIONS.
+    """
+    if strategy not in SIGNALS:
+        raise ValueError(f"strategy must be one of {', '.join(SIGNALS)}")
+    accepted = [name for name in inspect.signature(SIGNALS[strategy]).parameters if name != "close"]
+    unknown = [name for name in params if name not in accepted]
+    if unknown:
+        raise ValueError(f"Unknown params {unknown} for {strategy}, expected any of {accepted}")
+    combinations = 1
+    for name, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if name in WINDOW_PARAMS[strategy]:
+            for window in values:
+                if isinstance(window, bool) or not isinstance(window, (int, float)) or not float(window).is_integer() or window < 1:
+                    raise ValueError(f"{name} must be a positive integer, got {window!r}")
+        combinations *= len(values)
+    if combinations > settings.BACKTEST_MAX_COMBINATIONS:
+        raise ValueError(
+            f"{combinations} parameter combinations exceeds the limit of {settings.BACKTEST_MAX_COMBINATIONS}"
+        )
+    return combinations
+
+
+# Price matrix installed once per pool worker instead of being pickled with every task
+_worker_matrix = None
+_worker_blocks = None
+
+
+def _init_worker(descriptor):
+    """Pool initializer: map the sweep's shared-memory matrix into this worker."""
+    global _worker_matrix, _worker_blocks
+    _worker_matrix, _worker_blocks = attach_matrix(descriptor)
+
+
+def _evaluate(matrix, strategy, combinations, commission_bps, slippage_bps, initial_capital):
+    return [
+        run_backtest(matrix, strategy, params, commission_bps, slippage_bps, initial_capital)
+        for params in combinations
+    ]
+
+
+def _evaluate_chunk(strategy, combinations, commission_bps, slippage_bps, initial_capital):
+    """Pool task: evaluate a chunk against the worker's installed matrix."""
+    return _evaluate(_worker_matrix, strategy, combinations, commission_bps, slippage_bps, initial_capital)
+
+
+def iter_sweep(matrix: PriceMatrix, strategy: str, params: dict, commission_bps: float = 0.0,
+               slippage_bps: float = 0.0, initial_capital: float = 100_000.0, max_workers: int = None,
+               chunk_size: int = None):
+    """
+    Evaluate every combination in a parameter grid, yielding results chunk by chunk.
+
+    Large grids are fanned out across a process pool; the matrix is published once in
+    shared memory and every worker maps it without copying. Chunks are yielded as they
+    finish, so callers can persist results and report progress while the sweep runs.
+
+    Args:
+        matrix (PriceMatrix): Price data.
+        strategy (str): Key of `SIGNALS`.
+        params (dict): {name: value or [values]} grid.
+        max_workers (int): Pool size (default: BACKTEST_MAX_WORKERS, or CPU count).
+        chunk_size (int): Combinations per task.
+
+    Yields:
+        list: Result dicts for one chunk of combinations.
+    """
+    combinations = parameter_grid(params)
+    chunk_size = chunk_size or settings.BACKTEST_SWEEP_CHUNK
+    chunks = [combinations[i:i + chunk_size] for i in range(0, len(combinations), chunk_size)]
+
+    if len(chunks) <= 1 or max_workers == 1:
+        for chunk in chunks:
+            yield _evaluate(matrix, strategy, chunk, commission_bps, slippage_bps, initial_capital)
+        return
+
+    max_workers = max_workers or settings.BACKTEST_MAX_WORKERS
+    with SharedPriceMatrix(matrix) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(shared.descriptor,)) as pool:
+            futures = [
+                pool.submit(_evaluate_chunk, strategy, chunk, commission_bps, slippage_bps, initial_capital)
+                for chunk in chunks
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def sweep(matrix: PriceMatrix, strategy: str, params: dict, **kwargs):
+    """
+    Run a whole parameter grid (see `iter_sweep` for arguments).
+
+    Returns:
+        list: One result dict per combination, best Sharpe ratio first.
+    """
+    results = [result for chunk in iter_sweep(matrix, strategy, params, **kwargs) for result in chunk]
+    logger.info(f"✅ Evaluated {len(results)} {strategy} combinations over {len(matrix.symbols)} symbols.")
+    return sorted(results, key=lambda r: r["sharpe"] if r["sharpe"] is not None else float("-inf"), reverse=True)
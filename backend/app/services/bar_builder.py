@@ -0,0 +1,164 @@
+import logging
+from datetime import datetime, timezone
+from app.config import settings
+
+logger = logging.getLogger("BarBuilder")
+
+# Supported bar timeframes, in seconds
+TIMEFRAMES = {
+    "1s": 1,
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+}
+
+# Index layout of an in-progress bar (kept as a list to avoid per-trade object churn)
+_START, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _NOTIONAL, _COUNT = range(8)
+
+
+def _epoch_seconds(timestamp):
+    if timestamp is None:
+        return datetime.now(timezone.utc).timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class BarBuilder:
+    """
+    Incremental OHLCV + VWAP bar aggregation over a trade stream.
+
+    One open bar is kept per (symbol, timeframe). Each trade updates every timeframe's
+    open bar in O(1); when a trade falls into a later bucket the open bar is closed and
+    returned to the caller for persistence. Trades older than the open bar are counted
+    as late and ignored, since the bar they belong to has already been emitted.
+    """
+
+    def __init__(self, timeframes: list = None):
+        timeframes = timeframes or settings.BAR_TIMEFRAMES
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown:
+            raise ValueError(f"Unsupported bar timeframes {unknown}, expected a subset of {list(TIMEFRAMES)}")
+
+        self.timeframes = [(tf, TIMEFRAMES[tf]) for tf in timeframes]
+        self.bars = {}  # (symbol, timeframe) -> in-progress bar
+        self.last_closed = {}  # (symbol, timeframe) -> start of the last bar closed by expiry
+        self.late_trades = 0
+        self.closed_bars = 0
+
+    @staticmethod
+    def _to_row(symbol, timeframe, bar):
+        return dict(
+            symbol=symbol,
+            timeframe=timeframe,
+            start=datetime.fromtimestamp(bar[_START], tz=timezone.utc).replace(tzinfo=None),
+            open=bar[_OPEN],
+            high=bar[_HIGH],
+            low=bar[_LOW],
+            close=bar[_CLOSE],
+            volume=bar[_VOLUME],
+            vwap=bar[_NOTIONAL] / bar[_VOLUME] if bar[_VOLUME] else bar[_CLOSE],
+            trade_count=bar[_COUNT],
+        )
+
+    def update(self, symbol: str, price: float, size: int, timestamp=None):
+        """
+        Fold a trade into every timeframe's open bar for the symbol.
+
+        Args:
+            symbol (str): Trade symbol.
+            price (float): Trade price.
+            size (int): Trade size.
+            timestamp (datetime | float): Trade time (naive datetimes are treated as UTC).
+
+        Returns:
+            list: Row dicts for any bars closed by this trade.
+        """
+        if price is None:
+            return []
+        size = size or 0
+        ts = _epoch_seconds(timestamp)
+        closed = []
+
+        for timeframe, seconds in self.timeframes:
+            start = ts - ts % seconds
+            key = (symbol, timeframe)
+            bar = self.bars.get(key)
+
+            if (bar is not None and start < bar[_START]) or (
+                bar is None and start <= self.last_closed.get(key, -1)
+            ):
+                self.late_trades += 1
+                continue
+
+            if bar is None or start > bar[_START]:
+                if bar is not None:
+                    closed.append(self._to_row(symbol, timeframe, bar))
+                self.bars[key] = [start, price, price, price, price, size, price * size, 1]
+                continue
+
+            if price > bar[_HIGH]:
+                bar[_HIGH] = price
+            if price < bar[_LOW]:
+                bar[_LOW] = price
+            bar[_CLOSE] = price
+            bar[_VOLUME] += size
+            bar[_NOTIONAL] += price * size
+            bar[_COUNT] += 1
+
+        self.closed_bars += len(closed)
+        return closed
+
+    def close_expired(self, now=None, grace: float = settings.BAR_CLOSE_GRACE):
+        """
+        Close bars whose interval ended more than `grace` seconds ago.
+
+        Used to emit bars for symbols that stopped trading instead of waiting for the
+        next print.
+
+        Returns:
+            list: Row dicts for the bars that were closed.
+        """
+        now = _epoch_seconds(now)
+        seconds_by_timeframe = dict(self.timeframes)
+        closed = []
+        for key, bar in list(self.bars.items()):
+            symbol, timeframe = key
+            if bar[_START] + seconds_by_timeframe[timeframe] + grace <= now:
+                closed.append(self._to_row(symbol, timeframe, bar))
+                self.last_closed[key] = bar[_START]
+                del self.bars[key]
+
+        self.closed_bars += len(closed)
+        return closed
+
+    def flush_all(self):
+        """
+        Close every open bar, e.g. on shutdown, so in-progress bars are not lost.
+
+        Bars whose interval has not ended yet are partial; trades for the same interval
+        after a restart start a new partial bar, which the bar upsert merges into the
+        stored one.
+
+        Returns:
+            list: Row dicts for the bars that were closed.
+        """
+        closed = [self._to_row(symbol, timeframe, bar) for (symbol, timeframe), bar in self.bars.items()]
+        self.bars.clear()
+        self.closed_bars += len(closed)
+        return closed
+
+    def current(self, symbol: str, timeframe: str):
+        """The in-progress bar for a symbol and timeframe as a row dict, or None."""
+        bar = self.bars.get((symbol, timeframe))
+        return self._to_row(symbol, timeframe, bar) if bar is not None else None
+
+    def stats(self):
+        return {
+            "timeframes": [tf for tf, _ in self.timeframes],
+            "open_bars": len(self.bars),
+            "closed_bars": self.closed_bars,
+            "late_trades": self.late_trades,
+        }
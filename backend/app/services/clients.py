@@ -0,0 +1,111 @@
+import logging
+import threading
+from typing import TYPE_CHECKING
+import httpx
+from requests.adapters import HTTPAdapter
+from app.config import settings
+
+if TYPE_CHECKING:
+    from alpaca.data.historical import StockHistoricalDataClient
+    from alpaca.trading.client import TradingClient
+
+logger = logging.getLogger("ClientRegistry")
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """requests adapter with a sized keep-alive pool and a default timeout."""
+
+    def __init__(self, timeout: float, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def configure_session(session):
+    """Mount pooled, time-limited adapters on a requests session (e.g. an alpaca-py client's)."""
+    adapter = TimeoutHTTPAdapter(
+        timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_TIMEOUT),
+        pool_connections=settings.HTTP_POOL_SIZE,
+        pool_maxsize=settings.HTTP_POOL_SIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ClientRegistry:
+    """
+    Process-wide upstream clients, created once and shared by every request.
+
+    The alpaca-py REST clients are imported and built lazily on first use with pooled
+    keep-alive sessions (they are thread-safe for concurrent requests), and an
+    `httpx.AsyncClient` serves async handlers such as news. `start()`/`close()` are called from the
+    application lifespan.
+    """
+
+    def __init__(self):
+        self._alpaca_data = None
+        self._alpaca_trading = None
+        self.http = None
+        self._lock = threading.Lock()
+
+    @property
+    def alpaca_data(self) -> "StockHistoricalDataClient":
+        if self._alpaca_data is None:
+            with self._lock:
+                if self._alpaca_data is None:
+                    from alpaca.data.historical import StockHistoricalDataClient
+
+                    client = StockHistoricalDataClient(
+                        api_key=settings.ALPACA_API_KEY, secret_key=settings.ALPACA_SECRET_KEY
+                    )
+                    configure_session(client._session)
+                    self._alpaca_data = client
+        return self._alpaca_data
+
+    @property
+    def alpaca_trading(self) -> "TradingClient":
+        if self._alpaca_trading is None:
+            with self._lock:
+                if self._alpaca_trading is None:
+                    from alpaca.trading.client import TradingClient
+
+                    client = TradingClient(api_key=settings.ALPACA_API_KEY, secret_key=settings.ALPACA_SECRET_KEY)
+                    configure_session(client._session)
+                    self._alpaca_trading = client
+        return self._alpaca_trading
+
+    def start(self):
+        """Create the shared async HTTP client."""
+        if self.http is None:
+            self.http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_POOL_SIZE,
+                    max_keepalive_connections=settings.HTTP_POOL_SIZE,
+                ),
+                timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+            )
+            logger.info(f"🚀 HTTP client pool ready ({settings.HTTP_POOL_SIZE} connections).")
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+        for client in (self._alpaca_data, self._alpaca_trading):
+            if client is not None:
+                client._session.close()
+        self._alpaca_data = self._alpaca_trading = None
+
+    def get_http(self) -> httpx.AsyncClient:
+        """The shared async client (created on demand outside the lifespan, e.g. in scripts)."""
+        if self.http is None:
+            self.start()
+        return self.http
+
+
+# Process-wide registry, started and closed by the lifespan in app.main
+clients = ClientRegistry()
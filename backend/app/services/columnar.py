@@ -0,0 +1,110 @@
+from typing import TYPE_CHECKING
+import numpy as np
+
+# pandas is imported inside the converters: callers already hold a DataFrame, and
+# importing this module (e.g. for the column kinds) should not load it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Column kinds understood by the converters
+FLOAT = "float"
+INT = "int"
+DATETIME = "datetime"
+STRING = "string"
+
+# Index pseudo-column name usable as a source in a column spec
+INDEX = "__index__"
+
+
+def _coerce(values: "pd.Series", kind: str):
+    """
+    Vectorized coercion of a whole column, mirroring `safe_convert` semantics.
+
+    Unparseable values become missing; ints are truncated like `int()`; tz-aware
+    datetimes are converted to naive UTC, which is what the database stored when
+    the aware values were passed to the driver (Yahoo's New York midnight is
+    05:00 or 04:00), so upserts keep matching existing rows.
+    """
+    import pandas as pd
+
+    if kind == FLOAT:
+        return pd.to_numeric(values, errors="coerce").astype("float64")
+    if kind == INT:
+        numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+        numbers[~np.isfinite(numbers)] = np.nan
+        return np.trunc(numbers).astype("Int64")
+    if kind == DATETIME:
+        stamps = pd.to_datetime(values, errors="coerce")
+        if getattr(stamps.dt, "tz", None) is not None:
+            stamps = stamps.dt.tz_convert("UTC").dt.tz_localize(None)
+        return stamps
+    if kind == STRING:
+        return values.astype(str).where(values.notna(), None)
+    raise ValueError(f"Unknown column kind '{kind}'")
+
+
+def _to_python(column: "pd.Series", kind: str):
+    """Convert a coerced column to a list of native Python values with None for missing."""
+    import pandas as pd
+
+    if kind == DATETIME:
+        values = pd.Series(column.dt.to_pydatetime(), index=column.index, dtype=object)
+    else:
+        values = column.astype(object)
+    return values.where(column.notna(), None).tolist()
+
+
+def coerce_frame(frame: "pd.DataFrame", spec: dict, constants: dict = None):
+    """
+    Build a typed DataFrame with the target columns of a conversion spec.
+
+    Args:
+        frame (pd.DataFrame): Source data.
+        spec (dict): {target column: (source column or INDEX, kind)}. Missing source
+            columns produce an all-missing target column.
+        constants (dict): Extra {target column: value} broadcast to every row.
+
+    Returns:
+        pd.DataFrame: One column per target, coerced to its kind.
+    """
+    import pandas as pd
+
+    columns = {}
+    for target, (source, kind) in spec.items():
+        if source == INDEX:
+            raw = pd.Series(frame.index, index=frame.index)
+        elif source in frame.columns:
+            raw = frame[source]
+        else:
+            raw = pd.Series(None, index=frame.index, dtype=object)
+        columns[target] = _coerce(raw, kind)
+
+    coerced = pd.DataFrame(columns, index=frame.index)
+    for target, value in (constants or {}).items():
+        coerced[target] = value
+    return coerced.reset_index(drop=True)
+
+
+def frame_to_rows(frame: "pd.DataFrame", spec: dict, constants: dict = None):
+    """
+    Convert a DataFrame into row dicts ready for bulk INSERT/upsert.
+
+    All type handling happens column-wise; the only per-row step is zipping the
+    already-native column lists into dicts.
+
+    Returns:
+        list: Column dicts, one per row.
+    """
+    if frame is None or frame.empty:
+        return []
+    coerced = coerce_frame(frame, spec)
+    kinds = {target: kind for target, (_, kind) in spec.items()}
+    names = list(coerced.columns)
+    lists = [_to_python(coerced[name], kinds[name]) for name in names]
+
+    for target, value in (constants or {}).items():
+        names.append(target)
+        lists.append([value] * len(coerced))
+
+    return [dict(zip(names, values)) for values in zip(*lists)]
+
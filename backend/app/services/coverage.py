@@ -0,0 +1,174 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from app.models import DataCoverage
+
+logger = logging.getLogger("CoverageIndex")
+
+ONE_DAY = timedelta(days=1)
+
+
+def _day(value):
+    return datetime(value.year, value.month, value.day)
+
+
+def merge_intervals(intervals):
+    """
+    Merge overlapping or adjacent inclusive day intervals.
+
+    Args:
+        intervals (list): (start, end) datetime tuples, in any order.
+
+    Returns:
+        list: Sorted, non-overlapping (start, end) tuples.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start, end, covered):
+    """
+    Return the parts of [start, end] not contained in any covered interval.
+
+    Args:
+        start (datetime): First requested day (inclusive).
+        end (datetime): Last requested day (inclusive).
+        covered (list): Merged, sorted (start, end) tuples.
+
+    Returns:
+        list: Missing (start, end) tuples in ascending order.
+    """
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start - ONE_DAY))
+        cursor = max(cursor, covered_end + ONE_DAY)
+        if cursor > end:
+            break
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+class CoverageIndex:
+    """
+    Per symbol and source, the day ranges of historical data already stored.
+
+    Lets backfills request only the sub-ranges that are actually missing instead of
+    refetching everything whenever any part of a range is absent.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def covered(self, symbol: str, source: str):
+        rows = (
+            self.db.query(DataCoverage.start, DataCoverage.end)
+            .filter(DataCoverage.symbol == symbol, DataCoverage.source == source)
+            .all()
+        )
+        return merge_intervals([(row.start, row.end) for row in rows])
+
+    def missing_ranges(self, symbol: str, source: str, start: datetime, end: datetime):
+        """
+        Day ranges within [start, end] that have not been fetched from the source yet.
+
+        Returns:
+            list: (start, end) datetime tuples, both inclusive.
+        """
+        return subtract_intervals(_day(start), _day(end), self.covered(symbol, source))
+
+    def mark_covered(self, symbol: str, source: str, start: datetime, end: datetime):
+        """
+        Record [start, end] as fetched, merging it with any overlapping or adjacent ranges.
+
+        Ranges reaching today or later are trimmed to yesterday, since the current day's
+        bar is still forming and must be fetched again.
+        """
+        start, end = _day(start), min(_day(end), _day(datetime.utcnow()) - ONE_DAY)
+        if end < start:
+            return
+
+        rows = (
+            self.db.query(DataCoverage)
+            .filter(DataCoverage.symbol == symbol, DataCoverage.source == source)
+            .all()
+        )
+        merged = merge_intervals([(row.start, row.end) for row in rows] + [(start, end)])
+        if len(rows) == len(merged) and all(
+            (row.start, row.end) == interval for row, interval in zip(sorted(rows, key=lambda r: r.start), merged)
+        ):
+            return
+
+        for row in rows:
+            self.db.delete(row)
+        for interval_start, interval_end in merged:
+            self.db.add(DataCoverage(symbol=symbol, source=source, start=interval_start, end=interval_end))
+        self.db.commit()
+
+
+def backfill_missing_ranges(db: Session, symbol_list: list, start: datetime, end: datetime, services: list,
+                            force_refresh: bool = False, batch_size: int = None):
+    """
+    Fetch and store only the day ranges not yet covered for each symbol and source.
+
+    Symbols missing the same sub-range are fetched together (in batches of
+    `batch_size` symbols), and each successfully fetched range is merged into the
+    coverage index so repeat or sliding-window requests only go upstream for the
+    new days.
+
+    Args:
+        db (Session): Database session.
+        symbol_list (list): Symbols to backfill.
+        start (datetime): First day (inclusive).
+        end (datetime): Last day (inclusive).
+        services (list): (source name, service) pairs; each service provides
+            `fetch_historical_data(symbols, (start, end))` and `failed_symbols`.
+        force_refresh (bool): Refetch the whole range regardless of coverage.
+        batch_size (int): Maximum symbols per upstream request (default: unlimited).
+
+    Returns:
+        dict: {"fetches": upstream requests, "rows": Counter per symbol, "failed": set of symbols}
+    """
+    coverage = CoverageIndex(db)
+    summary = {"fetches": 0, "rows": Counter(), "failed": set()}
+
+    for source, service in services:
+        plan = {}
+        for symbol in symbol_list:
+            ranges = [(start, end)] if force_refresh else coverage.missing_ranges(symbol, source, start, end)
+            for missing_range in ranges:
+                plan.setdefault(missing_range, []).append(symbol)
+
+        for (range_start, range_end), range_symbols in plan.items():
+            size = batch_size or len(range_symbols)
+            for i in range(0, len(range_symbols), size):
+                batch = range_symbols[i:i + size]
+                logger.info(f"Fetching {source} data for {batch} from {range_start:%Y-%m-%d} to {range_end:%Y-%m-%d}")
+                # Upstream end dates are exclusive; services upsert what they fetch
+                fetched = service.fetch_historical_data(
+                    batch,
+                    (range_start.strftime("%Y-%m-%d"), (range_end + ONE_DAY).strftime("%Y-%m-%d")),
+                )
+                summary["fetches"] += 1
+                summary["rows"].update(row["symbol"] for row in fetched if "symbol" in row)
+                logger.info(f"Upserted {len(fetched)} {source} records.")
+
+                for symbol in batch:
+                    if symbol in service.failed_symbols:
+                        summary["failed"].add(symbol)
+                    else:
+                        coverage.mark_covered(symbol, source, range_start, range_end)
+
+    return summary
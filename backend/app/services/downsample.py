@@ -0,0 +1,108 @@
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x, y, n_out: int):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, for every bucket in between, the point that
+    forms the largest triangle with the previously selected point and the mean of the
+    next bucket. The per-bucket work is vectorized; only the bucket loop is Python.
+
+    Args:
+        x (np.ndarray): Monotonic x values (e.g. epoch seconds).
+        y (np.ndarray): Values to preserve the visual shape of.
+        n_out (int): Number of points to keep (>= 3).
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Mean point of each bucket, used as the third triangle vertex
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax(y, n_out: int):
+    """
+    Min/max-per-bucket decimation.
+
+    Splits the series into n_out // 2 equal buckets and keeps each bucket's minimum and
+    maximum, which preserves spikes that LTTB can smooth over. Fully vectorized.
+
+    Args:
+        y (np.ndarray): Values to decimate.
+        n_out (int): Upper bound on the number of points to keep (>= 2).
+
+    Returns:
+        np.ndarray: Sorted, unique indices of the selected points.
+    """
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    size = -(-n // buckets)  # ceil(n / buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+
+    # Trailing buckets can be pure padding when n is much smaller than buckets * size
+    valid = ~np.all(np.isnan(grid), axis=1)
+    grid = grid[valid]
+    offsets = np.flatnonzero(valid) * size
+
+    lows = offsets + np.nanargmin(grid, axis=1)
+    highs = offsets + np.nanargmax(grid, axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def downsample(x, y, max_points: int, method: str = "lttb"):
+    """
+    Select at most `max_points` representative points of a series.
+
+    Args:
+        x (array-like): Monotonic x values (numeric).
+        y (array-like): Series values.
+        max_points (int): Target payload size.
+        method (str): "lttb" or "minmax".
+
+    Returns:
+        np.ndarray: Sorted indices into the input arrays.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {METHODS}")
+    if max_points is None or len(y) <= max_points:
+        return np.arange(len(y))
+    if method == "minmax":
+        return minmax(y, max_points)
+    return lttb(x, y, max_points)
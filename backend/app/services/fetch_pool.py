@@ -0,0 +1,114 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger("FetchPool")
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Allows bursts of up to `burst` calls, refilled at `rate` tokens per second.
+    `acquire()` blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, rate: float, burst: int = 1):
+    """
+    Return the shared limiter for an upstream host, creating it on first use.
+
+    All callers hitting the same host share one bucket regardless of which service
+    instance or worker thread they run on.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = TokenBucket(rate, burst)
+        return limiter
+
+
+def retry_with_backoff(func, *args, retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                       limiter: TokenBucket = None, **kwargs):
+    """
+    Call `func`, retrying failures with exponential backoff and full jitter.
+
+    Args:
+        func (callable): Function to call.
+        retries (int): Number of retries after the first attempt.
+        base_delay (float): Backoff base in seconds.
+        max_delay (float): Upper bound on any single delay.
+        limiter (TokenBucket): Optional rate limiter to acquire before every attempt.
+
+    Returns:
+        The function's return value; re-raises the last error once retries are exhausted.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            logger.warning(f"⚠️ {getattr(func, '__name__', func)} failed ({e}), retry {attempt + 1}/{retries} in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+
+class ConcurrentFetcher:
+    """Bounded thread pool that runs a fetch function per item and yields results as they finish."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+
+    def map_as_completed(self, func, items):
+        """
+        Run `func(item)` for every item concurrently.
+
+        Yields:
+            tuple: (item, result, error) in completion order; exactly one of result/error is set.
+        """
+        items = list(items)
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)), thread_name_prefix="fetch") as pool:
+            futures = {pool.submit(func, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
@@ -0,0 +1,67 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from app.config import settings
+from app.database import SessionLocal
+from app.services.yahoo_service import YahooFinanceService
+from app.services.alpaca_service import AlpacaService, ALPACA_SOURCE
+from app.services.coverage import backfill_missing_ranges
+from app.services.job_queue import job_queue
+
+logger = logging.getLogger("IngestJobs")
+
+
+def yahoo_historical(symbols: list, params: dict, progress):
+    """Download Yahoo prices (and option chains) symbol by symbol, storing each as it arrives."""
+    db = SessionLocal()
+    try:
+        service = YahooFinanceService(db)
+        date_range = (params["start_date"], params["end_date"])
+        expiration_range = None  # Service default: live expirations from today
+        if params.get("expiration_start") and params.get("expiration_end"):
+            expiration_range = (params["expiration_start"], params["expiration_end"])
+        for symbol, historical_data, options_data in service.iter_historical_data(symbols, date_range, expiration_range):
+            progress(symbol, len(historical_data) + len(options_data))
+        for symbol in service.failed_symbols:
+            progress(symbol, failed=True)
+    finally:
+        db.close()
+
+
+def alpaca_historical(symbols: list, params: dict, progress):
+    """Fetch Alpaca daily bars for all symbols in one multi-symbol request."""
+    db = SessionLocal()
+    try:
+        service = AlpacaService(db)
+        rows = service.fetch_historical_data(symbols, (params["start_date"], params["end_date"]))
+        counts = Counter(row["symbol"] for row in rows)
+        for symbol in symbols:
+            progress(symbol, counts.get(symbol, 0), failed=symbol in service.failed_symbols)
+    finally:
+        db.close()
+
+
+def alpaca_incremental(symbols: list, params: dict, progress):
+    """
+    Fetch only the daily bars missing from the coverage index over the last
+    `backfill_days` days, in multi-symbol Alpaca requests.
+    """
+    db = SessionLocal()
+    try:
+        service = AlpacaService(db)
+        end = datetime.utcnow()
+        start = end - timedelta(days=params.get("backfill_days", settings.SCHEDULER_BACKFILL_DAYS))
+        summary = backfill_missing_ranges(
+            db, symbols, start, end, [(ALPACA_SOURCE, service)], batch_size=settings.SCHEDULER_BATCH_SIZE
+        )
+        for symbol in symbols:
+            progress(symbol, summary["rows"][symbol], failed=symbol in summary["failed"])
+    finally:
+        db.close()
+
+
+# Both kinds run the same Yahoo download (prices and option chains), so they share claims
+job_queue.register("yahoo_historical", yahoo_historical, resource="yahoo")
+job_queue.register("yahoo_options", yahoo_historical, resource="yahoo")
+job_queue.register("alpaca_historical", alpaca_historical)
+job_queue.register("alpaca_incremental", alpaca_incremental)
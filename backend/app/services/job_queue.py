@@ -0,0 +1,229 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger("JobQueue")
+
+class QueueFull(Exception):
+    """Raised when more than JOB_MAX_PENDING jobs are waiting."""
+
+
+class MemoryJobBackend:
+    """Job records and in-flight symbol claims in process memory."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._jobs = {}
+        self._claims = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: dict):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+    def load(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def claim(self, key: str, job_id: str):
+        """Claim `key` for `job_id`; returns the current owner if another job holds it."""
+        with self._lock:
+            owner = self._claims.setdefault(key, job_id)
+            return None if owner == job_id else owner
+
+    def release(self, key: str, job_id: str):
+        with self._lock:
+            if self._claims.get(key) == job_id:
+                del self._claims[key]
+
+
+class RedisJobBackend:
+    """
+    Job records and in-flight claims in Redis, so every API process sees the same
+    jobs and never fetches a symbol another process is already fetching.
+    """
+
+    name = "redis"
+
+    # Delete a claim only if this job still owns it
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, client):
+        self.client = client
+        self._release = client.register_script(self.RELEASE_SCRIPT)
+
+    def save(self, job: dict):
+        self.client.set(f"ishara:jobs:{job['id']}", json.dumps(job), ex=settings.JOB_TTL)
+
+    def load(self, job_id: str):
+        data = self.client.get(f"ishara:jobs:{job_id}")
+        return json.loads(data) if data else None
+
+    def claim(self, key: str, job_id: str):
+        if self.client.set(f"ishara:inflight:{key}", job_id, nx=True, ex=settings.JOB_CLAIM_TTL):
+            return None
+        owner = self.client.get(f"ishara:inflight:{key}")
+        return None if owner in (None, job_id) else owner
+
+    def release(self, key: str, job_id: str):
+        self._release(keys=[f"ishara:inflight:{key}"], args=[job_id])
+
+
+class JobQueue:
+    """
+    Bounded background execution for ingestion jobs.
+
+    A job is a handler name plus a symbol list. On enqueue each symbol is claimed
+    for the handler's upstream resource; symbols already being fetched by another
+    in-flight job for that resource (whichever handler it runs) are dropped from
+    the new job and reported under `deduplicated`. Jobs run on a
+    fixed-size thread pool; handlers report per-symbol progress through a callback,
+    which is persisted so `GET /api/tasks/{id}` can show status and throughput.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.resources = {}  # kind -> claim namespace
+        self.backend = MemoryJobBackend()
+        self.executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler, resource: str = None):
+        """
+        Register a handler: `handler(symbols, params, progress)`, where
+        `progress(symbol, rows=0, failed=False)` is called once per finished symbol.
+        Kinds that fetch the same data share a `resource` (default: the kind), so
+        their symbol claims de-duplicate against each other.
+        """
+        self.handlers[kind] = handler
+        self.resources[kind] = resource or kind
+
+    def _claim_key(self, kind: str, symbol: str):
+        return f"{self.resources.get(kind, kind)}:{symbol}"
+
+    def start(self):
+        """Create the worker pool and pick Redis or the in-process backend."""
+        if settings.JOB_BACKEND != "memory":
+            client = get_redis()
+            if client is not None:
+                self.backend = RedisJobBackend(client)
+            elif settings.JOB_BACKEND == "redis":
+                logger.warning("⚠️ JOB_BACKEND=redis but Redis is unavailable; using in-process job tracking.")
+        self.executor = ThreadPoolExecutor(max_workers=settings.JOB_MAX_WORKERS, thread_name_prefix="job")
+        logger.info(f"🚀 Job queue started ({self.backend.name} backend, {settings.JOB_MAX_WORKERS} workers).")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def enqueue(self, kind: str, symbols: list, params: dict = None):
+        """
+        Queue a job for the symbols not already in flight for `kind`'s resource.
+
+        Returns:
+            dict: The job record.
+
+        Raises:
+            QueueFull: Too many jobs are already waiting.
+        """
+        if self.executor is None:
+            self.start()
+        with self._lock:
+            if self._pending >= settings.JOB_MAX_PENDING:
+                raise QueueFull(f"{self._pending} jobs already pending")
+            self._pending += 1  # Reserve the slot now, so concurrent enqueues cannot overshoot
+
+        job_id = uuid.uuid4().hex
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        claimed, deduplicated = [], {}
+        for symbol in symbols:
+            owner = self.backend.claim(self._claim_key(kind, symbol), job_id)
+            if owner is None:
+                claimed.append(symbol)
+            else:
+                deduplicated[symbol] = owner
+
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "symbols": claimed,
+            "params": params or {},
+            "deduplicated": deduplicated,
+            "status": "queued" if claimed else "deduplicated",
+            "total": len(claimed),
+            "completed": 0,
+            "failed": [],
+            "rows": 0,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self.backend.save(job)
+
+        if not claimed:
+            with self._lock:
+                self._pending -= 1  # Nothing to run: give the reserved slot back
+            return job
+        self.executor.submit(self._run, dict(job, failed=[]))  # The worker mutates its own copy
+        return job
+
+    def get(self, job_id: str):
+        """Job record with throughput figures, or None."""
+        job = self.backend.load(job_id)
+        if job is None:
+            return None
+        job["progress"] = job["completed"] / job["total"] if job["total"] else None
+        job["symbols_per_second"] = job["rows_per_second"] = None
+        if job["started_at"]:
+            finished = datetime.fromisoformat(job["finished_at"]) if job["finished_at"] else datetime.utcnow()
+            elapsed = (finished - datetime.fromisoformat(job["started_at"])).total_seconds()
+            if elapsed > 0:
+                job["symbols_per_second"] = job["completed"] / elapsed
+                job["rows_per_second"] = job["rows"] / elapsed
+        return job
+
+    def _run(self, job: dict):
+        with self._lock:
+            self._pending -= 1
+        job.update(status="running", started_at=datetime.utcnow().isoformat())
+        self.backend.save(job)
+        started = time.perf_counter()
+
+        def progress(symbol, rows=0, failed=False):
+            job["completed"] += 1
+            job["rows"] += rows
+            if failed:
+                job["failed"].append(symbol)
+            self.backend.save(job)
+
+        try:
+            self.handlers[job["kind"]](job["symbols"], job["params"], progress)
+            job["status"] = "completed"
+        except Exception as e:
+            logger.error(f"❌ Job {job['id']} ({job['kind']}) failed: {e}")
+            job.update(status="failed", error=str(e))
+        finally:
+            job["finished_at"] = datetime.utcnow().isoformat()
+            self.backend.save(job)
+            for symbol in job["symbols"]:
+                self.backend.release(self._claim_key(job["kind"], symbol), job["id"])
+
+        logger.info(
+            f"✅ Job {job['id']} ({job['kind']}) {job['status']}: {job['completed']}/{job['total']} symbols, "
+            f"{job['rows']} rows in {time.perf_counter() - started:.1f}s"
+        )
+
+
+# Process-wide queue used by the /api/tasks ingestion endpoints
+job_queue = JobQueue()
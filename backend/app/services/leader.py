@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import socket
+import uuid
+from datetime import datetime
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger("LeaderElection")
+
+LEADER_KEY = "ishara:leader:ingest"
+
+# Session-level advisory lock key for the Postgres backend (next to the migrations' key)
+LEADER_LOCK_ID = 0x15A4B
+
+
+class RedisLeaderLock:
+    """Leadership as a Redis key holding this process's token, kept alive by renewing its TTL."""
+
+    name = "redis"
+
+    # Extend / delete the key only while this process still owns it
+    RENEW_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, client, ttl: float):
+        self.client = client
+        self.ttl_ms = int(ttl * 1000)
+        self.token = f"{socket.gethostname()}:{uuid.uuid4().hex}"
+        self._renew = client.register_script(self.RENEW_SCRIPT)
+        self._release = client.register_script(self.RELEASE_SCRIPT)
+
+    def acquire(self):
+        return bool(self.client.set(LEADER_KEY, self.token, nx=True, px=self.ttl_ms))
+
+    def renew(self):
+        return bool(self._renew(keys=[LEADER_KEY], args=[self.token, self.ttl_ms]))
+
+    def release(self):
+        self._release(keys=[LEADER_KEY], args=[self.token])
+
+
+class PostgresLeaderLock:
+    """
+    Leadership as a session-level advisory lock held on a dedicated connection.
+    Postgres releases it when the connection drops, e.g. if the process dies.
+    """
+
+    name = "postgres"
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.conn = None
+
+    def acquire(self):
+        conn = self.engine.connect()
+        try:
+            locked = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": LEADER_LOCK_ID}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not locked:
+            conn.close()
+            return False
+        self.conn = conn
+        return True
+
+    def renew(self):
+        try:
+            self.conn.execute(text("SELECT 1"))
+            self.conn.commit()
+            return True
+        except Exception:
+            self.conn.invalidate()  # The session (and with it the lock) is gone
+            self.conn = None
+            return False
+
+    def release(self):
+        if self.conn is not None:
+            try:
+                self.conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": LEADER_LOCK_ID})
+                self.conn.commit()
+            finally:
+                self.conn.close()
+                self.conn = None
+
+
+class LocalLeaderLock:
+    """This process always leads: single-worker deployments, or no Redis for the tick fan-out."""
+
+    name = "local"
+
+    def acquire(self):
+        return True
+
+    def renew(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class LeaderElection:
+    """
+    Elects one process among the API workers to run stream ingestion.
+
+    Every LEADER_RENEW_INTERVAL the leader renews its lock and the others try to
+    take it. `on_elected()` runs when this process becomes leader; `on_demoted()`
+    runs when it loses the lock (or cannot confirm it, e.g. Redis is unreachable,
+    since carrying on could mean two leaders) and when the election stops while
+    leading, before the lock is released.
+    """
+
+    def __init__(self, on_elected, on_demoted, fanout: bool = True):
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.fanout = fanout  # Whether followers receive the leader's ticks (Redis pub/sub)
+        self.lock = None
+        self.is_leader = False
+        self.elected_at = None
+        self.elections = 0
+        self._task = None
+
+    def _make_lock(self):
+        """
+        Pick the lock backend for LEADER_BACKEND.
+
+        A shared lock is only useful when followers can receive the leader's ticks;
+        without the fan-out channel they would serve empty live quotes and P&L. So
+        "auto" without Redis falls back to local leadership (every worker streams
+        its own feed, as a single-worker deployment does), and an explicit shared
+        backend without the channel fails startup instead.
+        """
+        backend = settings.LEADER_BACKEND
+        if backend in ("postgres", "redis") and not self.fanout:
+            raise RuntimeError(
+                f"LEADER_BACKEND={backend} needs Redis for the tick fan-out; followers would have no live data. "
+                f"Configure REDIS_URL or set LEADER_BACKEND=local."
+            )
+        if backend in ("auto", "redis"):
+            client = get_redis()
+            if client is not None:
+                return RedisLeaderLock(client, settings.LEADER_LOCK_TTL)
+        if backend == "postgres":
+            if engine.dialect.name != "postgresql":
+                raise RuntimeError("LEADER_BACKEND=postgres requires a PostgreSQL DATABASE_URL.")
+            return PostgresLeaderLock(engine)
+        if backend == "auto" and engine.dialect.name == "postgresql":
+            logger.warning(
+                "⚠️ Redis is unavailable, so there is no tick fan-out: every worker runs its own stream ingest. "
+                "Run a single worker or configure REDIS_URL."
+            )
+        return LocalLeaderLock()
+
+    async def _demote(self):
+        self.is_leader = False
+        self.elected_at = None
+        try:
+            await self.on_demoted()
+        except Exception as e:
+            logger.error(f"❌ Error stepping down as ingest leader: {e}")
+
+    async def _run(self):
+        try:
+            while True:
+                try:
+                    if self.is_leader:
+                        if not await asyncio.to_thread(self.lock.renew):
+                            logger.warning("⚠️ Lost ingest leadership.")
+                            await self._demote()
+                    elif await asyncio.to_thread(self.lock.acquire):
+                        self.is_leader = True
+                        self.elected_at = datetime.utcnow()
+                        self.elections += 1
+                        logger.info(f"👑 Elected ingest leader ({self.lock.name} lock).")
+                        await self.on_elected()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Leader election error: {e}")
+                    if self.is_leader:
+                        await self._demote()
+                await asyncio.sleep(settings.LEADER_RENEW_INTERVAL)
+        finally:
+            if self.is_leader:
+                await self._demote()
+                try:
+                    self.lock.release()
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to release the leader lock: {e}")
+
+    def start(self):
+        """Pick the lock backend and start campaigning."""
+        self.lock = self._make_lock()
+        logger.info(f"🚀 Leader election using the {self.lock.name} lock.")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop campaigning; if leading, step down and release the lock."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {
+            "backend": self.lock.name if self.lock else None,
+            "fanout": self.fanout,
+            "is_leader": self.is_leader,
+            "elected_at": self.elected_at.isoformat() if self.elected_at else None,
+            "elections": self.elections,
+        }
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+from collections import deque
+import websockets
+from app.config import settings
+
+logger = logging.getLogger("MarketDataHub")
+
+# Alpaca message types routed to clients: trades, quotes, bars
+DATA_TYPES = {"t", "q", "b"}
+
+
+class ClientChannel:
+    """
+    Bounded per-client send buffer.
+
+    Quotes are coalesced per symbol: while a quote for a symbol is still waiting to
+    be sent, newer quotes replace it in place, so a slow consumer only ever receives
+    the latest one. When the buffer is full the oldest pending message is dropped.
+    """
+
+    def __init__(self, websocket, symbols: list, max_pending: int = settings.MARKET_HUB_CLIENT_BUFFER):
+        self.websocket = websocket
+        self.symbols = list(dict.fromkeys(symbols))  # A repeated symbol would be refcounted twice
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.latest_quotes = {}  # symbol -> newest unsent quote
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def push(self, message: dict):
+        """Queue a message without blocking the hub's read loop."""
+        if message.get("T") == "q":
+            symbol = message.get("S")
+            if symbol in self.latest_quotes:
+                self.latest_quotes[symbol] = message
+                self.coalesced += 1
+                return
+            self.latest_quotes[symbol] = message
+            entry = ("q", symbol)
+        else:
+            entry = message
+
+        if len(self.pending) >= self.max_pending:
+            dropped = self.pending.popleft()
+            if isinstance(dropped, tuple):
+                self.latest_quotes.pop(dropped[1], None)
+            self.dropped += 1
+
+        self.pending.append(entry)
+        self.ready.set()
+
+    def _drain(self):
+        batch = []
+        while self.pending:
+            entry = self.pending.popleft()
+            if isinstance(entry, tuple):
+                entry = self.latest_quotes.pop(entry[1])
+            batch.append(entry)
+        return batch
+
+    async def run(self):
+        """Send pending messages to the client as JSON arrays, as Alpaca frames them."""
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            batch = self._drain()
+            if batch:
+                await self.websocket.send_text(json.dumps(batch))
+                self.sent += len(batch)
+
+
+class MarketDataHub:
+    """
+    One upstream Alpaca market-data connection shared by every WebSocket client.
+
+    Symbol subscriptions are reference-counted across clients: the upstream only
+    subscribes when the first client asks for a symbol and unsubscribes when the last
+    one leaves. Each upstream frame is parsed once and each message is pushed only to
+    the channels subscribed to its symbol. The connection is opened lazily and
+    re-established with backoff, re-subscribing the current symbol set.
+    """
+
+    def __init__(self, url: str = None, api_key: str = None, secret_key: str = None):
+        self.url = url or settings.ALPACA_STREAM_URL
+        self.api_key = api_key or settings.ALPACA_API_KEY
+        self.secret_key = secret_key or settings.ALPACA_SECRET_KEY
+
+        self.refcounts = {}  # symbol -> number of subscribed clients
+        self.subscribers = {}  # symbol -> set of ClientChannel
+        self.upstream = None
+        self._task = None
+        self._lock = asyncio.Lock()
+        self.messages_received = 0
+
+    async def _send(self, action: str, symbols: list):
+        if self.upstream is None or not symbols:
+            return
+        try:
+            await self.upstream.send(json.dumps({
+                "action": action,
+                "trades": symbols,
+                "quotes": symbols,
+                "bars": symbols,
+            }))
+        except Exception as e:
+            # The reconnect loop re-subscribes the full symbol set
+            logger.warning(f"⚠️ Failed to {action} {symbols}: {e}")
+
+    async def register(self, channel: ClientChannel):
+        """Attach a client channel, subscribing upstream to symbols that are new."""
+        async with self._lock:
+            new_symbols = []
+            for symbol in channel.symbols:
+                channels = self.subscribers.setdefault(symbol, set())
+                if channel in channels:
+                    continue
+                channels.add(channel)
+                self.refcounts[symbol] = self.refcounts.get(symbol, 0) + 1
+                if self.refcounts[symbol] == 1:
+                    new_symbols.append(symbol)
+
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._run())
+            else:
+                await self._send("subscribe", new_symbols)
+
+    async def unregister(self, channel: ClientChannel):
+        """Detach a client channel, unsubscribing upstream from symbols nobody needs anymore."""
+        async with self._lock:
+            unused = []
+            for symbol in channel.symbols:
+                channels = self.subscribers.get(symbol)
+                if channels is None or channel not in channels:
+                    continue
+                channels.discard(channel)
+                self.refcounts[symbol] -= 1
+                if self.refcounts[symbol] == 0:
+                    del self.refcounts[symbol]
+                    del self.subscribers[symbol]
+                    unused.append(symbol)
+            await self._send("unsubscribe", unused)
+
+    def _dispatch(self, raw):
+        for message in json.loads(raw):
+            message_type = message.get("T")
+            if message_type in DATA_TYPES:
+                self.messages_received += 1
+                for channel in self.subscribers.get(message.get("S"), ()):
+                    channel.push(message)
+            elif message_type == "error":
+                logger.error(f"❌ Alpaca stream error: {message}")
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self.url) as upstream:
+                    await upstream.send(json.dumps({"action": "auth", "key": self.api_key, "secret": self.secret_key}))
+                    self.upstream = upstream
+                    await self._send("subscribe", list(self.refcounts))
+                    logger.info(f"Connected upstream to {self.url} for {len(self.refcounts)} symbols.")
+                    backoff = 1.0
+                    async for raw in upstream:
+                        self._dispatch(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Upstream market data connection lost, reconnecting in {backoff:.0f}s: {e}")
+            finally:
+                self.upstream = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {
+            "connected": self.upstream is not None,
+            "symbols": dict(self.refcounts),
+            "clients": len({channel for channels in self.subscribers.values() for channel in channels}),
+            "messages_received": self.messages_received,
+        }
+
+
+# Shared by all market-data WebSocket clients in this process
+market_hub = MarketDataHub()
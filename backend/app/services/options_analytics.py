@@ -0,0 +1,192 @@
+import numpy as np
+
+DAYS_PER_YEAR = 365.0
+
+# Implied volatility search bracket and convergence tolerance (annualized vol)
+VOL_MIN = 1e-4
+VOL_MAX = 5.0
+VOL_TOL = 1e-7
+
+
+def _erfc(x):
+    """Complementary error function, vectorized (Chebyshev fit, relative error < 1.2e-7)."""
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    r = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, r, 2.0 - r)
+
+
+def norm_cdf(x):
+    return 0.5 * _erfc(-x / np.sqrt(2.0))
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def _terms(spot, strike, t, vol, rate, dividend_yield):
+    """d1, d2, sqrt(t) and the two discount factors shared by prices and Greeks."""
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t, sqrt_t, np.exp(-dividend_yield * t), np.exp(-rate * t)
+
+
+def _price(spot, strike, is_call, d1, d2, df_q, df_r):
+    call = spot * df_q * norm_cdf(d1) - strike * df_r * norm_cdf(d2)
+    put = strike * df_r * norm_cdf(-d2) - spot * df_q * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_price(spot, strike, t, vol, rate, dividend_yield, is_call):
+    """
+    Black-Scholes-Merton prices for European options, element-wise over broadcastable arrays.
+
+    Args:
+        spot: Underlying price.
+        strike: Strike price.
+        t: Time to expiry in years.
+        vol: Annualized volatility.
+        rate: Continuously compounded risk-free rate.
+        dividend_yield: Continuous dividend yield.
+        is_call: True for calls, False for puts.
+
+    Returns:
+        np.ndarray: Option prices.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2, _, df_q, df_r = _terms(spot, strike, t, vol, rate, dividend_yield)
+        return _price(spot, strike, is_call, d1, d2, df_q, df_r)
+
+
+def bs_greeks(spot, strike, t, vol, rate, dividend_yield, is_call):
+    """
+    Black-Scholes-Merton price and Greeks, element-wise (arguments as for `bs_price`).
+
+    Vega is per one volatility point (0.01) and theta per calendar day, the units
+    quoted by brokers. Entries with a NaN volatility come back NaN.
+
+    Returns:
+        dict: Arrays keyed price, delta, gamma, vega, theta.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2, sqrt_t, df_q, df_r = _terms(spot, strike, t, vol, rate, dividend_yield)
+        pdf = norm_pdf(d1)
+        cdf_d1, cdf_d2 = norm_cdf(d1), norm_cdf(d2)
+        decay = -spot * df_q * pdf * vol / (2.0 * sqrt_t)
+        call_theta = decay - rate * strike * df_r * cdf_d2 + dividend_yield * spot * df_q * cdf_d1
+        put_theta = decay + rate * strike * df_r * (1.0 - cdf_d2) - dividend_yield * spot * df_q * (1.0 - cdf_d1)
+        return {
+            "price": _price(spot, strike, is_call, d1, d2, df_q, df_r),
+            "delta": np.where(is_call, df_q * cdf_d1, df_q * (cdf_d1 - 1.0)),
+            "gamma": df_q * pdf / (spot * vol * sqrt_t),
+            "vega": spot * df_q * pdf * sqrt_t / 100.0,
+            "theta": np.where(is_call, call_theta, put_theta) / DAYS_PER_YEAR,
+        }
+
+
+def implied_volatility(option_price, spot, strike, t, rate, dividend_yield, is_call, max_iter: int = 100):
+    """
+    Solve Black-Scholes implied volatility for a whole chain at once.
+
+    Batched Newton-Raphson on vega, safeguarded by a per-contract bracket: each
+    iteration tightens [lo, hi] around the root and falls back to bisection
+    wherever the Newton step leaves it (tiny vega deep in or out of the money),
+    so every contract converges. Only unconverged contracts are re-evaluated.
+
+    Args:
+        option_price: Observed option prices (e.g. bid/ask mids).
+        spot, strike, t, rate, dividend_yield, is_call: As for `bs_price`.
+        max_iter (int): Iteration cap.
+
+    Returns:
+        np.ndarray: Implied volatilities; NaN where the price is outside the
+        no-arbitrage bounds, the contract has expired, or the solve did not converge.
+    """
+    arrays = np.broadcast_arrays(option_price, spot, strike, t, rate, dividend_yield, is_call)
+    shape = arrays[0].shape
+    # Solve on flat copies (so scalars index like one-contract chains), reshape at the end
+    option_price, spot, strike, t, rate, dividend_yield, is_call = (np.array(a, dtype=float).ravel() for a in arrays)
+    is_call = is_call.astype(bool)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        df_q, df_r = np.exp(-dividend_yield * t), np.exp(-rate * t)
+        forward_spot, pv_strike = spot * df_q, strike * df_r
+        lower = np.where(is_call, np.maximum(forward_spot - pv_strike, 0.0), np.maximum(pv_strike - forward_spot, 0.0))
+        upper = np.where(is_call, forward_spot, pv_strike)
+        valid = np.isfinite(option_price) & (t > 0) & (option_price > lower) & (option_price < upper)
+
+        lo = np.full(option_price.shape, VOL_MIN)
+        hi = np.full(option_price.shape, VOL_MAX)
+        # Brenner-Subrahmanyam at-the-money approximation as the starting point
+        vol = np.clip(np.sqrt(2.0 * np.pi / t) * option_price / spot, VOL_MIN, VOL_MAX)
+        vol = np.where(np.isfinite(vol), vol, 0.3)
+
+        active = np.flatnonzero(valid)
+        converged = np.zeros(option_price.shape, dtype=bool)
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            v = vol[active]
+            d1, d2, sqrt_t, a_df_q, a_df_r = _terms(spot[active], strike[active], t[active], v, rate[active], dividend_yield[active])
+            diff = _price(spot[active], strike[active], is_call[active], d1, d2, a_df_q, a_df_r) - option_price[active]
+            vega = spot[active] * a_df_q * norm_pdf(d1) * sqrt_t
+
+            # Price is increasing in vol, so the sign of the error tells which side the root is on
+            a_lo = np.where(diff < 0, v, lo[active])
+            a_hi = np.where(diff > 0, v, hi[active])
+            step = v - diff / vega
+            bisect = ~np.isfinite(step) | (step <= a_lo) | (step >= a_hi)
+            new = np.where(bisect, 0.5 * (a_lo + a_hi), step)
+
+            lo[active], hi[active], vol[active] = a_lo, a_hi, new
+            done = (diff == 0) | (np.abs(new - v) < VOL_TOL) | (a_hi - a_lo < VOL_TOL)
+            converged[active[done]] = True
+            active = active[~done]
+
+    return np.where(converged, vol, np.nan).reshape(shape)
+
+
+def analyze_chain(strike, t, is_call, bid, ask, last, spot: float, rate: float, dividend_yield: float = 0.0):
+    """
+    Mark, implied volatility and Greeks for every contract in a chain snapshot.
+
+    Contracts are marked at the bid/ask mid when both sides are quoted and at
+    the last trade otherwise; Greeks are evaluated at the solved volatility.
+
+    Args:
+        strike, t, is_call, bid, ask, last: Per-contract arrays (NaN for missing quotes).
+        spot (float): Underlying price at the snapshot.
+        rate (float): Risk-free rate.
+        dividend_yield (float): Continuous dividend yield.
+
+    Returns:
+        dict: Arrays keyed mark, iv, price, delta, gamma, vega, theta.
+    """
+    quoted = (bid > 0) & (ask > 0) & (ask >= bid)
+    mark = np.where(quoted, 0.5 * (bid + ask), last)
+    mark = np.where(mark > 0, mark, np.nan)
+    iv = implied_volatility(mark, spot, strike, t, rate, dividend_yield, is_call)
+    return {"mark": mark, "iv": iv, **bs_greeks(spot, strike, t, iv, rate, dividend_yield, is_call)}
+
+
+def volatility_surface(strike, t, is_call, iv, spot: float):
+    """
+    Grid a chain's implied volatilities by maturity and strike.
+
+    Each cell takes the out-of-the-money contract (puts below spot, calls at or
+    above), whose quotes are the more liquid, and the other side where that one
+    has no volatility.
+
+    Returns:
+        tuple: (maturities, strikes, grid) with grid[i, j] the IV at maturities[i]
+        and strikes[j], NaN where neither contract has one.
+    """
+    maturities, t_index = np.unique(t, return_inverse=True)
+    strikes, k_index = np.unique(strike, return_inverse=True)
+    grid = np.full((maturities.size, strikes.size), np.nan)
+    out_of_the_money = np.where(is_call, strike >= spot, strike < spot)
+    # In-the-money first, so out-of-the-money values overwrite them
+    for side in (~out_of_the_money, out_of_the_money):
+        selected = side & np.isfinite(iv)
+        grid[t_index[selected], k_index[selected]] = iv[selected]
+    return maturities, strikes, grid
@@ -0,0 +1,223 @@
+import asyncio
+import itertools
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Portfolio, HistoricalPrice
+from app.services.quote_store import quote_store
+
+logger = logging.getLogger("PnLEngine")
+
+# Portfolio-level aggregates maintained incrementally
+TOTAL_FIELDS = ("market_value", "cost_basis", "unrealized_pnl", "day_change", "long_exposure", "short_exposure")
+
+
+class PnLEngine:
+    """
+    Incremental mark-to-market of the `Portfolio` positions.
+
+    Positions are loaded once from the database; after that every price update only
+    touches the affected symbol: its market value, unrealized and day P&L are
+    recomputed and the portfolio totals are adjusted by the difference, so the cost
+    per tick is O(1) regardless of portfolio size. Each position carries the version
+    at which its values last changed, and dropped positions are remembered with the
+    version they were removed at, so publishers can send only what moved.
+    """
+
+    def __init__(self):
+        self.positions = {}
+        self.removed = {}  # symbol -> version at which the position was dropped
+        self.totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+        self._versions = itertools.count(1)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def symbols(self):
+        return list(self.positions)
+
+    def load(self, db: Session, prices: dict = None):
+        """
+        (Re)load positions from the portfolio table and previous closes from historical prices.
+
+        Args:
+            db (Session): Database session.
+            prices (dict): Optional {symbol: last price} to mark positions immediately.
+        """
+        holdings = (
+            db.query(
+                Portfolio.symbol,
+                func.sum(Portfolio.shares).label("shares"),
+                func.sum(Portfolio.shares * Portfolio.avg_price).label("cost_basis"),
+            )
+            .group_by(Portfolio.symbol)
+            .all()
+        )
+        symbols = [holding.symbol for holding in holdings]
+
+        # Latest close before today per symbol, for day change
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        latest = (
+            db.query(HistoricalPrice.symbol, func.max(HistoricalPrice.date).label("date"))
+            .filter(HistoricalPrice.symbol.in_(symbols), HistoricalPrice.date < today)
+            .group_by(HistoricalPrice.symbol)
+            .subquery()
+        )
+        previous_closes = dict(
+            db.query(HistoricalPrice.symbol, HistoricalPrice.close)
+            .join(latest, (HistoricalPrice.symbol == latest.c.symbol) & (HistoricalPrice.date == latest.c.date))
+            .all()
+        )
+
+        with self._lock:
+            previous = self.positions
+            self.positions = {}
+            self.totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+            for holding in holdings:
+                shares = holding.shares or 0.0
+                self.positions[holding.symbol] = {
+                    "symbol": holding.symbol,
+                    "shares": shares,
+                    "avg_price": holding.cost_basis / shares if shares else 0.0,
+                    "cost_basis": holding.cost_basis or 0.0,
+                    "previous_close": previous_closes.get(holding.symbol),
+                    "last_price": None,
+                    "last_trade": False,
+                    "market_value": 0.0,
+                    "unrealized_pnl": 0.0,
+                    "day_change": 0.0,
+                    "day_change_pct": None,
+                    "version": 0,
+                }
+                self.totals["cost_basis"] += holding.cost_basis or 0.0
+                live_price = (prices or {}).get(holding.symbol)
+                old = previous.get(holding.symbol)
+                if live_price is not None:
+                    self._mark(holding.symbol, live_price, last_trade=True, stamp=False)
+                else:
+                    price = (old and old["last_price"]) or previous_closes.get(holding.symbol)
+                    if price is not None:
+                        self._mark(holding.symbol, price, last_trade=bool(old and old["last_trade"]), stamp=False)
+                # Unchanged positions keep their version, so a reload only publishes what changed
+                self._stamp(holding.symbol, old)
+                self.removed.pop(holding.symbol, None)
+
+            for symbol in previous.keys() - self.positions.keys():
+                self.version = next(self._versions)
+                self.removed[symbol] = self.version
+
+        logger.info(f"Loaded {len(self.positions)} portfolio positions.")
+
+    def _contributions(self, position):
+        market_value = position["market_value"]
+        return {
+            "market_value": market_value,
+            "unrealized_pnl": position["unrealized_pnl"],
+            "day_change": position["day_change"],
+            "long_exposure": market_value if market_value > 0 else 0.0,
+            "short_exposure": -market_value if market_value < 0 else 0.0,
+        }
+
+    def _stamp(self, symbol, old):
+        """Give a position a new version unless its values equal those of `old`."""
+        position = self.positions[symbol]
+        if old is not None and {**old, "version": 0} == {**position, "version": 0}:
+            position["version"] = old["version"]
+        else:
+            self.version = next(self._versions)
+            position["version"] = self.version
+
+    def _mark(self, symbol, price, last_trade=False, stamp=True):
+        position = self.positions[symbol]
+        before = self._contributions(position)
+
+        shares = position["shares"]
+        previous_close = position["previous_close"]
+        updated = dict(position)
+        updated["last_price"] = price
+        updated["last_trade"] = position["last_trade"] or last_trade
+        updated["market_value"] = shares * price
+        updated["unrealized_pnl"] = updated["market_value"] - position["cost_basis"]
+        if previous_close:
+            updated["day_change"] = shares * (price - previous_close)
+            updated["day_change_pct"] = (price / previous_close - 1) * 100
+        self.positions[symbol] = updated
+        if stamp:
+            self._stamp(symbol, position)
+
+        after = self._contributions(updated)
+        for field, value in after.items():
+            self.totals[field] += value - before[field]
+
+    def on_price(self, symbol: str, price: float):
+        """Mark one position to a new trade price. No-op for symbols not held."""
+        if price is None or symbol not in self.positions:
+            return
+        with self._lock:
+            if symbol in self.positions:
+                self._mark(symbol, price, last_trade=True)
+
+    def on_quote(self, symbol: str, bid_price: float, ask_price: float):
+        """Mark to the quote midpoint until the first trade for a held symbol arrives."""
+        position = self.positions.get(symbol)
+        if position is None or position["last_trade"] or not bid_price or not ask_price:
+            return
+        with self._lock:
+            if symbol in self.positions:
+                self._mark(symbol, (bid_price + ask_price) / 2)
+
+    def reload(self):
+        """Reload positions in a fresh session, marking them to the latest streamed trades."""
+        prices = {
+            symbol: snapshot.get("last_price")
+            for symbol, snapshot in quote_store.get().items()
+            if snapshot and snapshot.get("last_price") is not None
+        }
+        db = SessionLocal()
+        try:
+            self.load(db, prices)
+        finally:
+            db.close()
+
+    async def run(self, interval: float = None):
+        """Periodically pick up portfolio changes made outside the stream."""
+        interval = interval or settings.PNL_RELOAD_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"❌ Error reloading portfolio positions: {e}")
+
+    def snapshot(self, since_version: int = None):
+        """
+        Every position plus current totals, or with `since_version` only the positions
+        changed after it and the symbols removed since.
+
+        Returns:
+            dict: {"version", "positions": {symbol: position}, "removed": [symbol], "totals": {...}}
+        """
+        with self._lock:
+            if since_version is None:
+                positions = {symbol: dict(position) for symbol, position in self.positions.items()}
+                removed = []
+            else:
+                positions = {
+                    symbol: dict(position) for symbol, position in self.positions.items()
+                    if position["version"] > since_version
+                }
+                removed = [symbol for symbol, version in self.removed.items() if version > since_version]
+            totals = dict(self.totals)
+            version = self.version
+
+        totals["gross_exposure"] = totals["long_exposure"] + totals["short_exposure"]
+        totals["net_exposure"] = totals["long_exposure"] - totals["short_exposure"]
+        totals["positions"] = len(self.positions)
+        return {"version": version, "positions": positions, "removed": removed, "totals": totals}
+
+
+# Process-wide engine fed by StreamingService and published by the portfolio routes
+pnl_engine = PnLEngine()
@@ -0,0 +1,102 @@
+import itertools
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("QuoteSnapshotStore")
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+def _iso(timestamp):
+    return timestamp.isoformat() if timestamp is not None else None
+
+
+class QuoteSnapshotStore:
+    """
+    In-process latest-quote / last-trade table, one snapshot per symbol.
+
+    Single writer (the stream handlers), many readers, no locks: every update builds
+    a new snapshot dict and swaps it into the table with one assignment, so readers
+    always see a complete snapshot. Each snapshot carries the global version at which
+    it last changed, which lets pollers ask for just the symbols that moved.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._versions = itertools.count(1)
+        self.version = 0
+
+    def _publish(self, symbol, snapshot):
+        # Store the snapshot before advancing `version`: a reader that sees the new
+        # version must also see the snapshot carrying it
+        version = next(self._versions)
+        snapshot["version"] = version
+        self._snapshots[symbol] = snapshot
+        self.version = version
+
+    def update_quote(self, symbol, bid_price, ask_price, bid_size, ask_size, timestamp=None):
+        """Record a new best bid/ask for a symbol."""
+        snapshot = dict(self._snapshots.get(symbol) or {"symbol": symbol})
+        snapshot.update(
+            bid_price=bid_price,
+            ask_price=ask_price,
+            bid_size=bid_size,
+            ask_size=ask_size,
+            quote_time=_iso(timestamp),
+        )
+        self._publish(symbol, snapshot)
+
+    def update_trade(self, symbol, price, size, timestamp=None):
+        """Record a trade as the last price and fold it into the symbol's day OHLC/volume."""
+        if price is None:
+            return
+        timestamp = timestamp or datetime.now(timezone.utc)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        session_day = timestamp.astimezone(MARKET_TZ).date().isoformat()
+
+        snapshot = dict(self._snapshots.get(symbol) or {"symbol": symbol})
+        if snapshot.get("day") != session_day:
+            snapshot.update(day=session_day, open=price, high=price, low=price, volume=0)
+        else:
+            snapshot["high"] = max(snapshot["high"], price)
+            snapshot["low"] = min(snapshot["low"], price)
+        snapshot.update(
+            last_price=price,
+            last_size=size,
+            last_trade_time=_iso(timestamp),
+            close=price,
+            volume=snapshot["volume"] + (size or 0),
+        )
+        self._publish(symbol, snapshot)
+
+    def get(self, symbols: list = None):
+        """
+        Latest snapshots for the given symbols (all known symbols when omitted).
+
+        Returns:
+            dict: {symbol: snapshot or None}
+        """
+        snapshots = self._snapshots
+        if symbols is None:
+            return dict(snapshots)
+        return {symbol: snapshots.get(symbol) for symbol in symbols}
+
+    def changed_since(self, version: int, symbols: list = None):
+        """
+        Snapshots that changed after `version`.
+
+        Returns:
+            tuple: (current version, {symbol: snapshot}) — pass the version back in next time.
+        """
+        current = self.version
+        candidates = self._snapshots if symbols is None else {
+            symbol: self._snapshots[symbol] for symbol in symbols if symbol in self._snapshots
+        }
+        changed = {symbol: snapshot for symbol, snapshot in list(candidates.items()) if snapshot["version"] > version}
+        return current, changed
+
+
+# Process-wide store written by StreamingService and read by the quotes routes
+quote_store = QuoteSnapshotStore()
@@ -0,0 +1,32 @@
+import logging
+from app.config import settings
+
+logger = logging.getLogger("RedisClient")
+
+_client = None
+_checked = False
+
+
+def get_redis():
+    """
+    Shared Redis client for REDIS_URL, or None when Redis is unavailable.
+
+    The `redis` package is imported lazily and the connection is probed once; callers
+    fall back to in-process implementations when this returns None.
+    """
+    global _client, _checked
+    if _checked:
+        return _client
+    _checked = True
+    try:
+        import redis
+
+        client = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=2, decode_responses=True)
+        client.ping()
+        _client = client
+        logger.info(f"✅ Connected to Redis at {settings.REDIS_URL}")
+    except ImportError:
+        logger.warning("⚠️ redis package not installed; using in-process fallbacks.")
+    except Exception as e:
+        logger.warning(f"⚠️ Redis unavailable ({e}); using in-process fallbacks.")
+    return _client
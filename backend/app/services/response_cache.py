@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger("ResponseCache")
+
+
+class LRUCacheBackend:
+    """In-process entries, evicted least-recently-used first once `max_bytes` of bodies are held."""
+
+    name = "memory"
+    local = True
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires"] <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict, ttl: float):
+        size = len(entry["body"])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        self.size -= len(self._entries.pop(key)["body"])
+
+
+class RedisCacheBackend:
+    """Entries shared by every API process, expired by Redis itself."""
+
+    name = "redis"
+    local = False
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key: str):
+        data = self.client.get(f"ishara:cache:{key}")
+        return json.loads(data) if data else None
+
+    def set(self, key: str, entry: dict, ttl: float):
+        self.client.set(f"ishara:cache:{key}", json.dumps(entry), ex=max(int(ttl), 1))
+
+
+def normalize_params(query_params, list_params=(), exclude=()):
+    """
+    Canonical query string: sorted keys, blank values dropped, and comma-separated
+    list parameters upper-cased, de-duplicated and sorted, so equivalent requests
+    share one cache entry.
+    """
+    items = []
+    for key, value in query_params.multi_items():
+        if key in exclude or value.strip() == "":
+            continue
+        if key in list_params:
+            value = ",".join(sorted({part.strip().upper() for part in value.split(",") if part.strip()}))
+        items.append((key, value.strip()))
+    return urlencode(sorted(items))
+
+
+def _etag_matches(header: str, etag: str):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+class ResponseCache:
+    """
+    TTL + ETag cache for JSON GET responses.
+
+    Entries are keyed on the path plus normalized query parameters and hold the
+    serialized body and its ETag. Concurrent misses for the same key are coalesced
+    in-process (single-flight): one request computes, the others await its result.
+    Requests whose `If-None-Match` matches the current ETag get an empty 304.
+    """
+
+    def __init__(self):
+        self.backend = LRUCacheBackend(settings.RESPONSE_CACHE_MAX_BYTES)
+        self._inflight = {}
+        self.hits = self.misses = self.not_modified = self.coalesced = 0
+
+    def start(self):
+        """Pick the Redis backend when configured and reachable."""
+        if settings.RESPONSE_CACHE_BACKEND != "memory":
+            client = get_redis()
+            if client is not None:
+                self.backend = RedisCacheBackend(client)
+            elif settings.RESPONSE_CACHE_BACKEND == "redis":
+                logger.warning("⚠️ RESPONSE_CACHE_BACKEND=redis but Redis is unavailable; using in-process LRU.")
+        logger.info(f"🚀 Response cache using {self.backend.name} backend.")
+
+    async def _backend(self, method, *args):
+        if self.backend.local:
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    async def _compute(self, key: str, compute, ttl: float):
+        """Run `compute` once per key at a time and store the serialized result."""
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if asyncio.iscoroutinefunction(compute):
+                data = await compute()
+            else:
+                data = await run_in_threadpool(compute)
+            body = json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+            entry = {
+                "body": body,
+                "etag": '"' + hashlib.sha1(body.encode()).hexdigest()[:20] + '"',
+                "expires": time.time() + ttl,
+            }
+            await self._backend(self.backend.set, key, entry, ttl)
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when no other request was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def respond(self, request: Request, namespace: str, compute, ttl: float,
+                      list_params=(), exclude=(), refresh: bool = False):
+        """
+        Serve a JSON response from the cache, computing it on a miss.
+
+        Args:
+            request (Request): Incoming request (path, query and If-None-Match).
+            namespace (str): Cache key prefix for the endpoint.
+            compute: Callable (sync, run in the threadpool, or async) returning JSON-able data.
+            ttl (float): Seconds an entry stays fresh.
+            list_params (tuple): Comma-separated list parameters to normalize.
+            exclude (tuple): Query parameters that do not affect the response.
+            refresh (bool): Bypass the stored entry and recompute it.
+
+        Returns:
+            Response: 200 with the body, or 304 when the client's ETag is current.
+        """
+        key = f"{namespace}:{request.url.path}?{normalize_params(request.query_params, list_params, exclude)}"
+        key = hashlib.sha1(key.encode()).hexdigest()
+
+        entry = None if refresh else await self._backend(self.backend.get, key)
+        if entry is not None:
+            self.hits += 1
+            status = "HIT"
+        else:
+            self.misses += 1
+            status = "MISS"
+            entry = await self._compute(key, compute, ttl)
+
+        headers = {
+            "ETag": entry["etag"],
+            "Cache-Control": f"private, max-age={max(int(entry['expires'] - time.time()), 0)}",
+            "X-Cache": status,
+        }
+        if _etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "coalesced": self.coalesced,
+            "bytes": getattr(self.backend, "size", None),
+        }
+
+
+# Process-wide cache for the news and chart endpoints
+response_cache = ResponseCache()
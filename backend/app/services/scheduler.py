@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Watchlist
+from app.services.job_queue import job_queue, QueueFull
+from app.services import ingest_jobs  # Registers the ingestion job handlers
+from app.services.yahoo_service import expiration_window
+
+logger = logging.getLogger("RefreshScheduler")
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+def next_run(now: datetime, run_at: time):
+    """
+    The next weekday `run_at` (market time) strictly after `now`.
+
+    Args:
+        now (datetime): Timezone-aware current time.
+        run_at (time): Local market time to run at.
+
+    Returns:
+        datetime: Timezone-aware time of the next run.
+    """
+    local = now.astimezone(MARKET_TZ)
+    candidate = datetime.combine(local.date(), run_at, tzinfo=MARKET_TZ)
+    if candidate <= local:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class RefreshScheduler:
+    """
+    Post-close refresh of daily bars and option chains.
+
+    Every weekday at SCHEDULER_RUN_AT (New York time) the watchlist plus the default
+    tickers are queued as an incremental Alpaca backfill (only the bars missing from
+    the coverage index, batched into multi-symbol requests) and a Yahoo options
+    refresh, so chart reads hit stored data. If the service starts after today's run
+    time, a refresh is queued immediately.
+    """
+
+    def __init__(self, default_symbols: list):
+        self.default_symbols = default_symbols
+        self.run_at = time.fromisoformat(settings.SCHEDULER_RUN_AT)
+        self.last_run = None
+        self.last_jobs = []
+
+    def symbols(self):
+        """Watchlist symbols plus the defaults, de-duplicated."""
+        db = SessionLocal()
+        try:
+            watchlist = [row.symbol for row in db.query(Watchlist.symbol).all()]
+        finally:
+            db.close()
+        return list(dict.fromkeys(symbol.upper() for symbol in self.default_symbols + watchlist))
+
+    def refresh(self):
+        """
+        Queue the incremental backfill and options refresh now.
+
+        Returns:
+            list: The queued job records.
+        """
+        symbols = self.symbols()
+        jobs = [job_queue.enqueue("alpaca_incremental", symbols, {"backfill_days": settings.SCHEDULER_BACKFILL_DAYS})]
+        if settings.SCHEDULER_REFRESH_OPTIONS:
+            # Recent closes mark the underlying; chains cover the live expirations ahead
+            today = datetime.utcnow()
+            expiration_start, expiration_end = expiration_window()
+            jobs.append(job_queue.enqueue("yahoo_options", symbols, {
+                "start_date": (today - timedelta(days=7)).strftime("%Y-%m-%d"),
+                "end_date": today.strftime("%Y-%m-%d"),
+                "expiration_start": expiration_start,
+                "expiration_end": expiration_end,
+            }))
+        self.last_run = datetime.utcnow()
+        self.last_jobs = [job["id"] for job in jobs]
+        logger.info(f"📅 Queued post-close refresh for {len(symbols)} symbols: {', '.join(self.last_jobs)}")
+        return jobs
+
+    async def run(self):
+        """Scheduler loop; cancel the task to stop it."""
+        now = datetime.now(MARKET_TZ)
+        if now.weekday() < 5 and now.time() >= self.run_at:
+            await self._refresh()
+        while True:
+            wake = next_run(datetime.now(MARKET_TZ), self.run_at)
+            logger.info(f"📅 Next post-close refresh at {wake:%Y-%m-%d %H:%M %Z}")
+            await asyncio.sleep((wake - datetime.now(MARKET_TZ)).total_seconds())
+            await self._refresh()
+
+    async def _refresh(self):
+        try:
+            await asyncio.to_thread(self.refresh)
+        except QueueFull as e:
+            logger.warning(f"⚠️ Skipped post-close refresh, job queue is full: {e}")
+        except Exception as e:
+            logger.error(f"❌ Error queuing post-close refresh: {e}")
+
+    def stats(self):
+        return {
+            "run_at": settings.SCHEDULER_RUN_AT,
+            "next_run": next_run(datetime.now(MARKET_TZ), self.run_at).isoformat(),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_jobs": self.last_jobs,
+        }
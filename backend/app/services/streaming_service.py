@@ -1,55 +1,44 @@
 import asyncio
 from threading import Thread
 import logging
-from alpaca.data.live import StockDataStream
+import time
 from datetime import datetime
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from app.models import StockPrice, Trade
+from app.models import StockPrice, Trade, Bar
 from app.config import settings
+from app.services.tick_writer import TickWriter
+from app.services.tick_spool import TickSpool, TickReplayer
+from app.services.bar_builder import BarBuilder
+from app.services.quote_store import quote_store
+from app.services.pnl_engine import pnl_engine
 
 # Initialize logger
 logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.WARN)
 logger = logging.getLogger("StreamingService")
 
-# Database setup
-engine = create_engine(settings.DATABASE_URL)
-Session = sessionmaker(bind=engine)
-db = Session()
-
-# Alpaca API keys
-API_KEY = settings.ALPACA_API_KEY
-SECRET_KEY = settings.ALPACA_SECRET_KEY
-
-# StockDataStream client
-stock_stream_client = StockDataStream(
-    api_key=API_KEY,
-    secret_key=SECRET_KEY,
-    url_override=None
-)
+# Seconds between sweeps that close bars for symbols that have gone quiet
+BAR_SWEEP_INTERVAL = 1.0
 
 class StreamingService:
-    def __init__(self, symbols):
+    def __init__(self, symbols, publisher=None):
         self.symbols = symbols
+        self.publisher = publisher  # TickPublisher fanning ticks out to the other workers
+        self.stream = None  # StockDataStream, created by start()
         self.thread = None
         self.running = False
+        self.writer = TickWriter()
+        self.bars = BarBuilder()
+        self.loop = None  # The stream's event loop, where bars are built and queued
+        self._bar_sweeper = None
+        self.spool = None
+        self.replayer = None
+        if settings.TICK_SPOOL_ENABLED:
+            self.spool = TickSpool()
+            self.replayer = TickReplayer(self.spool)
 
     # Handler for processing quote data
     async def quote_data_handler(self, data):
         """Handles incoming quote data from Alpaca."""
         try:
-            # Save quote data to the database
-            quote_record = StockPrice(
-                symbol=data.symbol,
-                price=data.bid_price or data.ask_price,  # Use bid_price if available, otherwise ask_price
-                open=data.bid_price,  # Assign bid_price to open
-                high=data.ask_price,  # Assign ask_price to high
-                low=data.bid_price,   # Assign bid_price to low
-                close=data.ask_price,  # Assign ask_price to close
-                volume=data.bid_size,  # Assign bid_size to volume
-                timestamp=datetime.now()  # Use the current timestamp
-            )
-
             if settings.DEBUG:
                 print(f"""
                 ---- Quote Data ----
@@ -62,9 +51,37 @@ class StreamingService:
                 --------------------
                 """)
 
-            db.add(quote_record)
-            db.commit()
-            db.close()
+            quote_store.update_quote(
+                data.symbol, data.bid_price, data.ask_price, data.bid_size, data.ask_size, data.timestamp
+            )
+            pnl_engine.on_quote(data.symbol, data.bid_price, data.ask_price)
+            if self.publisher is not None:
+                self.publisher.quote(
+                    data.symbol, data.bid_price, data.ask_price, data.bid_size, data.ask_size, data.timestamp
+                )
+
+            timestamp = datetime.now()  # Use the current timestamp
+
+            # Append to the durable spool (replayed into the database in bulk)
+            if self.spool is not None:
+                self.spool.append_quote(
+                    data.symbol, timestamp, data.bid_price, data.ask_price,
+                    data.bid_size, data.ask_size, exchange=data.bid_exchange, tape=data.tape,
+                )
+                return
+
+            # Otherwise queue quote data for the batched writer
+            quote_record = dict(
+                symbol=data.symbol,
+                price=data.bid_price or data.ask_price,  # Use bid_price if available, otherwise ask_price
+                open=data.bid_price,  # Assign bid_price to open
+                high=data.ask_price,  # Assign ask_price to high
+                low=data.bid_price,   # Assign bid_price to low
+                close=data.ask_price,  # Assign ask_price to close
+                volume=data.bid_size,  # Assign bid_size to volume
+                timestamp=timestamp,
+            )
+            await self.writer.submit(StockPrice, quote_record)
 
         except Exception as e:
             logger.error(f"Error processing quote data: {e}")
@@ -89,8 +106,21 @@ class StreamingService:
                     f"Timestamp: {timestamp}, Exchange: {exchange}, Conditions: {conditions}, Tape: {tape}"
                 )
 
-            # Save trade data to the database
-            trade_record = Trade(
+            quote_store.update_trade(symbol, price, size, timestamp)
+            pnl_engine.on_price(symbol, price)
+            if self.publisher is not None:
+                self.publisher.trade(symbol, price, size, timestamp)
+            await self._update_bars(symbol, price, size, timestamp)
+
+            # Append to the durable spool (replayed into the database in bulk)
+            if self.spool is not None:
+                self.spool.append_trade(
+                    symbol, timestamp, price, size, exchange=exchange, tape=tape, conditions=str(conditions),
+                )
+                return
+
+            # Otherwise queue trade data for the batched writer
+            trade_record = dict(
                 symbol=symbol,
                 price=price,
                 size=size,
@@ -99,26 +129,57 @@ class StreamingService:
                 conditions=str(conditions),  # Store as a string for database compatibility
                 tape=tape,
             )
-            db.add(trade_record)
-            db.commit()
-            db.close()
+            await self.writer.submit(Trade, trade_record)
 
         except Exception as e:
             logger.error(f"Error processing trade data: {e}")
 
+    async def _update_bars(self, symbol, price, size, timestamp):
+        """Fold a trade into the rolling bars and queue any closed bars for persistence."""
+        if self._bar_sweeper is None:
+            self.loop = asyncio.get_running_loop()
+            self._bar_sweeper = self.loop.create_task(self._sweep_bars())
+
+        for bar in self.bars.update(symbol, price, size, timestamp):
+            await self.writer.submit(Bar, bar)
+
+    async def _sweep_bars(self):
+        """Close bars for symbols that have gone quiet, without waiting for another trade."""
+        while True:
+            await asyncio.sleep(BAR_SWEEP_INTERVAL)
+            try:
+                for bar in self.bars.close_expired(time.time()):
+                    await self.writer.submit(Bar, bar)
+            except Exception as e:
+                logger.error(f"Error closing expired bars: {e}")
+
+    async def _flush_open_bars(self):
+        """Stop the bar sweep and queue every open bar, so a restart does not drop them."""
+        if self._bar_sweeper is not None:
+            self._bar_sweeper.cancel()
+            self._bar_sweeper = None
+        for bar in self.bars.flush_all():
+            await self.writer.submit(Bar, bar)
+
     def run_streaming_client(self):
         """Run the StockDataStream client in a thread."""
         try:
-            stock_stream_client.subscribe_quotes(self.quote_data_handler, *self.symbols)
-            stock_stream_client.subscribe_trades(self.trade_data_handler, *self.symbols)
-            stock_stream_client.run()
+            self.stream.subscribe_quotes(self.quote_data_handler, *self.symbols)
+            self.stream.subscribe_trades(self.trade_data_handler, *self.symbols)
+            self.stream.run()
         except Exception as e:
             logger.error(f"Error running StockDataStream: {e}")
 
     def start(self):
         """Start the streaming service."""
         if not self.running:
+            from alpaca.data.live import StockDataStream  # Imported on start so importing the app stays cheap
+
             self.running = True
+            self.stream = StockDataStream(api_key=settings.ALPACA_API_KEY, secret_key=settings.ALPACA_SECRET_KEY)
+            if self.spool is not None:
+                self.spool.open()
+                self.replayer.start()
             self.thread = Thread(target=self.run_streaming_client)
             self.thread.start()
             logger.info("Streaming service started.")
@@ -126,8 +187,27 @@ class StreamingService:
     def stop(self):
         """Stop the streaming service."""
         if self.running and self.thread:
-            stock_stream_client.stop()
+            # Queue open bars and drain pending ticks while the stream's event loop is still alive
+            if self.loop is not None and not self.loop.is_closed():
+                try:
+                    asyncio.run_coroutine_threadsafe(self._flush_open_bars(), self.loop).result(timeout=10.0)
+                except Exception as e:
+                    logger.error(f"⚠️ Failed to flush open bars: {e}")
+            self.writer.close_threadsafe()
+            self.stream.stop()
             self.thread.join()
+            if self.spool is not None:
+                self.spool.close()
+                self.replayer.stop()
             self.running = False
             logger.info("Streaming service stopped.")
 
+    def stats(self):
+        """Ingestion counters for the tick writer."""
+        return {
+            "running": self.running,
+            "symbols": self.symbols,
+            "writer": self.writer.stats(),
+            "bars": self.bars.stats(),
+            "spool": self.replayer.stats() if self.replayer is not None else None,
+        }
@@ -0,0 +1,243 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import SweepJob, SweepResult
+from app.services.backtest_engine import check_grid, load_price_matrix, iter_sweep
+from app.services.upsert import insert_rows
+
+logger = logging.getLogger("SweepRunner")
+
+# Metrics persisted per combination
+RESULT_FIELDS = ("total_return", "cagr", "sharpe", "max_drawdown", "trades", "turnover", "final_equity")
+
+
+class SweepRunner:
+    """
+    Runs parameter-sweep jobs in the background.
+
+    Jobs are rows in `sweep_jobs`; a small thread pool picks them up, evaluates the
+    grid with `iter_sweep` (shared-memory matrix, process pool) and appends each
+    finished chunk to `sweep_results`, bumping the job's `completed` counter in the
+    same commit so progress can be polled while the sweep runs.
+
+    Several API workers may share the table: a job is claimed with a conditional
+    UPDATE (queued -> running), and the claiming runner records itself as `owner`
+    and refreshes `heartbeat_at` while the job runs, so a restarting worker only
+    requeues jobs whose owner has stopped heartbeating.
+    """
+
+    def __init__(self, max_jobs: int = None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_jobs or settings.SWEEP_MAX_CONCURRENT_JOBS, thread_name_prefix="sweep"
+        )
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running = set()  # Job ids this runner owns
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+
+    def create_job(self, db: Session, strategy: str, symbols: list, params: dict, job_settings: dict = None):
+        """
+        Validate and queue a sweep.
+
+        Raises:
+            ValueError: Unknown strategy or oversized grid.
+        """
+        total = check_grid(strategy, params)
+        job = SweepJob(
+            strategy=strategy,
+            symbols=list(dict.fromkeys(symbol.upper() for symbol in symbols)),
+            params=params,
+            settings=job_settings or {},
+            status="queued",
+            total=total,
+            completed=0,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self.submit(job.id)
+        return job
+
+    def submit(self, job_id: int):
+        self._start_heartbeat()
+        self.executor.submit(self._run, job_id)
+
+    def resume(self):
+        """
+        Pick up queued jobs and requeue running ones whose owner stopped heartbeating
+        (e.g. the worker was restarted), discarding their partial results.
+        """
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.SWEEP_STALE_AFTER)
+            stale = db.query(SweepJob.id).filter(
+                SweepJob.status == "running", or_(SweepJob.heartbeat_at.is_(None), SweepJob.heartbeat_at < cutoff)
+            ).all()
+            requeued = 0
+            for (job_id,) in stale:
+                # Conditional, so concurrent resumes (or a late heartbeat) requeue a job at most once
+                reset = db.execute(
+                    update(SweepJob)
+                    .where(SweepJob.id == job_id, SweepJob.status == "running",
+                           or_(SweepJob.heartbeat_at.is_(None), SweepJob.heartbeat_at < cutoff))
+                    .values(status="queued", completed=0, started_at=None, owner=None, heartbeat_at=None)
+                ).rowcount
+                if reset:
+                    db.execute(delete(SweepResult).where(SweepResult.job_id == job_id))
+                    requeued += 1
+                db.commit()
+
+            # Claims are atomic, so submitting a job another runner also picks up is harmless
+            for (job_id,) in db.query(SweepJob.id).filter(SweepJob.status == "queued").all():
+                self.submit(job_id)
+            if requeued:
+                logger.info(f"Requeued {requeued} interrupted sweep jobs.")
+        finally:
+            db.close()
+
+    def shutdown(self):
+        self._stop.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="sweep-heartbeat", daemon=True)
+                self._heartbeat_thread.start()
+
+    def _heartbeat(self):
+        """Refresh `heartbeat_at` on the jobs this runner owns every SWEEP_HEARTBEAT_INTERVAL."""
+        while not self._stop.wait(settings.SWEEP_HEARTBEAT_INTERVAL):
+            with self._lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(SweepJob)
+                    .where(SweepJob.id.in_(job_ids), SweepJob.owner == self.owner, SweepJob.status == "running")
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                db.commit()
+            except Exception as e:
+                logger.warning(f"⚠️ Sweep heartbeat failed: {e}")
+            finally:
+                db.close()
+
+    def _update_owned(self, db: Session, job_id: int, **values):
+        """Update a running job only while this runner still owns it; returns whether it did."""
+        return db.execute(
+            update(SweepJob)
+            .where(SweepJob.id == job_id, SweepJob.owner == self.owner, SweepJob.status == "running")
+            .values(**values)
+        ).rowcount > 0
+
+    def _run(self, job_id: int):
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            claimed = db.execute(
+                update(SweepJob)
+                .where(SweepJob.id == job_id, SweepJob.status == "queued")
+                .values(status="running", owner=self.owner, started_at=now, heartbeat_at=now)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return  # Unknown, already claimed elsewhere, or finished
+            with self._lock:
+                self._running.add(job_id)
+            job = db.get(SweepJob, job_id)
+
+            options = job.settings or {}
+            matrix = load_price_matrix(
+                db,
+                job.symbols,
+                _parse_date(options.get("start_date")),
+                _parse_date(options.get("end_date")),
+                options.get("source"),
+            )
+            if matrix is None:
+                raise ValueError("No historical prices found for the requested symbols.")
+            missing = [symbol for symbol in job.symbols if symbol not in matrix.symbols]
+            if missing:
+                logger.warning(f"⚠️ Sweep job {job_id}: no historical prices for {missing}; running without them.")
+
+            chunks = iter_sweep(
+                matrix,
+                job.strategy,
+                job.params,
+                commission_bps=options.get("commission_bps", 0.0),
+                slippage_bps=options.get("slippage_bps", 0.0),
+                initial_capital=options.get("initial_capital", 100_000.0),
+            )
+            completed = 0
+            for chunk in chunks:
+                # Progress, results and the ownership check commit together: once another
+                # worker has requeued the job, nothing more from this run is written
+                if not self._update_owned(db, job_id, completed=SweepJob.completed + len(chunk),
+                                          heartbeat_at=datetime.utcnow()):
+                    db.rollback()
+                    logger.warning(f"⚠️ Sweep job {job_id} was requeued by another worker; abandoning it.")
+                    chunks.close()
+                    return
+                insert_rows(db, SweepResult, [
+                    dict(job_id=job_id, params=result["params"], **{field: result[field] for field in RESULT_FIELDS})
+                    for result in chunk
+                ])
+                db.commit()
+                completed += len(chunk)
+
+            if self._update_owned(db, job_id, status="completed", finished_at=datetime.utcnow()):
+                logger.info(f"✅ Sweep job {job_id} finished: {completed} combinations.")
+            else:
+                logger.warning(f"⚠️ Sweep job {job_id} was requeued by another worker before it finished.")
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Sweep job {job_id} failed: {e}")
+            self._update_owned(db, job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+            db.commit()
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+            db.close()
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def job_progress(job: SweepJob):
+    """Status dict for a sweep job, including throughput while it runs."""
+    elapsed = None
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+    return {
+        "id": job.id,
+        "strategy": job.strategy,
+        "symbols": job.symbols,
+        "params": job.params,
+        "status": job.status,
+        "total": job.total,
+        "completed": job.completed,
+        "progress": job.completed / job.total if job.total else None,
+        "combinations_per_minute": job.completed / elapsed * 60 if elapsed else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# Process-wide runner used by the /api/tasks sweep endpoints
+sweep_runner = SweepRunner()
@@ -0,0 +1,145 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from app.config import settings
+from app.services.quote_store import quote_store
+from app.services.pnl_engine import pnl_engine
+
+logger = logging.getLogger("TickFanout")
+
+# Redis pub/sub channel carrying the ingest leader's quote and trade events
+CHANNEL = "ishara:ticks"
+
+
+def _iso(timestamp):
+    return timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+
+
+def _parse(timestamp):
+    return datetime.fromisoformat(timestamp) if timestamp else None
+
+
+class TickPublisher:
+    """
+    Leader side of the fan-out: the stream handlers record quote and trade events,
+    and a background thread publishes them every TICK_FANOUT_INTERVAL as one JSON
+    array, so pub/sub traffic is a handful of messages per second however fast
+    ticks arrive. Events that fail to publish are dropped; followers catch up on
+    the next tick for the symbol.
+    """
+
+    def __init__(self, client, interval: float = None):
+        self.client = client
+        self.interval = interval or settings.TICK_FANOUT_INTERVAL
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.batches = 0
+        self.failed = 0
+
+    def quote(self, symbol, bid_price, ask_price, bid_size, ask_size, timestamp=None):
+        with self._lock:
+            self._pending.append(["q", symbol, bid_price, ask_price, bid_size, ask_size, _iso(timestamp)])
+
+    def trade(self, symbol, price, size, timestamp=None):
+        with self._lock:
+            self._pending.append(["t", symbol, price, size, _iso(timestamp)])
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            self.client.publish(CHANNEL, json.dumps(batch))
+            self.published += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"❌ Failed to publish {len(batch)} tick events: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="tick-publisher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {"published": self.published, "batches": self.batches, "failed": self.failed}
+
+
+class TickSubscriber:
+    """
+    Follower side of the fan-out: applies the leader's events to this process's
+    quote store and P&L engine, so the quotes and portfolio routes answer the same
+    on every worker without a second upstream stream.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._stop = threading.Event()
+        self._thread = None
+        self.received = 0
+        self.last_message_at = None
+
+    def apply(self, events: list):
+        for event in events:
+            if event[0] == "q":
+                _, symbol, bid_price, ask_price, bid_size, ask_size, timestamp = event
+                quote_store.update_quote(symbol, bid_price, ask_price, bid_size, ask_size, _parse(timestamp))
+                pnl_engine.on_quote(symbol, bid_price, ask_price)
+            else:
+                _, symbol, price, size, timestamp = event
+                quote_store.update_trade(symbol, price, size, _parse(timestamp))
+                pnl_engine.on_price(symbol, price)
+        self.received += len(events)
+        self.last_message_at = time.time()
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(CHANNEL)
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.apply(json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"❌ Tick subscription lost, retrying in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                pubsub.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="tick-subscriber", daemon=True)
+            self._thread.start()
+            logger.info(f"📡 Following the ingest leader's ticks on {CHANNEL}")
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {"running": self._thread is not None, "received": self.received, "last_message_at": self.last_message_at}
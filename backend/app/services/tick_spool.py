@@ -0,0 +1,391 @@
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from app.config import settings
+from app.models import StockPrice, Trade
+from app.services.tick_writer import write_batch
+
+logger = logging.getLogger("TickSpool")
+
+KIND_EMPTY = 0
+KIND_QUOTE = 1
+KIND_TRADE = 2
+
+# Fixed-width 96-byte record shared by quotes and trades:
+#   kind, symbol, timestamp (ns since epoch, UTC), price_a, price_b, size_a, size_b,
+#   exchange, tape, conditions
+# Quotes store bid/ask in price_a/price_b and bid/ask sizes in size_a/size_b;
+# trades store price/size in the *_a fields. Missing prices are stored as NaN and
+# missing sizes as MISSING_SIZE, and both read back as None.
+RECORD = struct.Struct("<B15sqddqq8s4s28s")
+RECORD_SIZE = RECORD.size
+
+MISSING_SIZE = -(2 ** 63)
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".spool"
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def _encode(value, width):
+    if value is None:
+        return b""
+    return str(value).encode("ascii", "replace")[:width]
+
+
+def _decode(raw):
+    return raw.rstrip(b"\x00").decode("ascii") or None
+
+
+def _pack_price(value):
+    return math.nan if value is None else float(value)
+
+
+def _unpack_price(value):
+    return None if math.isnan(value) else value
+
+
+def _pack_size(value):
+    return MISSING_SIZE if value is None else int(value)
+
+
+def _unpack_size(value):
+    return None if value == MISSING_SIZE else value
+
+
+def _to_ns(value):
+    """Convert a datetime (naive values are treated as UTC) to integer nanoseconds."""
+    if value is None:
+        value = datetime.utcnow()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp()) * 1_000_000_000 + value.microsecond * 1000
+
+
+def _from_ns(value):
+    seconds, nanos = divmod(value, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None, microsecond=nanos // 1000)
+
+
+def record_to_row(record):
+    """
+    Convert an unpacked spool record into the (model, row) pair the tick writer inserts.
+
+    Args:
+        record (tuple): Fields as returned by `RECORD.unpack`.
+
+    Returns:
+        tuple: (SQLAlchemy model, column dict).
+    """
+    kind, symbol, ts, price_a, price_b, size_a, size_b, exchange, tape, conditions = record
+    symbol = _decode(symbol)
+    timestamp = _from_ns(ts)
+    price_a, price_b = _unpack_price(price_a), _unpack_price(price_b)
+    size_a = _unpack_size(size_a)
+
+    if kind == KIND_QUOTE:
+        return StockPrice, dict(
+            symbol=symbol,
+            price=price_a or price_b,
+            open=price_a,
+            high=price_b,
+            low=price_a,
+            close=price_b,
+            volume=size_a,
+            timestamp=timestamp,
+        )
+
+    return Trade, dict(
+        symbol=symbol,
+        price=price_a,
+        size=size_a,
+        timestamp=timestamp,
+        exchange=_decode(exchange),
+        conditions=_decode(conditions),
+        tape=_decode(tape),
+    )
+
+
+class TickSpool:
+    """
+    Append-only, memory-mapped spool of fixed-width tick records.
+
+    The stream thread appends records with `append_quote`/`append_trade`, which is a
+    single `struct.pack_into` on a pre-sized mmap segment. A record's kind byte is
+    written last, so a reader never sees a half-written record: the committed part of
+    a segment is always the prefix of non-empty kind bytes. Full segments roll over to
+    a new file; `TickReplayer` drains them into Postgres and deletes them once replayed.
+    """
+
+    def __init__(self, directory: str = settings.TICK_SPOOL_DIR,
+                 segment_records: int = settings.TICK_SPOOL_SEGMENT_RECORDS):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.segment = None
+        self.index = 0
+        self.appended = 0
+        self._file = None
+        self._mm = None
+
+    # Segment helpers shared with the replayer
+    def segment_path(self, segment: int):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}")
+
+    def segments(self):
+        """Sorted list of segment numbers currently on disk."""
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(numbers)
+
+    def open(self):
+        """Map the newest segment and resume appending after its last committed record."""
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.segments()
+        segment = existing[-1] if existing else 0
+        self._map_segment(segment)
+        self.index = self._committed_count(self._mm, 0, self.segment_records)
+        if self.index >= self.segment_records:
+            self._rotate()
+        logger.info(f"Tick spool opened at segment {self.segment}, record {self.index}.")
+
+    def _map_segment(self, segment: int):
+        path = self.segment_path(segment)
+        self._file = open(path, "a+b")
+        if os.path.getsize(path) < self.segment_records * RECORD_SIZE:
+            self._file.truncate(self.segment_records * RECORD_SIZE)
+        self._mm = mmap.mmap(self._file.fileno(), self.segment_records * RECORD_SIZE)
+        self.segment = segment
+        self.index = 0
+
+    def _unmap(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+            self._file = None
+
+    def _rotate(self):
+        next_segment = self.segment + 1
+        self._unmap()
+        self._map_segment(next_segment)
+
+    @staticmethod
+    def _committed_count(mm, start: int, end: int):
+        """Number of committed records in [start, end), found from the strided kind bytes."""
+        kinds = mm[start * RECORD_SIZE:end * RECORD_SIZE:RECORD_SIZE]
+        empty = kinds.find(b"\x00")
+        return start + (len(kinds) if empty == -1 else empty)
+
+    def _append(self, kind, symbol, timestamp, price_a, price_b, size_a, size_b, exchange, tape, conditions):
+        if self._mm is None:
+            self.open()
+        if self.index >= self.segment_records:
+            self._rotate()
+
+        offset = self.index * RECORD_SIZE
+        RECORD.pack_into(
+            self._mm, offset, KIND_EMPTY, _encode(symbol, 15), _to_ns(timestamp),
+            _pack_price(price_a), _pack_price(price_b), _pack_size(size_a), _pack_size(size_b),
+            _encode(exchange, 8), _encode(tape, 4), _encode(conditions, 28),
+        )
+        self._mm[offset] = kind  # Commit the record
+        self.index += 1
+        self.appended += 1
+
+    def append_quote(self, symbol, timestamp, bid_price, ask_price, bid_size, ask_size, exchange=None, tape=None):
+        """Append a quote record to the spool."""
+        self._append(KIND_QUOTE, symbol, timestamp, bid_price, ask_price, bid_size, ask_size, exchange, tape, None)
+
+    def append_trade(self, symbol, timestamp, price, size, exchange=None, tape=None, conditions=None):
+        """Append a trade record to the spool."""
+        self._append(KIND_TRADE, symbol, timestamp, price, None, size, None, exchange, tape, conditions)
+
+    def close(self):
+        """Flush the active segment to disk and unmap it."""
+        self._unmap()
+
+
+class TickReplayer:
+    """
+    Background thread that drains spooled ticks into `stock_prices`/`trades` in bulk.
+
+    The replay position (segment, record) is persisted in a checkpoint file after every
+    successful batch, so a restart resumes exactly where the last commit left off. If a
+    batch fails (e.g. Postgres is down for maintenance) the position does not move and
+    the batch is retried with exponential backoff; ticks keep accumulating on disk.
+    """
+
+    def __init__(self, spool: TickSpool,
+                 batch_size: int = settings.TICK_REPLAY_BATCH_SIZE,
+                 poll_interval: float = settings.TICK_REPLAY_POLL_INTERVAL,
+                 max_backoff: float = settings.TICK_REPLAY_MAX_BACKOFF):
+        self.spool = spool
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.checkpoint_path = os.path.join(spool.directory, CHECKPOINT_FILE)
+
+        self.segment, self.index = None, 0
+        self._mm = None
+        self._file = None
+        self._mapped_segment = None
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.counters = {
+            "replayed": 0,
+            "batches": 0,
+            "failures": 0,
+            "last_batch_ms": 0.0,
+            "last_error": None,
+        }
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            return checkpoint["segment"], checkpoint["index"]
+        except FileNotFoundError:
+            existing = self.spool.segments()
+            return (existing[0] if existing else 0), 0
+        except (ValueError, KeyError) as e:
+            logger.error(f"⚠️ Corrupt spool checkpoint, replaying from the oldest segment: {e}")
+            existing = self.spool.segments()
+            return (existing[0] if existing else 0), 0
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"segment": self.segment, "index": self.index}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _map(self, segment: int):
+        self._unmap()
+        path = self.spool.segment_path(segment)
+        if not os.path.exists(path):
+            return False
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_segment = segment
+        return True
+
+    def _unmap(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+            self._file = None
+            self._mapped_segment = None
+
+    def _advance_segment(self):
+        """Move past a fully replayed segment once the writer has rolled over, deleting it."""
+        if not os.path.exists(self.spool.segment_path(self.segment + 1)):
+            return False
+        finished = self.segment
+        self._unmap()
+        self.segment, self.index = finished + 1, 0
+        self._save_checkpoint()
+        try:
+            os.remove(self.spool.segment_path(finished))
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove replayed spool segment {finished}: {e}")
+        return True
+
+    def replay_once(self):
+        """
+        Replay at most one batch.
+
+        Returns:
+            int: Number of records written (0 when the spool is drained).
+        """
+        if self._mapped_segment != self.segment and not self._map(self.segment):
+            # Segment missing (e.g. checkpoint from a wiped spool): jump to the oldest one on disk
+            existing = [s for s in self.spool.segments() if s > self.segment]
+            if not existing:
+                return 0
+            self.segment, self.index = existing[0], 0
+            return self.replay_once()
+
+        capacity = len(self._mm) // RECORD_SIZE
+        if self.index >= capacity:
+            return self.replay_once() if self._advance_segment() else 0
+
+        end = TickSpool._committed_count(self._mm, self.index, min(self.index + self.batch_size, capacity))
+        if end == self.index:
+            return 0
+
+        grouped = {}
+        for record in RECORD.iter_unpack(self._mm[self.index * RECORD_SIZE:end * RECORD_SIZE]):
+            model, row = record_to_row(record)
+            grouped.setdefault(model, []).append(row)
+
+        started = time.perf_counter()
+        written = write_batch(grouped)
+        self.counters["last_batch_ms"] = (time.perf_counter() - started) * 1000
+
+        self.index = end
+        self._save_checkpoint()
+        self.counters["replayed"] += written
+        self.counters["batches"] += 1
+        return written
+
+    def _run(self):
+        backoff = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                written = self.replay_once()
+                backoff = self.poll_interval
+            except Exception as e:
+                self.counters["failures"] += 1
+                self.counters["last_error"] = str(e)
+                logger.error(f"❌ Spool replay failed, retrying in {backoff:.1f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            if written == 0:
+                self._stop.wait(self.poll_interval)
+
+        # Final drain so a clean shutdown leaves nothing behind
+        try:
+            while self.replay_once():
+                pass
+        except Exception as e:
+            logger.error(f"⚠️ Spool not fully drained on shutdown, will resume on restart: {e}")
+        self._unmap()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.segment, self.index = self._load_checkpoint()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="tick-replayer", daemon=True)
+            self._thread.start()
+            logger.info(f"Tick replayer started at segment {self.segment}, record {self.index}.")
+
+    def stop(self, timeout: float = 30.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            logger.info("Tick replayer stopped.")
+
+    def stats(self):
+        pending = None
+        if self.spool.segment is not None and self.segment is not None:
+            pending = (self.spool.segment - self.segment) * self.spool.segment_records + self.spool.index - self.index
+        return {
+            **self.counters,
+            "appended": self.spool.appended,
+            "pending": pending,
+            "segment": self.segment,
+            "index": self.index,
+        }
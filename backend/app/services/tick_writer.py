@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Bar
+from app.services.upsert import upsert_bars
+
+logger = logging.getLogger("TickWriter")
+
+DROP_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+# Models with a natural key are upserted, so a duplicate cannot fail the whole batch
+UPSERTS = {Bar: upsert_bars}
+
+# Sentinel used to wake the writer loop on shutdown
+_STOP = object()
+
+
+def write_batch(batch: dict):
+    """
+    Insert a batch of rows in one transaction using multi-row INSERTs
+    (upserts for the models in `UPSERTS`).
+
+    Args:
+        batch (dict): Mapping of SQLAlchemy model -> list of column dicts.
+
+    Returns:
+        int: Number of rows written.
+    """
+    session = SessionLocal()
+    try:
+        written = 0
+        for model, rows in batch.items():
+            if not rows:
+                continue
+            if model in UPSERTS:
+                UPSERTS[model](session, rows)
+            else:
+                session.execute(insert(model), rows)
+            written += len(rows)
+        session.commit()
+        return written
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+class TickWriter:
+    """
+    Bounded asyncio queue between the stream handlers and Postgres.
+
+    Handlers call `submit()` and return immediately; a single writer task drains
+    the queue and flushes rows in batches, either when `batch_size` rows are
+    pending or `flush_interval` seconds after the first row of a batch arrived.
+    Database round-trips run on a dedicated thread so the websocket loop never
+    blocks on Postgres.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.TICK_QUEUE_MAXSIZE,
+        batch_size: int = settings.TICK_BATCH_SIZE,
+        flush_interval: float = settings.TICK_FLUSH_INTERVAL,
+        drop_policy: str = settings.TICK_DROP_POLICY,
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+
+        self.loop = None
+        self.queue = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tick-writer")
+
+        self.counters = {
+            "enqueued": 0,
+            "dropped": 0,
+            "rows_written": 0,
+            "rows_failed": 0,
+            "batches_flushed": 0,
+            "max_queue_depth": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Create the queue and writer task on the currently running event loop."""
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = self.loop.create_task(self._run())
+        logger.info(
+            f"Tick writer started (queue={self.max_queue_size}, batch={self.batch_size}, "
+            f"interval={self.flush_interval}s, policy={self.drop_policy})."
+        )
+
+    async def submit(self, model, row: dict):
+        """
+        Enqueue a row for insertion, applying the configured back-pressure policy.
+
+        Args:
+            model: SQLAlchemy model class the row belongs to.
+            row (dict): Column values for the new row.
+
+        Returns:
+            bool: False if the row (or an older one) was dropped to make room.
+        """
+        if not self.running:
+            self.start()
+
+        item = (model, row)
+        accepted = True
+        queued = True
+        if self.drop_policy == "block":
+            await self.queue.put(item)
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.counters["dropped"] += 1
+                accepted = False
+                if self.drop_policy == "drop_oldest":
+                    self.queue.get_nowait()
+                    self.queue.put_nowait(item)
+                else:
+                    queued = False  # drop_newest: this row never entered the queue
+
+        if queued:
+            self.counters["enqueued"] += 1
+        depth = self.queue.qsize()
+        if depth > self.counters["max_queue_depth"]:
+            self.counters["max_queue_depth"] = depth
+        return accepted
+
+    async def _collect(self):
+        """Wait for the next batch: returns when it is full, the interval elapses or on stop."""
+        first = await self.queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = self.loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+        # Drain anything submitted before the stop sentinel was queued
+        remaining = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i:i + self.batch_size])
+
+    async def _flush(self, items: list):
+        grouped = {}
+        for model, row in items:
+            grouped.setdefault(model, []).append(row)
+
+        started = time.perf_counter()
+        try:
+            written = await self.loop.run_in_executor(self._executor, write_batch, grouped)
+            self.counters["rows_written"] += written
+            self.counters["batches_flushed"] += 1
+        except Exception as e:
+            self.counters["rows_failed"] += len(items)
+            logger.error(f"❌ Failed to flush {len(items)} ticks: {e}")
+            return
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.counters["last_flush_ms"] = elapsed_ms
+            self.counters["max_flush_ms"] = max(self.counters["max_flush_ms"], elapsed_ms)
+            self.counters["total_flush_ms"] += elapsed_ms
+
+        self.counters["last_batch_size"] = len(items)
+        self.counters["max_batch_size"] = max(self.counters["max_batch_size"], len(items))
+
+    async def close(self):
+        """Flush everything still queued and stop the writer task."""
+        if not self.running:
+            return
+        await self.queue.put(_STOP)
+        await self._task
+        logger.info("Tick writer stopped.")
+
+    def close_threadsafe(self, timeout: float = 10.0):
+        """Close the writer from a thread other than the one running its event loop."""
+        if not self.running or self.loop.is_closed():
+            return
+        future = asyncio.run_coroutine_threadsafe(self.close(), self.loop)
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            logger.error(f"⚠️ Tick writer did not shut down cleanly: {e}")
+
+    def stats(self):
+        """Snapshot of queue depth, batch size and flush latency counters."""
+        batches = self.counters["batches_flushed"]
+        return {
+            **self.counters,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "queue_capacity": self.max_queue_size,
+            "avg_batch_size": self.counters["rows_written"] / batches if batches else 0.0,
+            "avg_flush_ms": self.counters["total_flush_ms"] / batches if batches else 0.0,
+            "drop_policy": self.drop_policy,
+        }
@@ -0,0 +1,133 @@
+import logging
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Bar, HistoricalPrice
+
+logger = logging.getLogger("Upsert")
+
+HISTORICAL_PRICE_KEY = ("symbol", "date", "source")
+BAR_KEY = ("symbol", "timeframe", "start")
+
+
+def _dialect_insert(db: Session, model):
+    """Dialect-specific INSERT construct, which is what provides ON CONFLICT support."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for the '{dialect}' dialect")
+    return dialect_insert(model)
+
+
+def upsert_rows(db: Session, model, rows: list, conflict_columns: tuple, update_columns: tuple = None,
+                chunk_size: int = settings.UPSERT_CHUNK_SIZE, merge=None):
+    """
+    Set-based `INSERT ... ON CONFLICT DO UPDATE` of many rows.
+
+    Rows are de-duplicated on the conflict key first (last one wins), since Postgres
+    rejects a statement that touches the same row twice. The statement is compiled
+    once and executed with a parameter list per chunk, which SQLAlchemy sends as
+    multi-row VALUES batches ("insertmanyvalues"). The caller owns the transaction.
+
+    Args:
+        db (Session): Database session.
+        model: SQLAlchemy model class.
+        rows (list): Column dicts; all rows must have the same keys.
+        conflict_columns (tuple): Columns of the unique constraint to upsert on.
+        update_columns (tuple): Columns to overwrite on conflict (default: all non-key columns).
+        chunk_size (int): Rows per execute() call.
+        merge: Optional `(table, excluded) -> {column: expression}` overriding how
+            those columns combine the stored and incoming values on conflict.
+
+    Returns:
+        int: Number of rows sent to the database.
+    """
+    if not rows:
+        return 0
+
+    deduped = {tuple(row[column] for column in conflict_columns): row for row in rows}
+    rows = list(deduped.values())
+
+    columns = list(rows[0].keys())
+    if update_columns is None:
+        update_columns = [column for column in columns if column not in conflict_columns]
+    stmt = _dialect_insert(db, model)
+    if update_columns:
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        if merge is not None:
+            set_.update(merge(model.__table__.c, stmt.excluded))
+        stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+    for i in range(0, len(rows), chunk_size):
+        db.execute(stmt, rows[i:i + chunk_size])
+
+    return len(rows)
+
+
+def upsert_historical_prices(db: Session, rows: list):
+    """Upsert `HistoricalPrice` rows keyed on (symbol, date, source)."""
+    return upsert_rows(db, HistoricalPrice, rows, HISTORICAL_PRICE_KEY)
+
+
+def _merge_bar(stored: dict, bar: dict):
+    """Fold a later partial bar for the same interval into `stored` (both row dicts)."""
+    volume = stored["volume"] + bar["volume"]
+    if volume:
+        stored["vwap"] = ((stored["vwap"] or 0.0) * stored["volume"] + (bar["vwap"] or 0.0) * bar["volume"]) / volume
+    else:
+        stored["vwap"] = bar["vwap"]
+    stored["high"] = max(stored["high"], bar["high"])
+    stored["low"] = min(stored["low"], bar["low"])
+    stored["close"] = bar["close"]
+    stored["volume"] = volume
+    stored["trade_count"] = (stored["trade_count"] or 0) + (bar["trade_count"] or 0)
+
+
+def _bar_conflict_set(table, excluded):
+    """ON CONFLICT expressions combining a stored bar with an incoming partial bar for its interval."""
+    volume = table.volume + excluded.volume
+    return {
+        "open": table.open,
+        "high": case((excluded.high > table.high, excluded.high), else_=table.high),
+        "low": case((excluded.low < table.low, excluded.low), else_=table.low),
+        "close": excluded.close,
+        "volume": volume,
+        "vwap": case(
+            (volume > 0, (func.coalesce(table.vwap, 0.0) * table.volume
+                          + func.coalesce(excluded.vwap, 0.0) * excluded.volume) / volume),
+            else_=excluded.vwap,
+        ),
+        "trade_count": func.coalesce(table.trade_count, 0) + func.coalesce(excluded.trade_count, 0),
+    }
+
+
+def upsert_bars(db: Session, rows: list):
+    """
+    Upsert closed `Bar` rows keyed on (symbol, timeframe, start).
+
+    A bar that already exists for the interval, e.g. persisted by a previous process
+    or ingest leader before a late trade reopened it here, is merged rather than
+    replaced: the stored open is kept, high/low widen, close takes the newer bar,
+    and volume, trade count and VWAP accumulate. Repeats within `rows` are merged
+    the same way first (in order), since `upsert_rows` would keep only the last.
+    """
+    merged = {}
+    for row in rows:
+        key = tuple(row[column] for column in BAR_KEY)
+        if key in merged:
+            _merge_bar(merged[key], row)
+        else:
+            merged[key] = dict(row)
+    return upsert_rows(db, Bar, list(merged.values()), BAR_KEY, merge=_bar_conflict_set)
+
+
+def insert_rows(db: Session, model, rows: list):
+    """Plain bulk INSERT for tables without a natural key (executemany / insertmanyvalues)."""
+    if rows:
+        db.execute(insert(model), rows)
+    return len(rows)
@@ -1,15 +1,68 @@
-import yfinance as yf
 import numpy as np
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.models import HistoricalPrice, RealTimePrice, Option
+from app.config import settings
+from app.models import RealTimePrice, Option
+from app.services.fetch_pool import ConcurrentFetcher, get_rate_limiter, retry_with_backoff
+from app.services.upsert import upsert_historical_prices, insert_rows
+from app.services.columnar import frame_to_rows, INDEX, FLOAT, INT, DATETIME, STRING
 
 logger = logging.getLogger("YahooFinanceService")
 
+# Key for the shared rate limiter covering all yfinance calls
+YAHOO_HOST = "query2.finance.yahoo.com"
+
+# HistoricalPrice.source for rows written by this service
+YAHOO_SOURCE = "Yahoo Finance"
+
+# Column specs for the columnar DataFrame -> row conversion
+HISTORY_COLUMNS = {
+    "date": (INDEX, DATETIME),
+    "open": ("Open", FLOAT),
+    "high": ("High", FLOAT),
+    "low": ("Low", FLOAT),
+    "close": ("Close", FLOAT),
+    "volume": ("Volume", INT),
+    "dividend": ("dividend", FLOAT),
+    "split": ("split", FLOAT),
+}
+
+OPTION_COLUMNS = {
+    "strike_price": ("strike", FLOAT),
+    "expiration_date": ("expiration", DATETIME),
+    "option_type": ("option_type", STRING),
+    "last_price": ("lastPrice", FLOAT),
+    "bid_price": ("bid", FLOAT),
+    "ask_price": ("ask", FLOAT),
+    "volume": ("volume", INT),
+    "open_interest": ("openInterest", INT),
+    "implied_volatility": ("impliedVolatility", FLOAT),
+}
+
+
+def expiration_window(days: int = None):
+    """
+    Option expirations to download: today through `days` (OPTIONS_EXPIRATION_DAYS) ahead.
+
+    Returns:
+        tuple: (first, last) expiration dates in `YYYY-MM-DD` format.
+    """
+    today = datetime.utcnow()
+    days = settings.OPTIONS_EXPIRATION_DAYS if days is None else days
+    return today.strftime("%Y-%m-%d"), (today + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _align(series, index):
+    """Reindex a dividends/splits series onto the history's dates (None when there are none)."""
+    if series is None or series.empty:
+        return None
+    return series.reindex(index)
+
 class YahooFinanceService:
     def __init__(self, db: Session):
         self.db = db
+        self.failed_symbols = set()  # Symbols whose last fetch errored (as opposed to returning no data)
 
     @staticmethod
     def safe_convert(value, target_type, default=None):
@@ -36,108 +89,158 @@ class YahooFinanceService:
         except (ValueError, TypeError):
             return default
 
-    def fetch_historical_data(self, symbols: list, date_range: tuple):
+    def _call(self, func, *args, **kwargs):
+        """Call a yfinance function under the shared Yahoo rate limit, retrying with jittered backoff."""
+        return retry_with_backoff(
+            func, *args,
+            retries=settings.YAHOO_MAX_RETRIES,
+            base_delay=settings.YAHOO_RETRY_BASE_DELAY,
+            limiter=get_rate_limiter(YAHOO_HOST, settings.YAHOO_RATE_LIMIT, settings.YAHOO_RATE_BURST),
+            **kwargs,
+        )
+
+    def _download_symbol(self, symbol: str, start_date: str, end_date: str, expiration_range: tuple):
         """
-        Fetch historical stock data and options data for a list of symbols within a given date range.
+        Download history, dividends, splits and option chains for one symbol.
+
+        History covers [start_date, end_date]; option chains are those expiring within
+        `expiration_range`, which is independent of the history range (yfinance only
+        lists live expirations, so a past range would select none).
+
+        Network only: runs on a fetch-pool thread and never touches the DB session.
+
+        Returns:
+            dict: Raw yfinance results, or None when there is no history in the range.
+        """
+        import yfinance as yf  # Heavy (pulls in pandas); imported on first fetch
+
+        logger.info(f"📊 Fetching Yahoo Finance data for {symbol} from {start_date} to {end_date}...")
+        stock = yf.Ticker(symbol)
+
+        # Fetch historical price data within the date range
+        history = self._call(stock.history, start=start_date, end=end_date, interval="1d")
+        if history.empty:
+            logger.warning(f"⚠️ No historical data found for {symbol} within {start_date} to {end_date}.")
+            return None
+
+        # Fetch dividends and splits
+        dividends, splits = None, None
+        try:
+            dividends = self._call(lambda: stock.dividends)
+            splits = self._call(lambda: stock.splits)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to fetch dividends/splits for {symbol}: {e}")
+
+        # Fetch options data for the requested expirations
+        first_expiration, last_expiration = expiration_range
+        chains = []
+        try:
+            for expiration_date in self._call(lambda: stock.options):
+                if not (first_expiration <= expiration_date <= last_expiration):
+                    continue
+                options_chain = self._call(stock.option_chain, expiration_date)
+                chains.append((expiration_date, options_chain.calls, options_chain.puts))
+        except Exception as e:
+            logger.error(f"⚠️ Failed to fetch options data for {symbol}: {e}")
+
+        return {"history": history, "dividends": dividends, "splits": splits, "chains": chains}
+
+    def _build_rows(self, symbol: str, download: dict):
+        """Convert one symbol's raw download into `HistoricalPrice` and `Option` row dicts, column-wise."""
+        fetched_at = datetime.utcnow()  # Also the option chain's snapshot timestamp
+        history = download["history"]
+        history = history.assign(
+            dividend=_align(download["dividends"], history.index),
+            split=_align(download["splits"], history.index),
+        )
+        historical_data = frame_to_rows(
+            history, HISTORY_COLUMNS,
+            constants={"symbol": symbol, "timestamp": fetched_at, "source": YAHOO_SOURCE},
+        )
+
+        chains = [
+            frame.assign(option_type=option_type, expiration=expiration_date)
+            for expiration_date, calls, puts in download["chains"]
+            for option_type, frame in (("call", calls), ("put", puts))
+            if frame is not None and not frame.empty
+        ]
+        options_data = []
+        if chains:
+            import pandas as pd
+
+            options_data = frame_to_rows(
+                pd.concat(chains, ignore_index=True), OPTION_COLUMNS, constants={"symbol": symbol, "timestamp": fetched_at}
+            )
+
+        return historical_data, options_data
+
+    def iter_historical_data(self, symbols: list, date_range: tuple, expiration_range: tuple = None):
+        """
+        Fetch symbols concurrently and store each one as soon as its download finishes.
+
+        Downloads run on a bounded thread pool under a shared per-host token bucket;
+        conversion and DB writes stay on the calling thread, which owns the session.
 
         Args:
             symbols (list): List of stock symbols to fetch data for.
             date_range (tuple): A tuple of (start_date, end_date) in `YYYY-MM-DD` format.
+            expiration_range (tuple): (first, last) option expirations in `YYYY-MM-DD`
+                format; defaults to `expiration_window()`.
 
-        Returns:
-            list: A list of `HistoricalPrice` and `Option` objects.
+        Yields:
+            tuple: (symbol, historical row dicts, option row dicts) in completion order.
         """
         start_date, end_date = date_range  # Unpack the tuple
-        historical_data = []
-        options_data = []
+        expiration_range = expiration_range or expiration_window()
+        fetcher = ConcurrentFetcher(max_workers=settings.YAHOO_MAX_WORKERS)
+
+        results = fetcher.map_as_completed(
+            lambda symbol: self._download_symbol(symbol, start_date, end_date, expiration_range), symbols
+        )
+        for symbol, download, error in results:
+            if error is not None:
+                logger.error(f"❌ Failed to fetch historical data for {symbol}: {error}")
+                self.failed_symbols.add(symbol)
+                continue
+            if download is None:
+                yield symbol, [], []
+                continue
 
-        for symbol in symbols:
-            logger.info(f"📊 Fetching Yahoo Finance data for {symbol} from {start_date} to {end_date}...")
-            stock = yf.Ticker(symbol)
+            historical_data, options_data = self._build_rows(symbol, download)
 
-            # Fetch historical price data within the date range
+            # Upsert prices on (symbol, date, source) and bulk-insert option rows
             try:
-                history = stock.history(start=start_date, end=end_date, interval="1d")
-                if history.empty:
-                    logger.warning(f"⚠️ No historical data found for {symbol} within {start_date} to {end_date}.")
-                    continue
+                upsert_historical_prices(self.db, historical_data)
+                insert_rows(self.db, Option, options_data)
+                self.db.commit()
             except Exception as e:
-                logger.error(f"❌ Failed to fetch historical data for {symbol}: {e}")
+                logger.error(f"⚠️ Failed to save data for {symbol} to the database: {e}")
+                self.db.rollback()
+                self.failed_symbols.add(symbol)
                 continue
 
-            # Fetch dividends and splits
-            dividends, splits = {}, {}
-            try:
-                dividends = stock.dividends.to_dict() if not stock.dividends.empty else {}
-                splits = stock.splits.to_dict() if not stock.splits.empty else {}
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to fetch dividends/splits for {symbol}: {e}")
-
-            # Save historical data
-            for date, row in history.iterrows():
-                date = date.to_pydatetime()
-
-                # Ensure we don't duplicate data
-                exists = self.db.query(HistoricalPrice).filter(
-                    HistoricalPrice.symbol == symbol,
-                    HistoricalPrice.date == date
-                ).first()
-                if exists:
-                    logger.info(f"Skipping existing record for {symbol} on {date}.")
-                    continue
+            yield symbol, historical_data, options_data
 
-                historical_data.append(HistoricalPrice(
-                    symbol=symbol,
-                    date=date,
-                    open=self.safe_convert(row.get("Open"), float),
-                    high=self.safe_convert(row.get("High"), float),
-                    low=self.safe_convert(row.get("Low"), float),
-                    close=self.safe_convert(row.get("Close"), float),
-                    volume=self.safe_convert(row.get("Volume"), int),
-                    dividend=self.safe_convert(dividends.get(date, None), float),
-                    split=self.safe_convert(splits.get(date, None), float),
-                    timestamp=datetime.utcnow(),
-                    source="Yahoo Finance",
-                ))
+    def fetch_historical_data(self, symbols: list, date_range: tuple):
+        """
+        Fetch historical stock data and options data for a list of symbols within a given date range.
 
-            # Fetch options data within the date range
-            try:
-                options = stock.options
-                for expiration_date in options:
-                    expiration_datetime = datetime.strptime(expiration_date, "%Y-%m-%d")
-                    if not (start_date <= expiration_date <= end_date):  # Ensure expiration falls within range
-                        continue
-
-                    options_chain = stock.option_chain(expiration_date)
-                    for option_type, data in zip(["call", "put"], [options_chain.calls, options_chain.puts]):
-                        for _, row in data.iterrows():
-                            options_data.append(Option(
-                                symbol=symbol,
-                                strike_price=self.safe_convert(row.get("strike"), float),
-                                expiration_date=expiration_datetime,
-                                option_type=option_type,
-                                last_price=self.safe_convert(row.get("lastPrice"), float),
-                                bid_price=self.safe_convert(row.get("bid"), float),
-                                ask_price=self.safe_convert(row.get("ask"), float),
-                                volume=self.safe_convert(row.get("volume"), int),
-                                open_interest=self.safe_convert(row.get("openInterest"), int),
-                                implied_volatility=self.safe_convert(row.get("impliedVolatility"), float),
-                                # timestamp=datetime.utcnow(),
-                            ))
-            except Exception as e:
-                logger.error(f"⚠️ Failed to fetch options data for {symbol}: {e}")
+        Args:
+            symbols (list): List of stock symbols to fetch data for.
+            date_range (tuple): A tuple of (start_date, end_date) in `YYYY-MM-DD` format.
 
-        # Insert data into the database
-        try:
-            if historical_data:
-                self.db.bulk_save_objects(historical_data)
-            if options_data:
-                self.db.bulk_save_objects(options_data)
-            self.db.commit()
-            logger.info(f"✅ Historical and options data fetched for {len(symbols)} symbols.")
-        except Exception as e:
-            logger.error(f"⚠️ Failed to save data to the database: {e}")
-            self.db.rollback()
+        Returns:
+            list: The `HistoricalPrice` and `Option` row dicts that were stored.
+        """
+        historical_data = []
+        options_data = []
+        self.failed_symbols = set()
+
+        for _, symbol_history, symbol_options in self.iter_historical_data(symbols, date_range):
+            historical_data.extend(symbol_history)
+            options_data.extend(symbol_options)
+
+        logger.info(f"✅ Historical and options data fetched for {len(symbols) - len(self.failed_symbols)} of {len(symbols)} symbols.")
 
         # ✅ Ensure this function always returns lists, avoiding `NoneType` errors
         return historical_data + options_data
@@ -146,6 +249,8 @@ class YahooFinanceService:
         """
         Fetch real-time stock data and save to the database.
         """
+        import yfinance as yf
+
         try:
             for symbol in symbols:
                 logger.info(f"Fetching real-time data for {symbol}...")
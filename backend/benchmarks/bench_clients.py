@@ -0,0 +1,125 @@
+"""
+Upstream client latency benchmark: cold (new client per request) vs pooled.
+
+Compares, per request:
+- sync: a fresh requests.Session vs the shared pooled session from `configure_session`
+- async: a fresh httpx.AsyncClient vs the registry's shared AsyncClient
+- alpaca: constructing StockHistoricalDataClient + TradingClient (what the chart
+  dependency used to do) vs reusing the registry's clients (construction only)
+
+By default requests go to a local keep-alive HTTP server so the numbers isolate
+client and connection setup; pass --url to measure against a real endpoint (TLS
+handshakes make the difference much larger there).
+
+Usage (from backend/):
+    python -m benchmarks.bench_clients --requests 200
+    python -m benchmarks.bench_clients --url https://data.alpaca.markets/v2/stocks/AAPL/trades/latest
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import requests
+from alpaca.data.historical import StockHistoricalDataClient
+from alpaca.trading.client import TradingClient
+from app.config import settings
+from app.services.clients import ClientRegistry, configure_session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:>28}: mean {statistics.mean(samples) * 1e3:7.2f} ms  p50 {statistics.median(samples) * 1e3:7.2f} ms  p95 {p95 * 1e3:7.2f} ms")
+
+
+def timed(func, n):
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def timed_async(func, n):
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--url", default=None, help="Endpoint to call (default: local keep-alive server)")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = local_server()
+    headers = {"APCA-API-KEY-ID": settings.ALPACA_API_KEY, "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY}
+    print(f"{args.requests} requests to {url}")
+
+    def cold_sync():
+        with requests.Session() as session:
+            session.get(url, headers=headers, timeout=settings.HTTP_TIMEOUT)
+
+    pooled_session = configure_session(requests.Session())
+    report("sync cold", timed(cold_sync, args.requests))
+    report("sync pooled", timed(lambda: pooled_session.get(url, headers=headers), args.requests))
+
+    registry = ClientRegistry()
+
+    async def run_async():
+        async def cold_async():
+            async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
+                await client.get(url, headers=headers)
+
+        report("async cold", await timed_async(cold_async, args.requests))
+        http = registry.get_http()
+        report("async pooled", await timed_async(lambda: http.get(url, headers=headers), args.requests))
+        await registry.close()
+
+    asyncio.run(run_async())
+
+    def cold_alpaca():
+        StockHistoricalDataClient(api_key=settings.ALPACA_API_KEY, secret_key=settings.ALPACA_SECRET_KEY)
+        TradingClient(api_key=settings.ALPACA_API_KEY, secret_key=settings.ALPACA_SECRET_KEY)
+
+    report("alpaca clients constructed", timed(cold_alpaca, args.requests))
+    report("alpaca clients reused", timed(lambda: (registry.alpaca_data, registry.alpaca_trading), args.requests))
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Database handler concurrency benchmark: sync, blocking-async and async sessions.
+
+Serves the same read (the latest 100 stock_prices rows of a symbol) through three
+handler styles and drives each with N concurrent clients:
+
+- sync:     `def` handler + `get_db` (runs on Starlette's 40-thread pool)
+- blocking: `async def` handler + `get_db`, what the watchlist routes used to do;
+            every query stalls the event loop. Past the sync pool's 15
+            connections it deadlocks: the loop blocks waiting for a connection
+            that only a suspended handler can release. It is therefore driven
+            with --blocking-clients (default 15).
+- async:    `async def` handler + `get_async_db` (asyncpg pool, DB_POOL_SIZE)
+
+Requests go through httpx's in-process ASGI transport, so the numbers reflect
+handler and pool behaviour rather than HTTP parsing. Rows are seeded under the
+symbol BENCHDB and deleted afterwards.
+
+Usage (from backend/, against the configured DATABASE_URL):
+    python -m benchmarks.bench_db_concurrency --clients 500 --requests 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+import httpx
+import numpy as np
+from fastapi import Depends, FastAPI
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, async_engine, get_async_db, get_db, init_db
+from app.models import StockPrice
+
+SYMBOL = "BENCHDB"
+
+bench = FastAPI()
+
+QUERY = select(StockPrice.timestamp, StockPrice.close).filter(StockPrice.symbol == SYMBOL).order_by(StockPrice.timestamp.desc()).limit(100)
+
+
+@bench.get("/sync")
+def sync_handler(db: Session = Depends(get_db)):
+    return len(db.execute(QUERY).all())
+
+
+@bench.get("/blocking")
+async def blocking_handler(db: Session = Depends(get_db)):
+    return len(db.execute(QUERY).all())
+
+
+@bench.get("/async")
+async def async_handler(db: AsyncSession = Depends(get_async_db)):
+    return len((await db.execute(QUERY)).all())
+
+
+def seed(rows: int):
+    db = SessionLocal()
+    try:
+        start = datetime(2024, 1, 1)
+        db.add_all(StockPrice(symbol=SYMBOL, price=100.0, close=100.0, timestamp=start + timedelta(seconds=i)) for i in range(rows))
+        db.commit()
+    finally:
+        db.close()
+
+
+def clear():
+    db = SessionLocal()
+    try:
+        db.execute(delete(StockPrice).where(StockPrice.symbol == SYMBOL))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def drive(path: str, clients: int, requests: int, report: bool = True):
+    latencies = []
+    transport = httpx.ASGITransport(app=bench)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        async def client():
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await http.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    if not report:
+        return
+    latencies = np.array(latencies) * 1000
+    print(f"{path:<10} {clients:>4} clients  {len(latencies) / elapsed:>9,.0f} req/s  p50 {np.percentile(latencies, 50):8.1f} ms  "
+          f"p99 {np.percentile(latencies, 99):8.1f} ms")
+
+
+async def run(args):
+    for path, clients in (("/sync", args.clients), ("/blocking", args.blocking_clients), ("/async", args.clients)):
+        await drive(path, min(clients, 10), 2, report=False)  # Warm up pools
+        await drive(path, clients, args.requests)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="Sequential requests per client")
+    parser.add_argument("--blocking-clients", type=int, default=15, help="Concurrency for the blocking handler")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows seeded for the benchmark symbol")
+    args = parser.parse_args()
+
+    init_db()
+    clear()
+    seed(args.rows)
+    try:
+        asyncio.run(run(args))
+    finally:
+        clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+HistoricalPrice ingestion benchmark: per-row existence checks vs set-based upsert.
+
+Generates a synthetic daily-bar load (default: 100 symbols x 10 years) and writes it
+through both the legacy path (one SELECT per bar, then bulk_save_objects) and
+`upsert_historical_prices`, reporting rows/sec for each. A second upsert pass over
+the same rows measures the all-conflicts (refresh) case.
+
+Rows are written with source="Benchmark" and deleted afterwards.
+
+Usage (from backend/, against the configured DATABASE_URL):
+    python -m benchmarks.bench_ingest --symbols 100 --years 10
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import delete
+from app.database import SessionLocal, init_db
+from app.models import HistoricalPrice
+from app.services.upsert import upsert_historical_prices
+
+SOURCE = "Benchmark"
+
+
+def synthetic_rows(symbols: int, years: int):
+    days = [d for d in (datetime(2010, 1, 1) + timedelta(days=i) for i in range(365 * years)) if d.weekday() < 5]
+    rng = np.random.default_rng(42)
+    rows = []
+    fetched_at = datetime.utcnow()
+    for s in range(symbols):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+        for day, close in zip(days, closes.tolist()):
+            rows.append(dict(
+                symbol=f"BM{s:04d}", date=day, open=close, high=close * 1.01, low=close * 0.99, close=close,
+                volume=1_000_000, dividend=None, split=None, timestamp=fetched_at, source=SOURCE,
+            ))
+    return rows
+
+
+def clear(db):
+    db.execute(delete(HistoricalPrice).where(HistoricalPrice.source == SOURCE))
+    db.commit()
+
+
+def legacy_ingest(db, rows):
+    """The previous path: an existence query per bar, then bulk_save_objects."""
+    new_rows = []
+    for row in rows:
+        exists = db.query(HistoricalPrice).filter(
+            HistoricalPrice.symbol == row["symbol"],
+            HistoricalPrice.date == row["date"],
+        ).first()
+        if exists:
+            continue
+        new_rows.append(HistoricalPrice(**row))
+    db.bulk_save_objects(new_rows)
+    db.commit()
+
+
+def upsert_ingest(db, rows):
+    upsert_historical_prices(db, rows)
+    db.commit()
+
+
+def timed(label, func, db, rows):
+    started = time.perf_counter()
+    func(db, rows)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(rows):>10,} rows  {elapsed:8.2f}s  {len(rows) / elapsed:>12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only measure the upsert path")
+    args = parser.parse_args()
+
+    init_db()
+    rows = synthetic_rows(args.symbols, args.years)
+    db = SessionLocal()
+    try:
+        clear(db)
+        if not args.skip_legacy:
+            timed("legacy (select per row)", legacy_ingest, db, rows)
+            clear(db)
+        timed("upsert (insert)", upsert_ingest, db, rows)
+        timed("upsert (all conflicts)", upsert_ingest, db, rows)
+    finally:
+        clear(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
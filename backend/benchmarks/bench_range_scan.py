@@ -0,0 +1,120 @@
+"""
+Tick range-scan benchmark: single-column indexes vs a partitioned, covering layout.
+
+Generates a synthetic tick table (default: 100M rows, 500 symbols over 90 days)
+twice, server-side with generate_series:
+
+- flat:        one heap with separate (symbol) and ("timestamp") indexes, the
+               layout stock_prices had before migration 0002;
+- partitioned: range-partitioned by day via ishara_ensure_partitions(), with a
+               (symbol, "timestamp") INCLUDE (close) index per partition.
+
+It then times the chart query shape (one symbol, a time window, ordered by time)
+over random symbols and windows, reporting p50/p95 latency per layout.
+
+Requires PostgreSQL with the migrations applied, including the offline
+ones (`python -m app.migrations`). The bench_* tables are dropped
+afterwards unless --keep is given. Loading 100M rows takes several minutes and
+roughly 15 GB of disk per layout; use --rows to scale down.
+
+Usage (from backend/, against the configured DATABASE_URL):
+    python -m benchmarks.bench_range_scan --rows 100000000 --window-hours 24
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import text
+from app.database import engine, init_db
+
+START = datetime(2024, 1, 1)
+
+
+def load(conn, table: str, rows: int, symbols: int, days: int):
+    step = days * 86400.0 * symbols / rows  # Seconds between ticks of one symbol
+    started = time.perf_counter()
+    conn.execute(text(f"""
+        INSERT INTO {table} (symbol, "timestamp", close)
+        SELECT 'S' || (g % :symbols), :start + make_interval(secs => (g / :symbols) * :step), 100 + random()
+        FROM generate_series(0, :rows - 1) AS g
+    """), {"symbols": symbols, "start": START, "step": step, "rows": rows})
+    print(f"loaded {table:<20} {rows:>13,} rows  {time.perf_counter() - started:8.1f}s")
+
+
+def create_tables(conn, rows: int, symbols: int, days: int):
+    conn.execute(text('CREATE TABLE bench_ticks_flat (symbol varchar, "timestamp" timestamp NOT NULL, close double precision)'))
+    load(conn, "bench_ticks_flat", rows, symbols, days)
+    conn.execute(text("CREATE INDEX ON bench_ticks_flat (symbol)"))
+    conn.execute(text('CREATE INDEX ON bench_ticks_flat ("timestamp")'))
+
+    conn.execute(text(
+        'CREATE TABLE bench_ticks (symbol varchar, "timestamp" timestamp NOT NULL, close double precision) '
+        'PARTITION BY RANGE ("timestamp")'
+    ))
+    conn.execute(text("CREATE TABLE bench_ticks_default PARTITION OF bench_ticks DEFAULT"))
+    conn.execute(text("SELECT ishara_ensure_partitions('bench_ticks', 'day', :start, :end)"),
+                 {"start": START, "end": START + timedelta(days=days)})
+    load(conn, "bench_ticks", rows, symbols, days)
+    conn.execute(text('CREATE INDEX ON bench_ticks (symbol, "timestamp") INCLUDE (close)'))
+
+
+def drop_tables(conn):
+    conn.execute(text("DROP TABLE IF EXISTS bench_ticks_flat, bench_ticks"))
+
+
+def measure(conn, table: str, queries: int, symbols: int, days: int, window: timedelta, report: bool = True):
+    rng = random.Random(42)
+    latencies, returned = [], 0
+    for _ in range(queries):
+        lower = START + timedelta(seconds=rng.uniform(0, days * 86400 - window.total_seconds()))
+        started = time.perf_counter()
+        result = conn.execute(
+            text(f'SELECT "timestamp", close FROM {table} WHERE symbol = :symbol '
+                 f'AND "timestamp" >= :lower AND "timestamp" < :upper ORDER BY "timestamp"'),
+            {"symbol": f"S{rng.randrange(symbols)}", "lower": lower, "upper": lower + window},
+        ).fetchall()
+        latencies.append(time.perf_counter() - started)
+        returned += len(result)
+    if not report:
+        return
+    latencies = np.array(latencies) * 1000
+    print(f"{table:<20} p50 {np.percentile(latencies, 50):8.2f} ms  p95 {np.percentile(latencies, 95):8.2f} ms  "
+          f"mean {latencies.mean():8.2f} ms  {returned / queries:>10,.0f} rows/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--window-hours", type=float, default=24.0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="Keep the bench_* tables for reruns")
+    parser.add_argument("--reuse", action="store_true", help="Query existing bench_* tables without reloading")
+    args = parser.parse_args()
+
+    init_db()
+    if not args.reuse:
+        with engine.begin() as conn:
+            drop_tables(conn)
+            create_tables(conn, args.rows, args.symbols, args.days)
+        # Visibility map for index-only scans; VACUUM cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE bench_ticks_flat"))
+            conn.execute(text("VACUUM ANALYZE bench_ticks"))
+
+    try:
+        window = timedelta(hours=args.window_hours)
+        with engine.connect() as conn:
+            for table in ("bench_ticks_flat", "bench_ticks"):
+                measure(conn, table, 5, args.symbols, args.days, window, report=False)  # Warm-up
+                measure(conn, table, args.queries, args.symbols, args.days, window)
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                drop_tables(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Startup benchmark: import time of app.main and time-to-first-request.
+
+For each run, in fresh interpreters:
+- import: wall time of `import app.main` (module-level work only; no lifespan)
+- first request: from spawning `uvicorn app.main:app` until GET /api/quotes
+  answers 200, i.e. interpreter start, imports, the lifespan startup (database
+  init, migrations, service start-up) and the first request
+
+Importing the app must not open connections or need live credentials, so the
+import figure is also what test collection pays. Compare against previous runs
+when touching imports or the lifespan.
+
+Usage (from backend/, against the configured DATABASE_URL):
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_time():
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_to_first_request(timeout: float):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(os.environ),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/quotes", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def report(label, samples):
+    print(f"{label:<16} median {statistics.median(samples):6.3f}s  min {min(samples):6.3f}s  max {max(samples):6.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the first response")
+    args = parser.parse_args()
+
+    report("import", [import_time() for _ in range(args.runs)])
+    report("first request", [time_to_first_request(args.timeout) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+-- One bar per symbol, day and source (target of the ingestion upserts).
+-- create_all() does not alter existing tables, so remove the duplicates that would
+-- violate the constraint before creating it.
+DELETE FROM historical_prices a
+USING historical_prices b
+WHERE a.id < b.id AND a.symbol = b.symbol AND a.date = b.date AND a.source = b.source;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_historical_symbol_date_source
+    ON historical_prices (symbol, date, source);
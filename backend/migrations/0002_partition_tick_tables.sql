@@ -0,0 +1,117 @@
+-- migrate: offline
+-- Range-partition the tick tables on "timestamp": stock_prices by month, trades by day.
+--
+-- Chart reads filter on one symbol and a time range, so each partition carries a
+-- (symbol, "timestamp") index that includes the selected price columns; the planner
+-- prunes partitions outside the range and answers from the index alone.
+--
+-- Rows outside every partition go to a DEFAULT partition. ishara_ensure_partitions()
+-- creates missing partitions ahead of time (the app calls it on startup and
+-- periodically) and moves any rows that landed in DEFAULT into them.
+--
+-- Copies both tables in one transaction, so it is applied as an offline step
+-- (`python -m app.migrations`) rather than on app startup.
+
+CREATE OR REPLACE FUNCTION ishara_ensure_partitions(parent text, step text, from_ts timestamp, to_ts timestamp)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    lower_bound timestamp := date_trunc(step, from_ts);
+    upper_bound timestamp;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    -- Serialize concurrent callers (e.g. several API workers starting at once)
+    PERFORM pg_advisory_xact_lock(hashtext('ishara_partitions:' || parent));
+    WHILE lower_bound <= to_ts LOOP
+        upper_bound := lower_bound + ('1 ' || step)::interval;
+        partition_name := parent || '_p' || to_char(lower_bound, CASE step WHEN 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END);
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, parent);
+            EXECUTE format('LOCK TABLE %I IN ACCESS EXCLUSIVE MODE', parent || '_default');
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE "timestamp" >= %L AND "timestamp" < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                parent || '_default', lower_bound, upper_bound, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                parent, partition_name, lower_bound, upper_bound
+            );
+            created := created + 1;
+        END IF;
+        lower_bound := upper_bound;
+    END LOOP;
+    RETURN created;
+END
+$$;
+
+-- stock_prices (monthly)
+ALTER TABLE stock_prices RENAME TO stock_prices_legacy;
+ALTER SEQUENCE stock_prices_id_seq OWNED BY NONE;
+
+CREATE TABLE stock_prices (
+    id integer NOT NULL DEFAULT nextval('stock_prices_id_seq'),
+    symbol varchar,
+    price double precision,
+    open double precision,
+    high double precision,
+    low double precision,
+    close double precision,
+    volume integer,
+    "timestamp" timestamp NOT NULL,
+    stock_id integer REFERENCES stocks (id)
+) PARTITION BY RANGE ("timestamp");
+CREATE TABLE stock_prices_default PARTITION OF stock_prices DEFAULT;
+
+SELECT ishara_ensure_partitions(
+    'stock_prices', 'month',
+    COALESCE((SELECT min("timestamp") FROM stock_prices_legacy), now() AT TIME ZONE 'UTC'),
+    GREATEST((SELECT max("timestamp") FROM stock_prices_legacy), now() AT TIME ZONE 'UTC')
+);
+
+-- Rows without a timestamp cannot be placed by time; keep them at the epoch (DEFAULT partition)
+INSERT INTO stock_prices (id, symbol, price, open, high, low, close, volume, "timestamp", stock_id)
+SELECT id, symbol, price, open, high, low, close, volume, COALESCE("timestamp", 'epoch'), stock_id
+FROM stock_prices_legacy;
+
+DROP TABLE stock_prices_legacy;
+ALTER SEQUENCE stock_prices_id_seq OWNED BY stock_prices.id;
+
+ALTER TABLE stock_prices ADD PRIMARY KEY (id, "timestamp");
+CREATE INDEX ix_stock_prices_symbol_timestamp ON stock_prices (symbol, "timestamp") INCLUDE (close);
+
+-- trades (daily)
+ALTER TABLE trades RENAME TO trades_legacy;
+ALTER SEQUENCE trades_id_seq OWNED BY NONE;
+
+CREATE TABLE trades (
+    id integer NOT NULL DEFAULT nextval('trades_id_seq'),
+    symbol varchar NOT NULL,
+    price double precision NOT NULL,
+    size integer NOT NULL,
+    "timestamp" timestamp NOT NULL,
+    exchange varchar,
+    conditions varchar,
+    tape varchar
+) PARTITION BY RANGE ("timestamp");
+CREATE TABLE trades_default PARTITION OF trades DEFAULT;
+
+SELECT ishara_ensure_partitions(
+    'trades', 'day',
+    COALESCE((SELECT min("timestamp") FROM trades_legacy), now() AT TIME ZONE 'UTC'),
+    GREATEST((SELECT max("timestamp") FROM trades_legacy), now() AT TIME ZONE 'UTC')
+);
+
+INSERT INTO trades (id, symbol, price, size, "timestamp", exchange, conditions, tape)
+SELECT id, symbol, price, size, "timestamp", exchange, conditions, tape
+FROM trades_legacy;
+
+DROP TABLE trades_legacy;
+ALTER SEQUENCE trades_id_seq OWNED BY trades.id;
+
+ALTER TABLE trades ADD PRIMARY KEY (id, "timestamp");
+CREATE INDEX ix_trades_symbol_timestamp ON trades (symbol, "timestamp") INCLUDE (price, size);
+
+ANALYZE stock_prices;
+ANALYZE trades;
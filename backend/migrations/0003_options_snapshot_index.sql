@@ -0,0 +1,4 @@
+-- Option chains are read one snapshot (symbol, timestamp) at a time by the
+-- analytics routes. create_all() does not add indexes to existing tables.
+CREATE INDEX IF NOT EXISTS ix_options_symbol_timestamp
+    ON options (symbol, "timestamp");
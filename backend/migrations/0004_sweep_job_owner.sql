@@ -0,0 +1,4 @@
+-- Sweep jobs record the runner that claimed them and a heartbeat, so a worker
+-- that starts up only requeues jobs whose owner has died.
+ALTER TABLE sweep_jobs ADD COLUMN IF NOT EXISTS owner varchar;
+ALTER TABLE sweep_jobs ADD COLUMN IF NOT EXISTS heartbeat_at timestamp;
@@ -0,0 +1,7 @@
+import os
+
+# Settings require these at import time; the unit tests never reach a real database or Alpaca
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ALPACA_API_KEY", "test")
+os.environ.setdefault("ALPACA_SECRET_KEY", "test")
+os.environ.setdefault("ALPACA_WS_URL", "ws://localhost")
@@ -0,0 +1,42 @@
+from datetime import datetime
+from app.services.coverage import merge_intervals, subtract_intervals
+
+
+def day(n):
+    return datetime(2026, 1, n)
+
+
+def test_merge_overlapping_and_adjacent():
+    intervals = [(day(10), day(12)), (day(1), day(3)), (day(4), day(5)), (day(11), day(15))]
+    assert merge_intervals(intervals) == [(day(1), day(5)), (day(10), day(15))]
+
+
+def test_merge_keeps_gaps_and_contained_intervals():
+    intervals = [(day(1), day(10)), (day(3), day(4)), (day(12), day(12))]
+    assert merge_intervals(intervals) == [(day(1), day(10)), (day(12), day(12))]
+
+
+def test_merge_empty():
+    assert merge_intervals([]) == []
+
+
+def test_subtract_nothing_covered():
+    assert subtract_intervals(day(1), day(10), []) == [(day(1), day(10))]
+
+
+def test_subtract_fully_covered():
+    assert subtract_intervals(day(3), day(5), [(day(1), day(10))]) == []
+
+
+def test_subtract_returns_gaps_and_edges():
+    covered = [(day(3), day(4)), (day(7), day(8))]
+    assert subtract_intervals(day(1), day(10), covered) == [
+        (day(1), day(2)),
+        (day(5), day(6)),
+        (day(9), day(10)),
+    ]
+
+
+def test_subtract_ignores_intervals_outside_the_range():
+    covered = [(datetime(2025, 12, 1), datetime(2025, 12, 31)), (day(5), day(6)), (day(20), day(25))]
+    assert subtract_intervals(day(1), day(10), covered) == [(day(1), day(4)), (day(7), day(10))]
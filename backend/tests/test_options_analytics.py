@@ -0,0 +1,45 @@
+import numpy as np
+from app.services.options_analytics import bs_greeks, bs_price, implied_volatility, norm_cdf
+
+RATE = 0.04
+
+
+def test_norm_cdf():
+    np.testing.assert_allclose(norm_cdf(np.array([0.0, 1.0, -1.96])), [0.5, 0.841344746, 0.024997895], atol=1e-7)
+
+
+def test_put_call_parity():
+    spot, strike, t, vol, q = 100.0, np.array([80.0, 100.0, 120.0]), 0.5, 0.25, 0.01
+    call = bs_price(spot, strike, t, vol, RATE, q, True)
+    put = bs_price(spot, strike, t, vol, RATE, q, False)
+    np.testing.assert_allclose(call - put, spot * np.exp(-q * t) - strike * np.exp(-RATE * t), atol=1e-6)
+
+
+def test_implied_volatility_round_trip():
+    rng = np.random.default_rng(7)
+    spot = 100.0
+    strike = spot * rng.uniform(0.6, 1.4, 500)
+    t = rng.choice([7, 30, 90, 365, 730], 500) / 365.0
+    is_call = rng.random(500) < 0.5
+    vol = rng.uniform(0.05, 1.5, 500)
+    price = bs_price(spot, strike, t, vol, RATE, 0.0, is_call)
+
+    iv = implied_volatility(price, spot, strike, t, RATE, 0.0, is_call)
+
+    # Prices with no time value carry no volatility information
+    informative = bs_greeks(spot, strike, t, vol, RATE, 0.0, is_call)["vega"] > 1e-6
+    assert np.isfinite(iv[informative]).all()
+    np.testing.assert_allclose(iv[informative], vol[informative], atol=1e-5)
+
+
+def test_implied_volatility_rejects_arbitrage_violations():
+    spot, strike, t = 100.0, np.array([90.0, 100.0, 100.0, 100.0]), np.array([0.5, 0.5, 0.5, 0.0])
+    # Below intrinsic, above the spot, NaN price, expired
+    price = np.array([5.0, 150.0, np.nan, 3.0])
+    iv = implied_volatility(price, spot, strike, t, RATE, 0.0, True)
+    assert np.isnan(iv).all()
+
+
+def test_implied_volatility_scalar_inputs():
+    price = bs_price(100.0, 105.0, 0.25, 0.3, RATE, 0.0, False)
+    assert abs(implied_volatility(price, 100.0, 105.0, 0.25, RATE, 0.0, False) - 0.3) < 1e-6
@@ -0,0 +1,137 @@
+import json
+import os
+from datetime import datetime
+import pytest
+from app.models import StockPrice, Trade
+from app.services import tick_spool
+from app.services.tick_spool import RECORD_SIZE, TickReplayer, TickSpool
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Capture what the replayer would write instead of going to the database."""
+    written = []
+
+    def write_batch(batch):
+        written.append(batch)
+        return sum(len(rows) for rows in batch.values())
+
+    monkeypatch.setattr(tick_spool, "write_batch", write_batch)
+    return written
+
+
+def make_spool(tmp_path, segment_records=4):
+    spool = TickSpool(directory=str(tmp_path), segment_records=segment_records)
+    spool.open()
+    return spool
+
+
+def make_replayer(spool, batch_size=10):
+    """A replayer positioned at its checkpoint, as `start()` does, without the thread."""
+    replayer = TickReplayer(spool, batch_size=batch_size)
+    replayer.segment, replayer.index = replayer._load_checkpoint()
+    return replayer
+
+
+def test_record_is_96_bytes():
+    assert RECORD_SIZE == 96
+
+
+def test_append_and_replay_rows(tmp_path, batches):
+    spool = make_spool(tmp_path)
+    timestamp = datetime(2026, 1, 2, 14, 30, 0, 123456)
+    spool.append_quote("AAPL", timestamp, 189.5, 189.52, 300, 200, exchange="Q", tape="C")
+    spool.append_trade("AAPL", timestamp, 189.51, 100, exchange="V", tape="C", conditions="['@']")
+    spool.close()
+
+    replayer = make_replayer(TickSpool(directory=str(tmp_path), segment_records=4))
+    assert replayer.replay_once() == 2
+
+    (quote,) = batches[0][StockPrice]
+    assert quote == dict(symbol="AAPL", price=189.5, open=189.5, high=189.52, low=189.5, close=189.52,
+                         volume=300, timestamp=timestamp)
+    (trade,) = batches[0][Trade]
+    assert trade == dict(symbol="AAPL", price=189.51, size=100, timestamp=timestamp, exchange="V",
+                         conditions="['@']", tape="C")
+
+
+def test_missing_values_replay_as_none(tmp_path, batches):
+    spool = make_spool(tmp_path)
+    spool.append_quote("MSFT", datetime(2026, 1, 2), None, 410.0, None, 5)
+    spool.close()
+
+    replayer = make_replayer(TickSpool(directory=str(tmp_path), segment_records=4))
+    replayer.replay_once()
+
+    (quote,) = batches[0][StockPrice]
+    assert quote["open"] is None and quote["low"] is None and quote["volume"] is None
+    assert quote["price"] == 410.0
+
+
+def test_reopen_resumes_after_last_committed_record(tmp_path):
+    spool = make_spool(tmp_path, segment_records=8)
+    for i in range(3):
+        spool.append_trade("AAPL", datetime(2026, 1, 2), 100.0 + i, 1)
+    spool.close()
+
+    reopened = make_spool(tmp_path, segment_records=8)
+    assert (reopened.segment, reopened.index) == (0, 3)
+    reopened.close()
+
+
+def test_segment_rollover(tmp_path):
+    spool = make_spool(tmp_path, segment_records=4)
+    for i in range(6):
+        spool.append_trade("AAPL", datetime(2026, 1, 2), 100.0 + i, 1)
+    spool.close()
+
+    assert spool.segments() == [0, 1]
+    assert os.path.getsize(spool.segment_path(1)) == 4 * RECORD_SIZE
+    assert make_spool(tmp_path, segment_records=4).index == 2
+
+
+def test_replay_checkpoints_and_deletes_finished_segments(tmp_path, batches):
+    spool = make_spool(tmp_path, segment_records=4)
+    for i in range(6):
+        spool.append_trade("AAPL", datetime(2026, 1, 2), 100.0 + i, 1)
+    spool.close()
+
+    replayer = make_replayer(spool, batch_size=3)
+    while replayer.replay_once():
+        pass
+
+    prices = [row["price"] for batch in batches for row in batch[Trade]]
+    assert prices == [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+    with open(replayer.checkpoint_path) as f:
+        assert json.load(f) == {"segment": 1, "index": 2}
+    assert spool.segments() == [1]
+
+
+def test_failed_batch_is_replayed_after_restart(tmp_path, monkeypatch):
+    spool = make_spool(tmp_path)
+    spool.append_trade("AAPL", datetime(2026, 1, 2), 100.0, 1)
+    spool.append_trade("AAPL", datetime(2026, 1, 2), 101.0, 1)
+    spool.close()
+
+    attempts = []
+
+    def flaky_write_batch(batch):
+        attempts.append(batch)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        return sum(len(rows) for rows in batch.values())
+
+    monkeypatch.setattr(tick_spool, "write_batch", flaky_write_batch)
+    replayer = make_replayer(spool)
+    with pytest.raises(RuntimeError):
+        replayer.replay_once()
+    assert replayer.index == 0
+    assert not os.path.exists(replayer.checkpoint_path)
+    replayer._unmap()
+
+    # A new process resumes from the last checkpoint (here: the start), so nothing is lost
+    restarted = make_replayer(TickSpool(directory=str(tmp_path), segment_records=4))
+    assert restarted.replay_once() == 2
+    assert [row["price"] for row in attempts[1][Trade]] == [100.0, 101.0]
+    with open(restarted.checkpoint_path) as f:
+        assert json.load(f) == {"segment": 0, "index": 2}
@@ -1,24 +1,35 @@
 import React, { useState, useEffect } from "react";
 import { Paper, Typography, Table, TableBody, TableCell, TableContainer, TableHead, TableRow } from "@mui/material";
-import axios from "axios";
+import { subscribePortfolioPnL } from "../utils/api";
+
+const formatMoney = (value) => (value == null ? "-" : `$${value.toFixed(2)}`);
+const gainColor = (value) => (value >= 0 ? "green" : "red");
 
 const PortfolioOverview = () => {
-    const [portfolio, setPortfolio] = useState([]);
+    const [positions, setPositions] = useState({});
+    const [totals, setTotals] = useState(null);
 
     useEffect(() => {
-        // Fetch portfolio data from API
-        axios.get("/api/portfolio")
-            .then((response) => {
-                setPortfolio(response.data);
-            })
-            .catch((error) => {
-                console.error("Error fetching portfolio data:", error);
-            });
+        // Live P&L is computed server-side; snapshots replace state, deltas merge changed positions
+        return subscribePortfolioPnL((event, data) => {
+            setPositions((current) => (event === "snapshot" ? data.positions : { ...current, ...data.positions }));
+            setTotals(data.totals);
+        });
     }, []);
 
+    const rows = Object.values(positions).sort((a, b) => a.symbol.localeCompare(b.symbol));
+
     return (
         <Paper elevation={3} sx={{ padding: "10px", height: "100%" }}>
             {/* <Typography variant="h6">Portfolio Overview</Typography> */}
+            {totals && (
+                <Typography variant="body2" sx={{ marginBottom: "8px" }}>
+                    Value {formatMoney(totals.market_value)} · Unrealized{" "}
+                    <span style={{ color: gainColor(totals.unrealized_pnl) }}>{formatMoney(totals.unrealized_pnl)}</span> · Day{" "}
+                    <span style={{ color: gainColor(totals.day_change) }}>{formatMoney(totals.day_change)}</span> · Net exposure{" "}
+                    {formatMoney(totals.net_exposure)}
+                </Typography>
+            )}
             <TableContainer>
                 <Table size="small">
                     <TableHead>
@@ -28,31 +39,35 @@ const PortfolioOverview = () => {
                             <TableCell>Average Cost</TableCell>
                             <TableCell>Current Price</TableCell>
                             <TableCell>Value</TableCell>
+                            <TableCell>Unrealized P&L</TableCell>
                             <TableCell>Change</TableCell>
                         </TableRow>
                     </TableHead>
                     <TableBody>
-                        {portfolio.length > 0 ? (
-                            portfolio.map((stock) => (
+                        {rows.length > 0 ? (
+                            rows.map((stock) => (
                                 <TableRow key={stock.symbol}>
                                     <TableCell>{stock.symbol}</TableCell>
                                     <TableCell>{stock.shares}</TableCell>
-                                    <TableCell>${stock.avgCost.toFixed(2)}</TableCell>
-                                    <TableCell>${stock.currentPrice.toFixed(2)}</TableCell>
-                                    <TableCell>${(stock.shares * stock.currentPrice).toFixed(2)}</TableCell>
+                                    <TableCell>{formatMoney(stock.avg_price)}</TableCell>
+                                    <TableCell>{formatMoney(stock.last_price)}</TableCell>
+                                    <TableCell>{formatMoney(stock.market_value)}</TableCell>
+                                    <TableCell sx={{ color: gainColor(stock.unrealized_pnl) }}>
+                                        {formatMoney(stock.unrealized_pnl)}
+                                    </TableCell>
                                     <TableCell
                                         sx={{
-                                            color: stock.change >= 0 ? "green" : "red",
+                                            color: gainColor(stock.day_change_pct),
                                             fontWeight: "bold",
                                         }}
                                     >
-                                        {stock.change.toFixed(2)}%
+                                        {stock.day_change_pct == null ? "-" : `${stock.day_change_pct.toFixed(2)}%`}
                                     </TableCell>
                                 </TableRow>
                             ))
                         ) : (
                             <TableRow>
-                                <TableCell colSpan={6} align="center">
+                                <TableCell colSpan={7} align="center">
                                     No portfolio data available
                                 </TableCell>
                             </TableRow>
@@ -28,6 +28,16 @@ export const fetchOptionsData = () => getRequest("/options");
 // **Portfolio Data**
 export const fetchPortfolioData = () => getRequest("/portfolio");
 
+// **Live Portfolio P&L** (Server-Sent Events: a snapshot, then deltas of changed positions)
+export const subscribePortfolioPnL = (onUpdate) => {
+    const source = new EventSource(`${BASE_URL}/portfolio/pnl/stream`);
+    const handle = (event) => onUpdate(event.type, JSON.parse(event.data));
+    source.addEventListener("snapshot", handle);
+    source.addEventListener("delta", handle);
+    source.onerror = (error) => console.error("Portfolio P&L stream error:", error);
+    return () => source.close();
+};
+
 // **Chart Data**
 export const fetchChartData = () => getRequest("/charts");
 